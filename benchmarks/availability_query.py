@@ -0,0 +1,135 @@
+"""
+Сравнение планов запроса свободных отелей: до и после переноса фильтров в проверку загрузки.
+
+- before — исходная схема: CTE с загрузкой всех комнат системы → IN по всем свободным комнатам →
+  текстовые фильтры и LIMIT только в самом конце
+- after — запрос HotelsRepository.get_filtered_by_time: текстовые фильтры, затем коррелированный
+  EXISTS по комнатам отеля и room_inventory (room_is_free), LIMIT останавливает перебор
+
+Для каждого варианта печатается EXPLAIN (ANALYZE, BUFFERS) и время выполнения.
+
+Запуск на отдельной БД (флаг --seed пересоздаёт все таблицы и заполняет их синтетикой):
+    DB_NAME=booking_bench python -m benchmarks.availability_query --seed --hotels 10000 --bookings 1000000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from sqlalchemy import func, select, text
+
+from src.config import settings
+from src.database import Base, get_engine, async_session_maker_null_pool
+from src.models import *  # noqa: F403
+from src.models.hotels import HotelsOrm
+from src.models.room_inventory import RoomInventoryOrm
+from src.models.rooms import RoomsOrm
+from src.repositories.utils import room_is_free
+from src.utils.db_manager import DBManager
+
+ROOMS_PER_HOTEL = 5
+
+# Синтетические данные: локации из 100 городов, брони по 1–7 дней в течение 2030 года
+SEED_SQL = [
+    """
+    INSERT INTO hotels (title, location)
+    SELECT 'Отель ' || i, 'city_' || (i % 100)
+    FROM generate_series(1, :hotels) AS i
+    """,
+    """
+    INSERT INTO rooms (hotel_id, title, description, price, quantity)
+    SELECT hotels.id, 'Номер ' || n, NULL, 1000 + n * 500, 1 + (hotels.id + n) % 3
+    FROM hotels, generate_series(1, :rooms_per_hotel) AS n
+    """,
+    """
+    INSERT INTO users (email, hashed_password) VALUES ('bench@booking.com', 'bench')
+    """,
+    """
+    INSERT INTO bookings (user_id, room_id, date_from, date_to, price)
+    SELECT (SELECT min(id) FROM users), 1 + (random() * (:rooms - 1))::int, day, day + (1 + (random() * 6)::int), 1000
+    FROM (SELECT date '2030-01-01' + (random() * 360)::int AS day FROM generate_series(1, :bookings)) AS days
+    """,
+    """
+    INSERT INTO room_inventory (room_id, day, booked)
+    SELECT room_id, day::date, count(*)
+    FROM bookings, generate_series(date_from, date_to, interval '1 day') AS day
+    GROUP BY room_id, day
+    """,
+    "ANALYZE",
+]
+
+
+def legacy_hotels_query(date_from: date, date_to: date, location: str | None, limit: int):
+    """
+    Исходный запрос: загрузка считается для всех комнат системы до фильтрации по отелю.
+    """
+    rooms_count = (
+        select(RoomInventoryOrm.room_id, func.max(RoomInventoryOrm.booked).label("rooms_booked"))
+        .filter(RoomInventoryOrm.day.between(date_from, date_to))
+        .group_by(RoomInventoryOrm.room_id)
+        .cte(name="rooms_count")
+    )
+    rooms_left_table = (
+        select(RoomsOrm.id.label("room_id"), (RoomsOrm.quantity - func.coalesce(rooms_count.c.rooms_booked, 0)).label("rooms_left"))
+        .outerjoin(rooms_count, RoomsOrm.id == rooms_count.c.room_id)
+        .cte(name="rooms_left_table")
+    )
+    rooms_ids_to_get = select(rooms_left_table.c.room_id).filter(rooms_left_table.c.rooms_left > 0, rooms_left_table.c.room_id.in_(select(RoomsOrm.id)))
+    hotels_ids_to_get = select(RoomsOrm.hotel_id).filter(RoomsOrm.id.in_(rooms_ids_to_get))
+    query = select(HotelsOrm).filter(HotelsOrm.id.in_(hotels_ids_to_get))
+    if location:
+        query = query.filter(func.lower(HotelsOrm.location).contains(location))
+    return query.limit(limit)
+
+
+def hotels_query(date_from: date, date_to: date, location: str | None, limit: int):
+    """
+    Текущий запрос (как в HotelsRepository.get_filtered_by_time при AVAILABILITY_ENGINE="sql").
+    """
+    free_room_exists = select(RoomsOrm.id).filter(RoomsOrm.hotel_id == HotelsOrm.id, room_is_free(date_from, date_to)).exists()
+    query = select(HotelsOrm)
+    if location:
+        query = query.filter(func.lower(HotelsOrm.location).contains(location))
+    return query.filter(free_room_exists).order_by(HotelsOrm.id).limit(limit)
+
+
+async def seed(hotels: int, bookings: int) -> None:
+    assert settings.MODE in ("TEST", "LOCAL"), "Заполнять синтетикой можно только БД в режиме TEST или LOCAL"
+    async with get_engine("null_pool").begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    params = {"hotels": hotels, "rooms_per_hotel": ROOMS_PER_HOTEL, "rooms": hotels * ROOMS_PER_HOTEL, "bookings": bookings}
+    async with get_engine("null_pool").begin() as conn:
+        for sql in SEED_SQL:
+            await conn.execute(text(sql), {key: value for key, value in params.items() if f":{key}" in sql})
+
+
+async def explain(db: DBManager, name: str, query) -> None:
+    compiled = query.compile(dialect=db.session.bind.dialect, compile_kwargs={"literal_binds": True})
+    started = time.perf_counter()
+    plan = (await db.session.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}"))).scalars().all()
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"===== {name}: {elapsed:.1f} ms =====")
+    print("\n".join(plan), end="\n\n")
+
+
+async def main(args) -> None:
+    if args.seed:
+        await seed(args.hotels, args.bookings)
+
+    date_from, date_to = date(2030, 6, 1), date(2030, 6, 10)
+    async with DBManager(session_factory=async_session_maker_null_pool) as db:
+        for location in (None, args.location):
+            await explain(db, f"before, location={location}", legacy_hotels_query(date_from, date_to, location, args.limit))
+            await explain(db, f"after, location={location}", hotels_query(date_from, date_to, location, args.limit))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="пересоздать таблицы и заполнить синтетикой")
+    parser.add_argument("--hotels", type=int, default=10_000)
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--location", default="city_42")
+    parser.add_argument("--limit", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
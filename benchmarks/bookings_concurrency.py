@@ -0,0 +1,112 @@
+"""
+Нагрузочный тест бронирования: сотни параллельных POST /bookings.
+
+Сценарии:
+- same_room — все запросы бронируют одну и ту же комнату (максимальная конкуренция за блокировку)
+- disjoint_rooms — запросы распределены по разным комнатам (блокировки не пересекаются)
+
+Для каждого сценария выводятся пропускная способность, p50/p99 задержки, распределение
+кодов ответа и количество овербукингов (дней, где броней больше, чем quantity комнаты) — должно быть 0.
+
+Запуск (приложение должно быть запущено с нужным BOOKING_LOCK_MODE):
+    python -m benchmarks.bookings_concurrency --url http://localhost:8000 --requests 500 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+import httpx
+from sqlalchemy import text
+
+from src.database import async_session_maker_null_pool
+from src.utils.db_manager import DBManager
+
+# Дни, где сумма броней комнаты превышает её quantity
+OVERBOOKINGS_SQL = text(
+    """
+    SELECT count(*) FROM (
+        SELECT bookings.room_id, day
+        FROM bookings, generate_series(bookings.date_from, bookings.date_to, interval '1 day') AS day
+        GROUP BY bookings.room_id, day
+        HAVING count(*) > (SELECT quantity FROM rooms WHERE rooms.id = bookings.room_id)
+    ) AS overbooked_days
+    """
+)
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> None:
+    await client.post("/auth/register", json={"email": email, "password": password})
+    response = await client.post("/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+
+
+async def run_scenario(client: httpx.AsyncClient, rooms_ids: list[int], total: int, concurrency: int, date_from: date) -> dict:
+    """
+    Отправляет total запросов бронирования (не более concurrency одновременно)
+    и собирает задержки и коды ответов.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+
+    async def book(i: int):
+        payload = {
+            "room_id": rooms_ids[i % len(rooms_ids)],
+            "date_from": date_from.isoformat(),
+            "date_to": (date_from + timedelta(days=2)).isoformat(),
+        }
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/bookings", json=payload)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(book(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "statuses": dict(statuses),
+    }
+
+
+async def count_overbookings() -> int:
+    async with DBManager(session_factory=async_session_maker_null_pool) as db:
+        return (await db.session.execute(OVERBOOKINGS_SQL)).scalar_one()
+
+
+async def main(args) -> None:
+    async with DBManager(session_factory=async_session_maker_null_pool) as db:
+        rooms_ids = [room.id for room in await db.rooms.get_all()]
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        await login(client, args.email, args.password)
+
+        # Каждый сценарий бронирует свои далёкие даты, чтобы не мешать друг другу и реальным данным
+        scenarios = {
+            "same_room": (rooms_ids[:1], date(2100, 1, 1)),
+            "disjoint_rooms": (rooms_ids, date(2100, 2, 1)),
+        }
+        for name, (scenario_rooms, date_from) in scenarios.items():
+            result = await run_scenario(client, scenario_rooms, args.requests, args.concurrency, date_from)
+            result["overbookings"] = await count_overbookings()
+            print(f"{name:>15}: {result['rps']:8.1f} req/s  p50={result['p50_ms']:7.1f} ms  p99={result['p99_ms']:7.1f} ms  statuses={result['statuses']}  overbookings={result['overbookings']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--email", default="bench@booking.com")
+    parser.add_argument("--password", default="bench")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,94 @@
+"""
+Микробенчмарк маппинга 10k строк в доменные схемы: старый и новый путь DataMapper.
+
+- old — ORM-объекты (как после загрузки select(Model)) → map_to_domain_entity (model_validate, from_attributes)
+- new — строки select(*mapper.columns()) → map_rows_to_domain_entities (один TypeAdapter(list[schema]) на пачку)
+
+Для RoomWithRels у каждой комнаты по 3 удобства: old — ORM-связь facilities,
+new — словари с удобствами → map_dicts_to_domain_entities.
+
+Запуск (нужны переменные окружения приложения, БД не используется):
+    python -m benchmarks.mappers --rows 10000 --repeat 5
+"""
+
+import argparse
+import timeit
+from datetime import date
+
+from sqlalchemy.orm import configure_mappers
+
+from src.models import *  # noqa: F403
+from src.models.bookings import BookingsOrm
+from src.models.facilities import FacilitiesOrm
+from src.models.hotels import HotelsOrm
+from src.models.rooms import RoomsOrm
+from src.repositories.mappers.mappers import BookingDataMapper, HotelDataMapper, RoomDataMapper, RoomDataWithRelsMapper
+
+FACILITIES = [FacilitiesOrm(id=i, title=f"Удобство {i}") for i in range(1, 4)]
+
+
+def hotel_row(i: int) -> dict:
+    return {"id": i, "title": f"Отель {i}", "location": f"city_{i % 100}"}
+
+
+def room_row(i: int) -> dict:
+    return {"id": i, "hotel_id": i % 1000, "title": f"Номер {i}", "description": None, "price": 1000 + i % 50, "quantity": 1 + i % 5}
+
+
+def booking_row(i: int) -> dict:
+    return {"id": i, "user_id": 1, "room_id": i % 1000, "date_from": date(2030, 1, 1), "date_to": date(2030, 1, 5), "price": 1000}
+
+
+def rows_for(mapper, make_row, n: int) -> list[tuple]:
+    """
+    n строк в порядке колонок mapper.columns() — так, как их вернёт select(*mapper.columns()).
+    """
+    keys = [column.key for column in mapper.columns()]
+    return [tuple(make_row(i)[key] for key in keys) for i in range(n)]
+
+
+def orm_objects(model, mapper, rows: list[tuple], **relations) -> list:
+    keys = [column.key for column in mapper.columns()]
+    return [model(**dict(zip(keys, row)), **relations) for row in rows]
+
+
+def compare(name: str, old, new, repeat: int) -> None:
+    old_time = min(timeit.repeat(old, number=1, repeat=repeat)) * 1000
+    new_time = min(timeit.repeat(new, number=1, repeat=repeat)) * 1000
+    print(f"{name:>13}: old {old_time:8.1f} ms   new {new_time:8.1f} ms   x{old_time / new_time:.1f}")
+
+
+def main(args) -> None:
+    configure_mappers()
+    n = args.rows
+
+    cases = [
+        ("Hotel", HotelsOrm, HotelDataMapper, rows_for(HotelDataMapper, hotel_row, n)),
+        ("Room", RoomsOrm, RoomDataMapper, rows_for(RoomDataMapper, room_row, n)),
+        ("Booking", BookingsOrm, BookingDataMapper, rows_for(BookingDataMapper, booking_row, n)),
+    ]
+    for name, model, mapper, rows in cases:
+        # Старый путь включает создание ORM-объектов — это делает сессия при загрузке select(Model)
+        compare(
+            name,
+            lambda: [mapper.map_to_domain_entity(obj) for obj in orm_objects(model, mapper, rows)],
+            lambda: mapper.map_rows_to_domain_entities(rows),
+            args.repeat,
+        )
+
+    rooms_rows = rows_for(RoomDataWithRelsMapper, room_row, n)
+    keys = [column.key for column in RoomDataWithRelsMapper.columns()]
+    facilities = [{"id": facility.id, "title": facility.title} for facility in FACILITIES]
+    compare(
+        "RoomWithRels",
+        lambda: [RoomDataWithRelsMapper.map_to_domain_entity(obj) for obj in orm_objects(RoomsOrm, RoomDataWithRelsMapper, rooms_rows, facilities=FACILITIES)],
+        lambda: RoomDataWithRelsMapper.map_dicts_to_domain_entities([{**dict(zip(keys, row)), "facilities": facilities} for row in rooms_rows]),
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
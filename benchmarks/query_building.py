@@ -0,0 +1,120 @@
+"""
+Микробенчмарк Python-стороны горячих запросов доступности: построение выражения и компиляция на один запрос.
+
+- old — как раньше: дерево выражения строится заново на каждый запрос со значениями внутри
+- new — закэшированные запросы репозиториев с bind-параметрами (значения передаются при выполнении)
+
+Для каждого запроса измеряется то, что происходит на Python-стороне при session.execute:
+построение выражения, вычисление ключа кэша компиляции SQLAlchemy и поиск в нём
+(компиляция — только при промахе). Отдельно показана полная компиляция без кэша.
+
+Запуск (нужны переменные окружения приложения, БД не используется):
+    python -m benchmarks.query_building --repeat 2000
+"""
+
+import argparse
+import timeit
+from datetime import date
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from src.models import *  # noqa: F403
+from src.models.hotels import HotelsOrm
+from src.models.rooms import RoomsOrm
+from src.repositories.hotels import HotelsRepository
+from src.repositories.mappers.mappers import HotelDataMapper, RoomDataWithRelsMapper
+from src.repositories.rooms import _free_rooms_query
+from src.repositories.utils import free_rooms_params, room_is_free, rooms_ids_for_booking, search_term, text_search
+
+DIALECT = asyncpg_dialect()
+DATE_FROM, DATE_TO = date(2030, 6, 1), date(2030, 6, 10)
+
+
+def legacy_rooms_ids_for_booking(date_from: date, date_to: date, hotel_id: int | None):
+    query = select(RoomsOrm.id).filter(room_is_free(date_from, date_to))
+    if hotel_id is not None:
+        query = query.filter(RoomsOrm.hotel_id == hotel_id)
+    return query
+
+
+def legacy_hotels_query(date_from: date, date_to: date, location: str | None, limit: int, offset: int):
+    free_room_exists = select(RoomsOrm.id).filter(RoomsOrm.hotel_id == HotelsOrm.id, room_is_free(date_from, date_to)).exists()
+    query = select(*HotelDataMapper.columns())
+    if location:
+        query = query.filter(text_search(HotelsOrm.location, search_term(location)))
+    return query.filter(free_room_exists).order_by(HotelsOrm.id).limit(limit).offset(offset)
+
+
+def legacy_rooms_query(hotel_id: int, date_from: date, date_to: date):
+    return select(*RoomDataWithRelsMapper.columns()).filter(RoomsOrm.hotel_id == hotel_id, room_is_free(date_from, date_to))
+
+
+def new_hotels_query(date_from: date, date_to: date, location: str | None, limit: int, offset: int):
+    query, params = HotelsRepository._filtered_by_time_query(date_from, date_to, location, None, False, paged=False)
+    return query, {**params, "limit": limit, "offset": offset}
+
+
+def new_rooms_query(hotel_id: int, date_from: date, date_to: date):
+    in_memory, params = free_rooms_params(date_from, date_to, hotel_id)
+    return _free_rooms_query(in_memory), {"hotel_id": hotel_id, **params}
+
+
+def execute_side(query, compiled_cache: dict) -> None:
+    """
+    Python-работа SQLAlchemy перед отправкой запроса: ключ кэша компиляции и компиляция при промахе.
+    """
+    key = query._generate_cache_key().key
+    if key not in compiled_cache:
+        compiled_cache[key] = query.compile(dialect=DIALECT)
+
+
+def measure(build, repeat: int, compile_always: bool = False) -> float:
+    """
+    Среднее время на один запрос, мкс. Каждый запрос получает свои значения параметров.
+    """
+    compiled_cache = {}
+    counter = iter(range(10**9))
+
+    def one_request():
+        i = next(counter)
+        query = build(i)
+        query = query[0] if isinstance(query, tuple) else query
+        if compile_always:
+            query.compile(dialect=DIALECT)
+        else:
+            execute_side(query, compiled_cache)
+
+    one_request()  # Прогрев: первая компиляция и заполнение кэшей построителей
+    return min(timeit.repeat(one_request, number=repeat, repeat=5)) / repeat * 1_000_000
+
+
+def main(args) -> None:
+    cases = [
+        (
+            "rooms_ids_for_booking",
+            lambda i: legacy_rooms_ids_for_booking(DATE_FROM, DATE_TO, i % 100),
+            lambda i: rooms_ids_for_booking(DATE_FROM, DATE_TO, i % 100),
+        ),
+        (
+            "hotels.get_filtered_by_time",
+            lambda i: legacy_hotels_query(DATE_FROM, DATE_TO, f"city_{i % 100}", 10, i % 5 * 10),
+            lambda i: new_hotels_query(DATE_FROM, DATE_TO, f"city_{i % 100}", 10, i % 5 * 10),
+        ),
+        (
+            "rooms.get_filtered_by_time",
+            lambda i: legacy_rooms_query(i % 100, DATE_FROM, DATE_TO),
+            lambda i: new_rooms_query(i % 100, DATE_FROM, DATE_TO),
+        ),
+    ]
+    print(f"{'':>28}  {'old':>10}  {'new':>10}  {'old, без кэша компиляции':>26}")
+    for name, old, new in cases:
+        old_time, new_time = measure(old, args.repeat), measure(new, args.repeat)
+        cold_time = measure(old, args.repeat, compile_always=True)
+        print(f"{name:>28}: {old_time:7.1f} мкс {new_time:7.1f} мкс {cold_time:13.1f} мкс   x{old_time / new_time:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    main(parser.parse_args())
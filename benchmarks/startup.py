@@ -0,0 +1,98 @@
+"""
+Холодный старт веб-процесса: время импорта src.main и время до первого ответа.
+
+- import — `python -X importtime -c "import src.main"`: общее время импорта и самые тяжёлые
+  пакеты верхнего уровня (сумма собственного времени их модулей), а также проверка, что Celery и Pillow
+  не загружаются в веб-процесс при старте
+- first response — от запуска `python src/main.py` (uvicorn с lifespan: Redis, прогрев пулов)
+  до первого успешного ответа на --path
+
+Каждое измерение повторяется --repeat раз в новом процессе, печатается медиана.
+
+Запуск (нужны переменные окружения приложения; для first response — работающие PostgreSQL и Redis):
+    python -m benchmarks.startup --repeat 5 --port 8123
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+# Модули, которые веб-процессу не нужны до первого использования
+LAZY_MODULES = ("celery", "kombu", "billiard", "PIL", "src.tasks.tasks")
+
+CHECK_LAZY_MODULES = f"""
+import sys
+import src.main
+print(",".join(name for name in {LAZY_MODULES!r} if name in sys.modules))
+"""
+
+
+def import_profile() -> tuple[float, dict[str, float]]:
+    """
+    Один прогон -X importtime: (общее время импорта src.main, мс; собственное время модулей по пакетам верхнего уровня, мс).
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import src.main"], capture_output=True, text=True, check=True)
+    packages: dict[str, float] = defaultdict(float)
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, cumulative, name = (part.strip() for part in line.removeprefix("import time:").split("|"))
+        # Собственное время модуля (без вложенных импортов) суммируется по пакету верхнего уровня
+        packages[name.split(".")[0]] += int(own) / 1000
+        if name == "src.main":
+            total = int(cumulative) / 1000
+    return total, packages
+
+
+def first_response(port: int, path: str) -> float:
+    """
+    Секунды от запуска сервера до первого ответа 200.
+    """
+    env = {**os.environ, "APP_PORT": str(port), "APP_WORKERS": "1"}
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "src/main.py"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}{path}", timeout=1).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            if server.poll() is not None:
+                raise RuntimeError("Сервер завершился до первого ответа")
+            time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(args) -> None:
+    loaded = subprocess.run([sys.executable, "-c", CHECK_LAZY_MODULES], capture_output=True, text=True, check=True).stdout.strip()
+    print(f"Загружены при старте: {loaded or 'нет'} (ожидается: нет)")
+
+    profiles = [import_profile() for _ in range(args.repeat)]
+    print(f"import src.main: {statistics.median(total for total, _ in profiles):.0f} ms")
+    packages = {name: statistics.median(profile[name] for _, profile in profiles) for name in profiles[0][1]}
+    for name, elapsed in sorted(packages.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"  {name:>20}: {elapsed:7.1f} ms")
+
+    if not args.skip_server:
+        times = [first_response(args.port, args.path) for _ in range(args.repeat)]
+        print(f"first response ({args.path}): {statistics.median(times) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="сколько самых тяжёлых пакетов показать")
+    parser.add_argument("--port", type=int, default=8123)
+    parser.add_argument("--path", default="/docs")
+    parser.add_argument("--skip-server", action="store_true", help="только профиль импорта")
+    main(parser.parse_args())
@@ -1,9 +1,22 @@
-from fastapi import APIRouter
-
-from src.api.dependencies import DBDep, UserIdDep
-from src.exceptions import AllRoomsAreBookedException, AllRoomsAreBookedHTTPException
+from typing import Literal
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+
+from src.api.dependencies import CursorDep, DBDep, DBReadOnlyDep, PaginationDep, ReadOnlySessionFactoryDep, UserIdDep
+from src.exceptions import (
+    AllRoomsAreBookedException,
+    AllRoomsAreBookedHTTPException,
+    IncorrectCursorException,
+    IncorrectCursorHTTPException,
+    RoomNotFoundException,
+    RoomNotFoundHTTPException,
+    TransactionConflictException,
+    TransactionConflictHTTPException,
+)
 from src.schemas.bookings import BookingAddRequest
 from src.services.bookings import BookingService
+from src.utils.db_manager import DBManager
 
 router = APIRouter(prefix="/bookings", tags=["Бронирования"])
 
@@ -19,6 +32,12 @@ router = APIRouter(prefix="/bookings", tags=["Бронирования"])
     GET /bookings/me:
         Получение всех бронирований текущего пользователя.
 
+    GET /bookings/export:
+        Потоковая выгрузка всех бронирований в NDJSON или JSON-массив.
+
+    GET-маршруты поддерживают пагинацию page/per_page и курсорную пагинацию (?cursor=),
+    в которой ответ содержит next_cursor для следующей страницы.
+
     Args:
         user_id (int): ID авторизованного пользователя для маршрутов, связанных с пользователем.
         db (DBDep): Зависимость для доступа к базе данных.
@@ -56,35 +75,75 @@ async def add_booking(
         dict: Статус ответа с данными о бронировании.
 
     Raises:
-        HTTPException: Если номер не найден или все номера заняты.
+        HTTPException: Если номер не найден, все номера заняты или бронь не прошла из-за одновременных изменений (409).
     """
     try:
         booking = await BookingService(db).add_booking(user_id, booking_data)
+    except RoomNotFoundException:
+        raise RoomNotFoundHTTPException
     except AllRoomsAreBookedException:
         raise AllRoomsAreBookedHTTPException
+    except TransactionConflictException:
+        raise TransactionConflictHTTPException
     return {"status": "OK", "data": booking}  # Возвращаем успешный ответ с данными о бронировании
 
 
 @router.get("")
-async def get_bookings(db: DBDep):
+async def get_bookings(db: DBReadOnlyDep, pagination: PaginationDep, cursor: CursorDep):
     """
     Получает все бронирования (для администраторов).
 
     Этот маршрут позволяет администратору получить список всех бронирований.
 
     Args:
-        db (DBDep): Зависимость для доступа к базе данных.
+        db (DBReadOnlyDep): Доступ к базе данных только на чтение (реплика, если настроена).
+        pagination (PaginationDep): Страница и размер страницы (без per_page — все бронирования).
+        cursor (CursorDep): Курсор страницы; если передан — ответ с next_cursor.
 
     Returns:
         list: Список всех бронирований.
+        dict: Страница бронирований и next_cursor (в режиме курсора).
+    """
+    if cursor.cursor is not None:
+        return await get_bookings_page(db, cursor.cursor, pagination.per_page)
+    return await BookingService(db).get_bookings(pagination)
+
+
+@router.get("/export")
+async def export_bookings(
+    session_factory: ReadOnlySessionFactoryDep,
+    export_format: Literal["ndjson", "json"] = Query("ndjson", alias="format", description="Формат выгрузки"),
+):
+    """
+    Потоковая выгрузка всех бронирований (для администраторов).
+
+    Ответ формируется по мере чтения серверного курсора, поэтому память не растёт
+    с размером таблицы. Сессия открывается внутри генератора: StreamingResponse
+    отдаёт данные уже после завершения зависимостей ручки.
+
+    Args:
+        session_factory (ReadOnlySessionFactoryDep): Фабрика read-only сессий БД (реплика, если настроена).
+        export_format (str): "ndjson" (объект на строку) или "json" (массив).
+
+    Returns:
+        StreamingResponse: Поток бронирований.
     """
-    return await BookingService(db).get_bookings()
+
+    async def content():
+        async with DBManager(session_factory=session_factory, read_only=True) as db:
+            async for chunk in BookingService(db).export_bookings(export_format):
+                yield chunk
+
+    media_type = "application/x-ndjson" if export_format == "ndjson" else "application/json"
+    return StreamingResponse(content(), media_type=media_type)
 
 
 @router.get("/me")
 async def get_my_bookings(
-    db: DBDep,
+    db: DBReadOnlyDep,
     user_id: UserIdDep,
+    pagination: PaginationDep,
+    cursor: CursorDep,
 ):
     """
     Получает все бронирования текущего пользователя.
@@ -92,11 +151,26 @@ async def get_my_bookings(
     Этот маршрут позволяет пользователю получить список своих бронирований.
 
     Args:
-        db (DBDep): Зависимость для доступа к базе данных.
+        db (DBReadOnlyDep): Доступ к базе данных только на чтение (реплика, если настроена).
         user_id (int): ID текущего пользователя.
+        pagination (PaginationDep): Страница и размер страницы (без per_page — все бронирования).
+        cursor (CursorDep): Курсор страницы; если передан — ответ с next_cursor.
 
     Returns:
         dict: Список бронирований текущего пользователя.
     """
-    bookings = await BookingService(db).get_my_bookings(user_id)
+    if cursor.cursor is not None:
+        return await get_bookings_page(db, cursor.cursor, pagination.per_page, user_id=user_id)
+    bookings = await BookingService(db).get_my_bookings(user_id, pagination)
     return {"status": "OK", "data": bookings}
+
+
+async def get_bookings_page(db, cursor: str, per_page: int | None, **filter_by) -> dict:
+    """
+    Ответ курсорной пагинации бронирований: данные страницы и курсор следующей.
+    """
+    try:
+        bookings, next_cursor = await BookingService(db).get_bookings_page(cursor, per_page, **filter_by)
+    except IncorrectCursorException:
+        raise IncorrectCursorHTTPException
+    return {"status": "OK", "data": bookings, "next_cursor": next_cursor}
@@ -1,11 +1,14 @@
+from contextlib import asynccontextmanager
 from typing import Annotated
 from fastapi import Depends, Query, Request
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
-from src.database import async_session_maker
+from src.database import async_session_maker, async_session_maker_read_only
 from src.exceptions import IncorrectTokenHTTPException, IncorrectTokenException, NoAccessTokenHTTPException
 from src.services.auth import AuthService
 from src.utils.db_manager import DBManager
+from src.utils.db_pool import observe_request_connections
 
 
 # ⚙️ Параметры пагинации, автоматически парсятся из query (?page=1&per_page=20)
@@ -25,6 +28,21 @@ class PaginationParams(BaseModel):
 PaginationDep = Annotated[PaginationParams, Depends()]
 
 
+# 🔖 Курсорная (keyset) пагинация: ?cursor= — первая страница, дальше ?cursor=<next_cursor>
+class CursorParams(BaseModel):
+    """
+    Модель параметра курсорной пагинации.
+
+    - cursor: непрозрачный курсор из next_cursor предыдущего ответа (пустая строка — первая страница);
+      если не передан, ручка работает в обычном режиме page/per_page
+    """
+
+    cursor: Annotated[str | None, Query(None, description="Курсор страницы (пустой — первая страница)")]
+
+
+CursorDep = Annotated[CursorParams, Depends()]
+
+
 # 🔐 Получение access_token из cookie
 def get_token(request: Request) -> str:
     """
@@ -58,6 +76,16 @@ def get_current_user_id(token: str = Depends(get_token)) -> int:
 UserIdDep = Annotated[int, Depends(get_current_user_id)]
 
 
+# 🔢 DBManager на время запроса: по завершении число взятых соединений попадает в метрику db_request_connections
+@asynccontextmanager
+async def request_db(dependency: str, session_factory, read_only: bool = False):
+    async with DBManager(session_factory=session_factory, read_only=read_only) as db:
+        try:
+            yield db
+        finally:
+            observe_request_connections(dependency, db.connections_acquired)
+
+
 # 🗄️ Асинхронный генератор доступа к БД
 async def get_db():
     """
@@ -68,9 +96,50 @@ async def get_db():
 
     :yield: DBManager (внутри открытая сессия)
     """
-    async with DBManager(session_factory=async_session_maker) as db:
+    async with request_db("primary", async_session_maker) as db:
         yield db
 
 
 # 💾 Тип-зависимость: доступ к репозиториям через DBManager
 DBDep = Annotated[DBManager, Depends(get_db)]
+
+
+# 📖 Доступ к БД только на чтение (реплика, если настроена) — для некэшируемых списков (бронирования).
+# Реплика может немного отставать: только что созданная бронь появится в списке с задержкой репликации
+async def get_db_read_only():
+    """
+    Как get_db, но транзакции открываются как READ ONLY на движке реплики
+    (или основной БД, если реплика не настроена).
+
+    :yield: DBManager (read-only)
+    """
+    async with request_db("read_only", async_session_maker_read_only, read_only=True) as db:
+        yield db
+
+
+DBReadOnlyDep = Annotated[DBManager, Depends(get_db_read_only)]
+
+
+# 🗄️ Доступ к БД только на чтение для кэшируемых GET-ручек — всегда основная БД, не реплика
+async def get_db_cached():
+    """
+    Как get_db_read_only, но на основной БД. Теги кэша сбрасываются сразу после commit на основной БД:
+    промах, прочитанный с отстающей реплики, сохранил бы старый ответ под новой версией тегов на CACHE_EXPIRE.
+    Ручке, отданной из кэша, соединение не нужно, поэтому нагрузка на основную БД — только промахи.
+
+    :yield: DBManager (read-only)
+    """
+    async with request_db("cached", async_session_maker, read_only=True) as db:
+        yield db
+
+
+DBCachedDep = Annotated[DBManager, Depends(get_db_cached)]
+
+
+# 🏭 Фабрика read-only сессий (реплика, если настроена) для ручек, которые открывают DBManager сами
+# (например, потоковые ответы: StreamingResponse читает данные уже после выхода из зависимостей)
+def get_session_factory_read_only():
+    return async_session_maker_read_only
+
+
+ReadOnlySessionFactoryDep = Annotated[async_sessionmaker, Depends(get_session_factory_read_only)]
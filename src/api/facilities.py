@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Body
-from fastapi_cache.decorator import cache
 
-from src.api.dependencies import DBDep  # Зависимость — доступ к базе данных
+from src.api.dependencies import DBDep, DBCachedDep  # Зависимости — доступ к базе данных (read-only — для кэшируемых ручек)
 from src.schemas.facilities import FacilityAdd  # Pydantic-схема для создания услуги
+from src.config import settings
 from src.services.facilities import FacilityService  # Сервис для работы с удобствами
+from src.utils.cache import FACILITIES_TAG, cache  # Кэш ответов с инвалидацией по тегам
 
 router = APIRouter(prefix="/facilities", tags=["Услуги"])
 
@@ -22,11 +23,12 @@ async def create_facilities(db: DBDep, facility_data: FacilityAdd = Body()):
 
 
 @router.get("")
-@cache(expire=10)
-async def get_facilities(db: DBDep):
+@cache(expire=settings.CACHE_EXPIRE, fresh=settings.CACHE_FRESH, beta=settings.CACHE_XFETCH_BETA, tags=[FACILITIES_TAG])
+async def get_facilities(db: DBCachedDep):
     """
     Получение списка всех доступных услуг (удобств).
-    Кэшируется на 10 секунд, чтобы уменьшить нагрузку на базу данных.
+    Кэшируется на CACHE_EXPIRE секунд, чтобы уменьшить нагрузку на базу данных;
+    сбрасывается при добавлении удобства, после CACHE_FRESH секунд обновляется в фоне.
 
     :param db: Зависимость FastAPI — доступ к базе данных
     :return: Список всех удобств
@@ -1,31 +1,36 @@
 from datetime import date
-from fastapi_cache.decorator import cache
 from fastapi import APIRouter, Body, Query
-from src.api.dependencies import PaginationDep, DBDep
-from src.exceptions import ObjectNotFoundException, HotelNotFoundException
+from src.config import settings
+from src.api.dependencies import CursorDep, PaginationDep, DBDep, DBCachedDep
+from src.exceptions import ObjectNotFoundException, HotelNotFoundException, IncorrectCursorException, IncorrectCursorHTTPException
 from src.schemas.hotels import HotelPatch, HotelAdd
 from src.services.hotels import HotelService
+from src.utils.cache import AVAILABILITY_TAG, HOTELS_TAG, cache
 
 # Роутер для работы с отелями
 router = APIRouter(prefix="/hotels", tags=["Отели"])
 
 
 @router.get("")
-@cache(expire=10)
+@cache(expire=settings.CACHE_EXPIRE, fresh=settings.CACHE_FRESH, beta=settings.CACHE_XFETCH_BETA, tags=[HOTELS_TAG, AVAILABILITY_TAG])
 async def get_hotels(
     pagination: PaginationDep,  # Параметры пагинации: страница и кол-во элементов
-    db: DBDep,  # Доступ к базе данных
+    db: DBCachedDep,  # Доступ к базе данных только на чтение (основная БД: ответ кэшируется)
+    cursor: CursorDep,  # Курсорная пагинация (если передан ?cursor=)
     location: str | None = Query(None, description="Локация отеля (необязательно)"),
     title: str | None = Query(None, description="Название отеля (необязательно)"),
     date_from: date = Query(example="2025-01-01"),
     date_to: date = Query(example="2025-08-10"),
+    fuzzy: bool = Query(False, description="Нечёткий поиск по локации и названию (терпимый к опечаткам)"),
 ):
     """
     Получение списка отелей по фильтрам: локация, название, дата, пагинация.
 
-    - Кэшируется на 10 секунд
+    - Кэшируется на CACHE_EXPIRE секунд; сбрасывается при изменении отелей и свободных комнат;
+      после CACHE_FRESH секунд отдаётся сразу и обновляется в фоне
     - Проверяет корректность диапазона дат
     - Проводит фильтрацию на уровне базы данных
+    - С ?cursor= возвращает {"status", "data", "next_cursor"} (keyset-пагинация по id отеля)
 
     :param pagination: пагинация (страница и количество на страницу)
     :param db: доступ к репозиториям
@@ -33,14 +38,24 @@ async def get_hotels(
     :param title: фильтрация по названию (необязательная)
     :param date_from: дата начала периода
     :param date_to: дата конца периода
+    :param fuzzy: нечёткий поиск с сортировкой по похожести (необязательный)
+    :param cursor: курсор страницы (необязательный)
     :return: список подходящих отелей
     """
+    if cursor.cursor is not None:
+        try:
+            hotels, next_cursor = await HotelService(db).get_hotels_page(pagination, cursor.cursor, location, title, date_from, date_to, fuzzy)
+        except IncorrectCursorException:
+            raise IncorrectCursorHTTPException
+        return {"status": "OK", "data": hotels, "next_cursor": next_cursor}
+
     return await HotelService(db).get_hotels(
         pagination,
         location,
         title,
         date_from,
         date_to,
+        fuzzy,
     )
 
 
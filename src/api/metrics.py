@@ -0,0 +1,30 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from fastapi_cache import FastAPICache
+
+from src.connectors.two_tier_cache import TwoTierBackend
+from src.utils.cache import is_cache_enabled
+
+from src.database import pooled_engines
+from src.utils.db_pool import pool_metrics, request_connections_metrics
+
+router = APIRouter(tags=["Метрики"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Метрики приложения в текстовом формате Prometheus (для scrape).
+
+    Сейчас — состояние пулов соединений с БД: размер, выданные и свободные соединения,
+    overflow, таймауты и гистограмма времени ожидания соединения; сколько соединений брал за запрос
+    DBManager зависимостей get_db*; при CACHE_BACKEND="two_tier" —
+    обращения к кэшу ответов по уровням (LRU процесса, Redis, промах).
+
+    :return: текст метрик
+    """
+    pools = {name: engine.pool for name, engine in pooled_engines().items()}
+    metrics = pool_metrics(pools) + request_connections_metrics()
+    if is_cache_enabled() and isinstance(FastAPICache.get_backend(), TwoTierBackend):
+        metrics += FastAPICache.get_backend().metrics()
+    return PlainTextResponse(metrics, media_type="text/plain; version=0.0.4")
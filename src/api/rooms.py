@@ -1,24 +1,28 @@
 from datetime import date
 
 from fastapi import APIRouter, Body, Query
-from src.api.dependencies import DBDep
+from src.config import settings
+from src.api.dependencies import DBCachedDep, DBDep
 from src.exceptions import RoomNotFoundException, HotelNotFoundException, HotelNotFoundHTTPException, RoomNotFoundHTTPException
 from src.schemas.rooms import RoomAddRequest, RoomPatchRequest
 from src.services.rooms import RoomService
+from src.utils.cache import cache, hotel_availability_tag
 
 # Создаём роутер с префиксом /hotels и тегом "Номера"
 router = APIRouter(prefix="/hotels", tags=["Номера"])
 
 
 @router.get("/{hotel_id}/rooms")
+@cache(expire=settings.CACHE_EXPIRE, tags=[hotel_availability_tag("{hotel_id}")])
 async def get_rooms(
     hotel_id: int,
-    db: DBDep,
+    db: DBCachedDep,
     date_from: date = Query(example="2024-08-01"),
     date_to: date = Query(example="2024-08-10"),
 ):
     """
     Получение списка свободных комнат в отеле по диапазону дат.
+    Кэшируется на CACHE_EXPIRE секунд; сбрасывается при изменении комнат отеля и бронированиях.
 
     :param hotel_id: ID отеля
     :param db: доступ к БД
@@ -13,6 +13,17 @@ class Settings(BaseSettings):
     # ▶️ Режим запуска приложения
     MODE: Literal["TEST", "LOCAL", "DEV", "PROD"]
 
+    # 🚀 ASGI-сервер uvicorn (python src/main.py). В MODE=LOCAL — один процесс с автоперезагрузкой,
+    # в остальных режимах — APP_WORKERS процессов, у каждого свой пул соединений с БД
+    APP_HOST: str = "0.0.0.0"
+    APP_PORT: int = 8000
+    APP_WORKERS: int = 1  # Число процессов-воркеров
+    APP_LOOP: Literal["auto", "asyncio", "uvloop"] = "uvloop"  # Реализация event loop
+    APP_HTTP: Literal["auto", "h11", "httptools"] = "httptools"  # Парсер HTTP
+    APP_BACKLOG: int = 2048  # Очередь ещё не принятых TCP-соединений
+    APP_KEEP_ALIVE_TIMEOUT: int = 5  # Сколько секунд держать простаивающее keep-alive соединение
+    APP_GRACEFUL_SHUTDOWN_TIMEOUT: int = 30  # Сколько секунд дожидаться активных запросов при остановке
+
     # 📦 Параметры подключения к PostgreSQL
     DB_HOST: str
     DB_PORT: int
@@ -20,9 +31,68 @@ class Settings(BaseSettings):
     DB_PASS: str
     DB_NAME: str
 
+    # 🏊 Пул соединений (на каждый процесс приложения) и таймауты
+    DB_POOL_SIZE: int = 10  # Постоянно открытые соединения
+    DB_MAX_OVERFLOW: int = 20  # Дополнительные соединения сверх DB_POOL_SIZE на пиках
+    DB_POOL_TIMEOUT: float = 10  # Сколько секунд ждать свободного соединения
+    DB_POOL_RECYCLE: int = 1800  # Пересоздавать соединения старше N секунд (-1 — никогда)
+    DB_POOL_PRE_PING: bool = True  # Проверять соединение перед выдачей из пула
+    DB_POOL_WARMUP: bool = True  # Открывать DB_POOL_SIZE соединений при старте приложения
+    DB_STATEMENT_TIMEOUT_MS: int | None = None  # statement_timeout PostgreSQL для сессий приложения
+    DB_COMMAND_TIMEOUT: float | None = None  # Таймаут asyncpg на одну команду, секунды
+
+    # 🔀 Подключение через PgBouncer в режиме pool_mode=transaction (DB_HOST/DB_PORT указывают на пулер):
+    # без кэша подготовленных выражений, с уникальными именами выражений и без пула на стороне приложения.
+    # statement_timeout в этом режиме не передаётся при подключении — задайте его для роли (ALTER ROLE ... SET)
+    DB_PGBOUNCER: bool = False
+
+    # 📖 Реплика PostgreSQL для read-only запросов без кэша ответов (кэшируемые ручки читают с основной БД,
+    # чтобы не закэшировать отставание реплики). Если DB_REPLICA_HOST не задан — читаем с основной БД.
+    # Не заданные порт/пользователь/пароль/имя БД берутся от основной БД
+    DB_REPLICA_HOST: str | None = None
+    DB_REPLICA_PORT: int | None = None
+    DB_REPLICA_USER: str | None = None
+    DB_REPLICA_PASS: str | None = None
+    DB_REPLICA_NAME: str | None = None
+
     # ⚡ Параметры подключения к Redis
     REDIS_HOST: str
     REDIS_PORT: int
+    REDIS_MAX_CONNECTIONS: int = 50  # Размер пула соединений с Redis (на процесс)
+    REDIS_POOL_TIMEOUT: float = 5  # Сколько секунд ждать свободного соединения из пула
+    REDIS_SOCKET_TIMEOUT: float | None = 2  # Таймаут команды, секунды
+    REDIS_SOCKET_CONNECT_TIMEOUT: float | None = 2  # Таймаут установки соединения, секунды
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30  # PING соединения, простаивавшего дольше N секунд, перед командой
+
+    # 🗄️ Время жизни закэшированных ответов GET-ручек, секунды. Записи инвалидируются по тегам
+    # при изменении данных, поэтому TTL ограничивает только объём кэша, а не свежесть ответов
+    CACHE_EXPIRE: int = 3600
+
+    # 🧊 Бэкенд кэша ответов: "redis" — только Redis, "two_tier" — in-process LRU перед Redis
+    # (изменения рассылаются остальным процессам через pub/sub канал CACHE_INVALIDATION_CHANNEL)
+    CACHE_BACKEND: Literal["redis", "two_tier"] = "redis"
+    CACHE_LOCAL_MAX_ITEMS: int = 1024  # Записей в LRU каждого процесса
+    CACHE_LOCAL_MAX_BYTES: int = 16 * 1024 * 1024  # Суммарный размер значений в LRU, байты
+    CACHE_LOCAL_TTL: float = 30  # Сколько секунд локальная копия живёт без сверки с Redis (на случай потери pub/sub)
+    CACHE_INVALIDATION_CHANNEL: str = "fastapi-cache:invalidate"
+
+    # 🚦 Объединение одновременных промахов кэша по одному ключу: "local" — одно вычисление на процесс,
+    # "redis" — одно на кластер (блокировка в Redis; остальные ждут CACHE_LOCK_WAIT секунд или отдают
+    # устаревшую копию ответа), "none" — каждый запрос вычисляет ответ сам
+    CACHE_COALESCE: Literal["none", "local", "redis"] = "local"
+    CACHE_LOCK_TIMEOUT: float = 10  # Время жизни блокировки, секунды (больше самого долгого вычисления ответа)
+    CACHE_LOCK_WAIT: float = 2  # Сколько секунд ждать ответа от процесса, который держит блокировку
+    CACHE_STALE_EXPIRE: int = 86400  # Время жизни устаревших копий ответов для режима "redis", секунды
+
+    # ♻️ Stale-while-revalidate для поиска отелей и списка удобств: запись свежая CACHE_FRESH секунд,
+    # затем до CACHE_EXPIRE отдаётся сразу, а новая вычисляется в фоне. CACHE_XFETCH_BETA > 0 —
+    # горячие записи обновляются ещё до конца CACHE_FRESH (вероятностно, XFetch), 0 — только после
+    CACHE_FRESH: int = 3000
+    CACHE_XFETCH_BETA: float = 1.0
+
+    # 🏷️ Read-through кэш отелей и комнат по id (в том же бэкенде, что и кэш ответов).
+    # Сервисы удаляют изменённые объекты после commit; TTL ограничивает устаревание при гонке чтения с записью
+    ENTITY_CACHE_EXPIRE: int = 600
 
     @property
     def REDIS_URL(self) -> str:
@@ -39,11 +109,39 @@ class Settings(BaseSettings):
         """
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    @property
+    def DB_REPLICA_URL(self) -> str | None:
+        """
+        URL подключения к реплике или None, если реплика не настроена.
+        """
+        if not self.DB_REPLICA_HOST:
+            return None
+        user = self.DB_REPLICA_USER or self.DB_USER
+        password = self.DB_REPLICA_PASS or self.DB_PASS
+        port = self.DB_REPLICA_PORT or self.DB_PORT
+        name = self.DB_REPLICA_NAME or self.DB_NAME
+        return f"postgresql+asyncpg://{user}:{password}@{self.DB_REPLICA_HOST}:{port}/{name}"
+
     # 🔐 JWT-настройки
     JWT_SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int  # Время жизни токена в минутах
 
+    # 🏨 Источник данных о свободных комнатах:
+    # "sql" — запрос к БД на каждый поиск, "memory" — in-memory индекс (SQL остаётся запасным вариантом).
+    # Индексы процессов синхронизируются через канал Redis pub/sub AVAILABILITY_INDEX_CHANNEL
+    AVAILABILITY_ENGINE: Literal["sql", "memory"] = "sql"
+    AVAILABILITY_INDEX_CHANNEL: str = "availability-index"
+
+    # 🔒 Защита от овербукинга при одновременных бронированиях одной комнаты:
+    # "advisory" — pg_advisory_xact_lock по room_id, "row" — блокировка строки комнаты (FOR NO KEY UPDATE),
+    # "serializable" — транзакция SERIALIZABLE с повтором, "none" — без блокировок
+    BOOKING_LOCK_MODE: Literal["none", "advisory", "row", "serializable"] = "advisory"
+    DB_SERIALIZATION_RETRIES: int = 3  # Сколько раз повторять транзакцию при ошибке сериализации
+
+    # 🌊 Сколько строк за раз забирать из серверного курсора при потоковой выгрузке (stream_filtered)
+    DB_STREAM_CHUNK_SIZE: int = 1000
+
     # 📄 Загрузка переменных из файла .env в корне проекта
     model_config = SettingsConfigDict(env_file=".env")
 
@@ -1,5 +1,8 @@
 import logging
+from collections.abc import Awaitable, Callable, Iterable
+
 import redis.asyncio as redis
+from redis.commands.core import AsyncScript
 
 
 class RedisManager:
@@ -7,30 +10,64 @@ class RedisManager:
     Класс для управления асинхронным подключением к Redis.
 
     Позволяет:
-    - устанавливать соединение
-    - устанавливать/получать/удалять ключи
+    - устанавливать соединение (пул ограниченного размера, таймауты, проверка соединений)
+    - устанавливать/получать/удалять ключи, в том числе пачкой (mget/mset)
+    - выполнять команды конвейером или транзакцией (pipeline, transaction)
+    - отправлять сообщения в каналы pub/sub (publish)
+    - регистрировать Lua-скрипты и выполнять их через EVALSHA (run_script)
     - закрывать соединение
     """
 
-    def __init__(self, host: str, port: int):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        max_connections: int = 50,
+        pool_timeout: float | None = 5,
+        socket_timeout: float | None = None,
+        socket_connect_timeout: float | None = None,
+        health_check_interval: int = 0,
+    ):
         """
         Инициализация параметров подключения.
 
         :param host: адрес Redis-сервера
         :param port: порт Redis-сервера
+        :param max_connections: размер пула соединений; при исчерпании запрос ждёт свободное соединение
+        :param pool_timeout: сколько секунд ждать свободного соединения (None — без ограничения)
+        :param socket_timeout: таймаут чтения/записи команды, секунды (None — без таймаута)
+        :param socket_connect_timeout: таймаут установки соединения, секунды
+        :param health_check_interval: PING перед командой на соединении, простаивавшем дольше N секунд (0 — без проверки)
         """
         self.host = host
         self.port = port
+        self.max_connections = max_connections
+        self.pool_timeout = pool_timeout
+        self.socket_timeout = socket_timeout
+        self.socket_connect_timeout = socket_connect_timeout
+        self.health_check_interval = health_check_interval
         self.redis = None  # Объект Redis будет создан при connect()
+        self._scripts_sources: dict[str, str] = {}  # Имя скрипта → исходный код Lua
+        self._scripts: dict[str, AsyncScript] = {}  # Имя скрипта → скрипт, привязанный к клиенту
 
     async def connect(self):
         """
         Подключение к Redis.
 
-        Создаёт асинхронный клиент Redis и логирует событие.
+        Создаёт асинхронный клиент Redis с пулом соединений и логирует событие.
         """
         logging.info(f"Connecting to Redis server -> host={self.host} port={self.port}")
-        self.redis = await redis.Redis(host=self.host, port=self.port)
+        pool = redis.BlockingConnectionPool(
+            host=self.host,
+            port=self.port,
+            max_connections=self.max_connections,
+            timeout=self.pool_timeout,
+            socket_timeout=self.socket_timeout,
+            socket_connect_timeout=self.socket_connect_timeout,
+            health_check_interval=self.health_check_interval,
+        )
+        self.redis = redis.Redis.from_pool(pool)  # Клиент владеет пулом и закрывает его в close()
+        self._scripts = {name: self.redis.register_script(source) for name, source in self._scripts_sources.items()}
         logging.info(f"Connected to Redis server -> host={self.host} port={self.port}")
 
     async def set(self, key: str, value: str, expire: int = None):
@@ -55,20 +92,106 @@ class RedisManager:
         """
         return await self.redis.get(key)
 
-    async def delete(self, key: str):
+    async def mget(self, keys: Iterable[str]) -> list:
         """
-        Удаление ключа из Redis.
+        Получение значений нескольких ключей за один запрос (MGET).
 
-        :param key: ключ
+        :param keys: ключи
+        :return: значения в порядке ключей (None для отсутствующих)
+        """
+        keys = list(keys)
+        if not keys:
+            return []
+        return await self.redis.mget(keys)
+
+    async def mset(self, values: dict, expire: int = None):
+        """
+        Установка нескольких ключей за один запрос: MSET, а с expire — конвейер SET EX.
+
+        :param values: словарь ключ → значение
+        :param expire: время жизни ключей в секундах (опционально)
+        """
+        if not values:
+            return
+        if not expire:
+            await self.redis.mset(values)
+            return
+        async with self.pipeline() as pipe:
+            for key, value in values.items():
+                pipe.set(key, value, ex=expire)
+            await pipe.execute()
+
+    async def delete(self, *keys: str):
+        """
+        Удаление ключей из Redis (одним запросом).
+
+        :param keys: ключи
+        """
+        if keys:
+            await self.redis.delete(*keys)
+
+    async def publish(self, channel: str, message: str) -> int:
+        """
+        Отправка сообщения в канал pub/sub.
+
+        :param channel: канал
+        :param message: сообщение
+        :return: сколько подписчиков получили сообщение
+        """
+        return await self.redis.publish(channel, message)
+
+    def pipeline(self, transaction: bool = False):
+        """
+        Конвейер: команды накапливаются и отправляются одним запросом при execute().
+        С transaction=True выполняются атомарно (MULTI/EXEC).
+
+        Пример: async with redis_manager.pipeline() as pipe: pipe.incr("a").incr("b"); await pipe.execute()
+
+        :param transaction: обернуть команды в MULTI/EXEC
+        :return: конвейер redis-py (асинхронный контекстный менеджер)
+        """
+        return self.redis.pipeline(transaction=transaction)
+
+    async def transaction(self, func: Callable[..., Awaitable], *watch_keys: str):
+        """
+        Оптимистичная транзакция: WATCH ключей, чтение и MULTI/EXEC внутри func.
+        Если наблюдаемый ключ изменился до EXEC, func вызывается заново.
+
+        :param func: async-функция от конвейера (читает сразу, после pipe.multi() — накапливает команды)
+        :param watch_keys: ключи, изменение которых отменяет транзакцию
+        :return: результаты команд EXEC
+        """
+        return await self.redis.transaction(func, *watch_keys)
+
+    def register_script(self, name: str, source: str) -> None:
+        """
+        Регистрация Lua-скрипта. Можно вызывать до connect(): скрипт привяжется к клиенту при подключении.
+        Выполняется через EVALSHA; если Redis не знает скрипт (перезапуск, SCRIPT FLUSH), он загружается заново.
+
+        :param name: имя скрипта для run_script
+        :param source: исходный код на Lua
+        """
+        self._scripts_sources[name] = source
+        if self.redis is not None:
+            self._scripts[name] = self.redis.register_script(source)
+
+    async def run_script(self, name: str, keys: list | None = None, args: list | None = None):
+        """
+        Выполнение зарегистрированного Lua-скрипта.
+
+        :param name: имя скрипта (см. register_script)
+        :param keys: ключи (KEYS в скрипте)
+        :param args: аргументы (ARGV в скрипте)
+        :return: результат скрипта
         """
-        await self.redis.delete(key)
+        return await self._scripts[name](keys=keys or [], args=args or [])
 
     async def close(self):
         """
-        Закрытие подключения к Redis.
+        Закрытие подключения к Redis (вместе с пулом соединений).
         """
         if self.redis:
-            await self.redis.close()
+            await self.redis.aclose()
 
 
 # Пример использования:
@@ -76,5 +199,7 @@ class RedisManager:
 # await redis_manager.connect()
 # await redis_manager.set("key", "value", expire=60)
 # value = await redis_manager.get("key")
+# await redis_manager.mset({"a": 1, "b": 2}, expire=60)
+# values = await redis_manager.mget(["a", "b"])
 # await redis_manager.delete("key")
 # await redis_manager.close()
@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+
+from fastapi_cache.backends import Backend
+
+from src.connectors.redis_connector import RedisManager
+
+
+class LocalCache:
+    """
+    In-process LRU: ограничен числом записей, суммарным размером значений и временем жизни записи.
+    Значение None — ключа нет в Redis (отрицательное кэширование). Для каждой записи хранится и момент
+    её истечения в Redis — по нему считается оставшийся TTL (нужен, например, для stale-while-revalidate).
+    """
+
+    def __init__(self, max_items: int, max_bytes: int, ttl: float):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0  # Суммарный размер значений, байты
+        self._items: OrderedDict[str, tuple[float, bytes | None, float | None]] = OrderedDict()  # ключ → (истекает в, значение, истекает в Redis)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: str) -> tuple[float, bytes | None, float | None] | None:
+        """
+        :return: (момент истечения по time.monotonic, значение, момент истечения в Redis или None) или None
+        """
+        item = self._items.get(key)
+        if item is None:
+            return None
+        if item[0] <= time.monotonic():
+            self.pop(key)
+            return None
+        self._items.move_to_end(key)
+        return item
+
+    def set(self, key: str, value: bytes | None, expire: float | None = None) -> None:
+        """
+        :param expire: оставшееся время жизни записи в Redis, секунды — локальная копия не живёт дольше
+        """
+        self.pop(key)
+        size = len(value or b"")
+        if size > self.max_bytes:
+            return
+        now = time.monotonic()
+        ttl = self.ttl if expire is None else min(self.ttl, expire)
+        self._items[key] = (now + ttl, value, None if expire is None else now + expire)
+        self.size += size
+        while len(self._items) > self.max_items or self.size > self.max_bytes:
+            _, (_, evicted, _) = self._items.popitem(last=False)
+            self.size -= len(evicted or b"")
+
+    def pop(self, key: str) -> None:
+        item = self._items.pop(key, None)
+        if item is not None:
+            self.size -= len(item[1] or b"")
+
+    def pop_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._items if key.startswith(prefix)]:
+            self.pop(key)
+
+    def clear(self) -> None:
+        self._items.clear()
+        self.size = 0
+
+
+class TwoTierBackend(Backend):
+    """
+    Бэкенд fastapi_cache: in-process LRU перед Redis.
+
+    - чтение: сначала локальная копия, затем Redis (ответ кладётся в LRU не дольше его TTL в Redis;
+      в mget запоминается и отсутствие ключа — например, версии тегов, которые ещё ни разу не менялись)
+    - запись (set, mset): только в Redis, без рассылки — ключи ответов содержат версии тегов, поэтому
+      запись создаёт новый ключ, а не меняет значение, которое могло быть у других процессов
+    - удаление и изменение (clear, delete, incr): в Redis, затем сообщения в канал pub/sub одним
+      конвейером — остальные процессы приложения удаляют у себя локальные копии этих ключей
+    - если подписка на канал оборвалась, локальные копии сбрасываются, а до переподключения
+      устаревшая копия живёт не дольше local_ttl
+    - ответ Redis не сохраняется локально, если пока его ждали, какая-то локальная копия была удалена
+      (счётчик _invalidations): иначе значение, прочитанное до чужой инвалидации, пережило бы её
+
+    Счётчики попаданий по уровням — в stats и metrics().
+    """
+
+    def __init__(self, redis_manager: RedisManager, max_items: int, max_bytes: int, local_ttl: float, channel: str):
+        self.redis_manager = redis_manager
+        self.local = LocalCache(max_items, max_bytes, local_ttl)
+        self.channel = channel
+        self.stats = {"local": 0, "redis": 0, "miss": 0}
+        self._instance_id = uuid.uuid4().hex  # Свои сообщения из канала пропускаем
+        self._invalidations = 0  # Сколько раз удалялись локальные копии (см. _remember)
+        self._listener: asyncio.Task | None = None
+
+    @property
+    def redis(self):
+        return self.redis_manager.redis
+
+    async def start(self) -> None:
+        """
+        Подписка на канал инвалидации (вызывается в lifespan после подключения к Redis).
+        """
+        subscribed = asyncio.Event()
+        self._listener = asyncio.create_task(self._listen(subscribed))
+        await subscribed.wait()
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        self.local.clear()
+
+    async def get_with_ttl(self, key: str) -> tuple[int, bytes | None]:
+        item = self.local.get(key)
+        if item is not None:
+            self.stats["local"] += 1
+            return (-1 if item[2] is None else max(int(item[2] - time.monotonic()), 0)), item[1]
+        generation = self._invalidations
+        async with self.redis_manager.pipeline() as pipe:
+            ttl, value = await pipe.ttl(key).get(key).execute()
+        if value is None:
+            self.stats["miss"] += 1  # Отсутствие не запоминаем: ответ может записать другой процесс, а set не рассылается
+        else:
+            self._remember(key, value, generation, ttl)
+        return ttl, value
+
+    async def get(self, key: str) -> bytes | None:
+        return (await self.get_with_ttl(key))[1]
+
+    async def set(self, key: str, value: bytes, expire: int | None = None) -> None:
+        await self.redis.set(key, value, ex=expire)
+        self._forget(key)
+        self.local.set(key, value, expire)
+
+    async def clear(self, namespace: str | None = None, key: str | None = None) -> int:
+        if namespace:
+            removed = 0
+            async for found in self.redis.scan_iter(match=f"{namespace}:*"):
+                removed += await self.redis.delete(found)
+            self._forget(f"{namespace}:*")
+            await self._publish([f"{namespace}:*"])
+            return removed
+        if key:
+            removed = await self.redis.delete(key)
+            self._forget(key)
+            await self._publish([key])
+            return removed
+        return 0
+
+    async def mget(self, keys: list[str], remember_missing: bool = True) -> list[bytes | None]:
+        """
+        Несколько ключей: найденные локально — без Redis, остальные — одним MGET.
+
+        :param remember_missing: запоминать локально и отсутствие ключа (False — если его могут
+            записать в Redis в обход бэкенда, без рассылки инвалидации)
+        """
+        values = {}
+        for key in keys:
+            item = self.local.get(key)
+            if item is not None:
+                self.stats["local"] += 1
+                values[key] = item[1]
+        missing = [key for key in keys if key not in values]
+        if missing:
+            generation = self._invalidations
+            for key, value in zip(missing, await self.redis_manager.mget(missing)):
+                if value is None and not remember_missing:
+                    self.stats["miss"] += 1
+                else:
+                    self._remember(key, value, generation)
+                values[key] = value
+        return [values[key] for key in keys]
+
+    async def mset(self, values: dict[str, bytes], expire: int | None = None) -> None:
+        """
+        Несколько ключей одним конвейером (без рассылки, как и set).
+        """
+        await self.redis_manager.mset(values, expire)
+        for key, value in values.items():
+            self._forget(key)
+            self.local.set(key, value, expire)
+
+    async def delete(self, keys: list[str]) -> None:
+        """
+        Удаляет ключи из Redis и их локальные копии во всех процессах.
+        """
+        await self.redis_manager.delete(*keys)
+        for key in keys:
+            self._forget(key)
+        await self._publish(keys)
+
+    async def incr(self, keys: list[str]) -> None:
+        """
+        Увеличивает счётчики (версии тегов) в Redis и удаляет их локальные копии во всех процессах.
+        """
+        async with self.redis_manager.pipeline() as pipe:
+            for key in keys:
+                pipe.incr(key)
+            await pipe.execute()
+        for key in keys:
+            self._forget(key)
+        await self._publish(keys)
+
+    def hit_ratio(self) -> dict[str, float]:
+        """
+        Доля обращений без похода в Redis (local) и доля попаданий среди обращений к Redis (redis).
+        """
+        lookups = sum(self.stats.values())
+        remote = lookups - self.stats["local"]
+        return {
+            "local": self.stats["local"] / lookups if lookups else 0.0,
+            "redis": self.stats["redis"] / remote if remote else 0.0,
+        }
+
+    def metrics(self) -> str:
+        """
+        Счётчики обращений к кэшу и размер LRU в текстовом формате Prometheus.
+        """
+        lines = [
+            "# HELP cache_lookups_total Обращения к кэшу ответов: ответ из LRU процесса, из Redis или промах в Redis",
+            "# TYPE cache_lookups_total counter",
+            *(f'cache_lookups_total{{tier="{tier}"}} {count}' for tier, count in self.stats.items()),
+            "# HELP cache_local_items Записи в in-process LRU",
+            "# TYPE cache_local_items gauge",
+            f"cache_local_items {len(self.local)}",
+            "# HELP cache_local_bytes Размер значений в in-process LRU, байты",
+            "# TYPE cache_local_bytes gauge",
+            f"cache_local_bytes {self.local.size}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def _remember(self, key: str, value: bytes | None, generation: int, ttl: int = -1) -> None:
+        """
+        Сохраняет ответ Redis локально, если с момента запроса (generation) не было инвалидаций.
+        """
+        self.stats["miss" if value is None else "redis"] += 1
+        if generation == self._invalidations:
+            self.local.set(key, value, ttl if ttl > 0 else None)
+
+    def _forget(self, key: str) -> None:
+        """
+        Удаляет локальную копию ключа (или всех ключей с префиксом, если key оканчивается на ":*").
+        """
+        self._invalidations += 1
+        if key.endswith(":*"):
+            self.local.pop_prefix(key[:-1])
+        else:
+            self.local.pop(key)
+
+    async def _publish(self, keys: list[str]) -> None:
+        """
+        Рассылает инвалидацию ключей остальным процессам: по сообщению на ключ, все — одним конвейером.
+        """
+        if len(keys) == 1:
+            await self.redis_manager.publish(self.channel, f"{self._instance_id} {keys[0]}")
+            return
+        async with self.redis_manager.pipeline() as pipe:
+            for key in keys:
+                pipe.publish(self.channel, f"{self._instance_id} {key}")
+            await pipe.execute()
+
+    async def _listen(self, subscribed: asyncio.Event) -> None:
+        """
+        Удаляет локальные копии ключей, изменённых другими процессами. При обрыве — переподписывается.
+        """
+        while True:
+            try:
+                async with self.redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    self._invalidations += 1
+                    self.local.clear()  # Пока подписки не было, сообщения могли потеряться
+                    subscribed.set()
+                    while True:
+                        # get_message с таймаутом, а не listen(): в простое listen() упирается в socket_timeout соединения
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message is None:
+                            continue
+                        sender, key = message["data"].decode().split(" ", 1)
+                        if sender != self._instance_id:
+                            self._forget(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Подписка на канал инвалидации кэша прервалась, переподключаемся")
+                self._invalidations += 1
+                self.local.clear()
+                subscribed.set()  # Старт приложения не ждёт Redis: без подписки копии живут не дольше local_ttl
+                await asyncio.sleep(1)
@@ -1,32 +1,161 @@
+import os
+from uuid import uuid4
+
 from sqlalchemy import NullPool
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 from sqlalchemy.orm import DeclarativeBase
 
 from src.config import settings  # Настройки проекта (включая DB_URL из .env)
+from src.utils.db_pool import InstrumentedQueuePool  # Пул с измерением времени ожидания соединения
+
+
+def unique_statement_name() -> str:
+    """
+    Уникальное имя подготовленного выражения: за PgBouncer соседние транзакции
+    могут попасть на разные серверные соединения, и повторяющиеся имена asyncpg
+    (__asyncpg_stmt_1__ ...) конфликтуют с чужими или отсутствуют.
+    """
+    return f"__asyncpg_{uuid4()}__"
+
+
+def connect_args(pgbouncer: bool | None = None) -> dict:
+    """
+    Параметры подключения asyncpg из настроек (таймауты и совместимость с PgBouncer).
+
+    :param pgbouncer: режим PgBouncer (pool_mode=transaction); по умолчанию — settings.DB_PGBOUNCER
+    """
+    if pgbouncer is None:
+        pgbouncer = settings.DB_PGBOUNCER
+
+    args = {}
+    if settings.DB_COMMAND_TIMEOUT is not None:
+        args["command_timeout"] = settings.DB_COMMAND_TIMEOUT
+    if pgbouncer:
+        # Подготовленные выражения живут на серверном соединении, а оно меняется между транзакциями:
+        # не кэшируем их ни в asyncpg, ни в SQLAlchemy и даём каждому уникальное имя
+        args["statement_cache_size"] = 0
+        args["prepared_statement_cache_size"] = 0
+        args["prepared_statement_name_func"] = unique_statement_name
+    elif settings.DB_STATEMENT_TIMEOUT_MS is not None:
+        # PgBouncer отклоняет незнакомые параметры стартового пакета, поэтому только без него
+        args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    return args
+
 
+def pooled_engine_kwargs(name: str) -> dict:
+    """
+    Параметры пула и таймаутов из настроек для create_async_engine.
+
+    С PgBouncer пул на стороне приложения не нужен (NullPool): соединения держит и раздаёт сам пулер,
+    а собственный пул приложения только удерживал бы его клиентские слоты.
+
+    :param name: имя пула (для метрик /metrics и логов)
+    """
+    if settings.DB_PGBOUNCER:
+        return {"poolclass": NullPool, "pool_logging_name": name, "connect_args": connect_args()}
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_logging_name": name,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args(),
+    }
+
+
+# 🔧 Фабрики движков по имени. Движки создаются лениво — при первом обращении в процессе:
+# импорт src.database (модели, Alembic, задачи Celery) не открывает пулы и не тратит время на их создание
+ENGINE_FACTORIES = {
+    # Основной движок (пул соединений настраивается через Settings)
+    "primary": lambda: create_async_engine(settings.DB_URL, **pooled_engine_kwargs("primary")),
+    # 📖 Движок для read-only запросов: реплика со своим пулом, если настроена, иначе — основной движок
+    # с его пулом (без второго набора соединений к основной БД).
+    # postgresql_readonly — каждая транзакция открывается как BEGIN READ ONLY
+    "read_only": lambda: (create_async_engine(settings.DB_REPLICA_URL, **pooled_engine_kwargs("read_only")) if settings.DB_REPLICA_URL else get_engine("primary")).execution_options(
+        postgresql_readonly=True
+    ),
+    # Движок без пула соединений (используется для миграций, фоновых задач и тестов)
+    "null_pool": lambda: create_async_engine(settings.DB_URL, poolclass=NullPool, connect_args=connect_args()),
+}
 
-# 🔧 Создаём асинхронный движок SQLAlchemy (с пулом соединений по умолчанию)
-engine = create_async_engine(settings.DB_URL)
+# Движки со своим пулом соединений — для метрик и прогрева ("read_only" — только если настроена реплика)
+POOLED_ENGINES = ("primary", "read_only")
 
-# 🔧 Движок без пула соединений (используется для миграций, Alembic, фоновых задач)
-engine_null_pool = create_async_engine(settings.DB_URL, poolclass=NullPool)
+_engines: dict[str, AsyncEngine] = {}  # Уже созданные в этом процессе движки
+
+
+def get_engine(name: str = "primary") -> AsyncEngine:
+    """
+    Движок по имени (см. ENGINE_FACTORIES); создаётся при первом обращении.
+
+    :param name: "primary", "read_only" или "null_pool"
+    """
+    engine = _engines.get(name)
+    if engine is None:
+        engine = _engines[name] = ENGINE_FACTORIES[name]()
+    return engine
+
+
+def pooled_engines() -> dict[str, AsyncEngine]:
+    """
+    Движки со своим пулом соединений по имени пула.
+    """
+    return {name: get_engine(name) for name in POOLED_ENGINES if name != "read_only" or settings.DB_REPLICA_URL}
+
+
+def created_engines() -> dict[str, AsyncEngine]:
+    """
+    Движки, уже созданные в этом процессе (в отличие от pooled_engines, новые не создаются).
+    """
+    return dict(_engines)
+
+
+def reset_engines_after_fork() -> None:
+    """
+    Сбрасывает пулы движков, унаследованных от родительского процесса (prefork-воркеры Celery, gunicorn).
+
+    Соединения родителя не закрываются (close=False) — они остаются родителю, а дочерний процесс
+    откроет собственные. Без этого два процесса писали бы в один сокет PostgreSQL.
+    """
+    for engine in _engines.values():
+        engine.sync_engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=reset_engines_after_fork)
+
+
+class LazySessionMaker:
+    """
+    Фабрика сессий движка по имени: ведёт себя как async_sessionmaker, но движок
+    берётся через get_engine при первом создании сессии, а не при импорте модуля.
+    """
+
+    def __init__(self, engine_name: str):
+        self.engine_name = engine_name
+        self._session_maker: async_sessionmaker | None = None
+
+    def __call__(self, **kwargs) -> AsyncSession:
+        if self._session_maker is None:
+            # expire_on_commit=False — после commit() объекты останутся доступными в памяти
+            self._session_maker = async_sessionmaker(bind=get_engine(self.engine_name), expire_on_commit=False)
+        return self._session_maker(**kwargs)
 
 
 # 🏭 Асинхронная фабрика сессий, привязанная к основному движку
-# expire_on_commit=False — после commit() объекты останутся доступными в памяти
-async_session_maker = async_sessionmaker(
-    bind=engine,
-    expire_on_commit=False,
-)
+async_session_maker = LazySessionMaker("primary")
 
-# 🏭 Фабрика сессий для работы без пула соединений (используется в Alembic и тестах)
-async_session_maker_null_pool = async_sessionmaker(
-    bind=engine_null_pool,
-    expire_on_commit=False,
-)
+# 🏭 Фабрика read-only сессий (поисковые GET-ручки)
+async_session_maker_read_only = LazySessionMaker("read_only")
+
+# 🏭 Фабрика сессий для работы без пула соединений (используется в фоновых задачах и тестах)
+async_session_maker_null_pool = LazySessionMaker("null_pool")
 
 
 # 🧱 Базовый класс для всех ORM-моделей
@@ -54,6 +54,14 @@ class AllRoomsAreBookedException(BaseClassException):
     detail = "Не осталось свободных номеров"
 
 
+class TransactionConflictException(BaseClassException):
+    """
+    Исключение, если транзакция так и не прошла из-за конфликтов с параллельными (исчерпаны повторы).
+    """
+
+    detail = "Слишком много одновременных изменений, повторите запрос"
+
+
 class IncorrectTokenException(BaseClassException):
     detail = "Некорректный токен"
 
@@ -74,6 +82,14 @@ class UserAlreadyExistsException(BaseClassException):
     detail = "Пользователь уже существует"
 
 
+class IncorrectCursorException(BaseClassException):
+    """
+    Исключение, если курсор пагинации повреждён или подделан.
+    """
+
+    detail = "Некорректный курсор пагинации"
+
+
 def check_date_to_after_date_from(date_from: date, date_to: date) -> None:
     """
     Проверка, что дата выезда позже даты заезда.
@@ -122,6 +138,16 @@ class AllRoomsAreBookedHTTPException(BaseClassHTTPException):
     detail = "Не осталось свободных номеров"
 
 
+class TransactionConflictHTTPException(BaseClassHTTPException):
+    status_code = 409
+    detail = "Слишком много одновременных изменений, повторите запрос"
+
+
+class IncorrectCursorHTTPException(BaseClassHTTPException):
+    status_code = 400
+    detail = "Некорректный курсор пагинации"
+
+
 class IncorrectTokenHTTPException(BaseClassHTTPException):
     detail = "Некорректный токен"
 
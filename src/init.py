@@ -1,5 +1,6 @@
 from src.config import settings  # Импорт настроек из .env (через класс Settings)
 from src.connectors.redis_connector import RedisManager  # Класс-обёртка для работы с Redis
+from src.utils.availability import RoomsAvailabilityIndex  # In-memory индекс свободных комнат
 
 
 # Инициализация глобального Redis-менеджера для всего приложения
@@ -8,4 +9,12 @@ from src.connectors.redis_connector import RedisManager  # Класс-обёрт
 redis_manager = RedisManager(
     host=settings.REDIS_HOST,  # Хост Redis-сервера (например, "localhost")
     port=settings.REDIS_PORT,  # Порт Redis-сервера (например, 6379)
+    max_connections=settings.REDIS_MAX_CONNECTIONS,  # Размер пула соединений
+    pool_timeout=settings.REDIS_POOL_TIMEOUT,  # Ожидание свободного соединения
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,  # Таймаут команды
+    socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,  # Таймаут подключения
+    health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,  # Проверка простаивавших соединений
 )
+
+# In-memory индекс доступности комнат (загружается в lifespan при AVAILABILITY_ENGINE="memory")
+availability_index = RoomsAvailabilityIndex()
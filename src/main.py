@@ -1,4 +1,5 @@
 from contextlib import asynccontextmanager
+from functools import partial
 from fastapi import FastAPI  # Основной класс FastAPI-приложения
 import uvicorn  # ASGI-сервер для запуска приложения
 
@@ -15,8 +16,13 @@ sys.path.append(str(Path(__file__).parent.parent))
 # Настройка логирования на уровне DEBUG
 logging.basicConfig(level=logging.INFO)
 
-# Инициализация Redis-соединения
-from src.init import redis_manager  # noqa: E402
+# Инициализация Redis-соединения и in-memory индекса доступности
+from src.config import settings  # noqa: E402
+from src.connectors.two_tier_cache import TwoTierBackend  # noqa: E402
+from src.database import async_session_maker, created_engines, pooled_engines  # noqa: E402
+from src.init import redis_manager, availability_index  # noqa: E402
+from src.utils.db_manager import DBManager  # noqa: E402
+from src.utils.db_pool import warmup_pool  # noqa: E402
 
 # Импорт API-роутеров
 from src.api.hotels import router as router_hotels  # noqa: E402
@@ -25,6 +31,24 @@ from src.api.rooms import router as router_rooms  # noqa: E402
 from src.api.bookings import router as router_bookings  # noqa: E402
 from src.api.facilities import router as router_facilities  # noqa: E402
 from src.api.images import router as router_images  # noqa: E402
+from src.api.metrics import router as router_metrics  # noqa: E402
+
+
+async def cache_backend():
+    """
+    Бэкенд кэша ответов по настройке CACHE_BACKEND (Redis уже подключён).
+    """
+    if settings.CACHE_BACKEND == "redis":
+        return RedisBackend(redis_manager.redis)
+    backend = TwoTierBackend(
+        redis_manager,
+        max_items=settings.CACHE_LOCAL_MAX_ITEMS,
+        max_bytes=settings.CACHE_LOCAL_MAX_BYTES,
+        local_ttl=settings.CACHE_LOCAL_TTL,
+        channel=settings.CACHE_INVALIDATION_CHANNEL,
+    )
+    await backend.start()
+    return backend
 
 
 @asynccontextmanager
@@ -34,13 +58,28 @@ async def lifespan(app: FastAPI):
     Выполняется при старте и остановке сервера.
 
     - Подключение к Redis
-    - Инициализация кэша FastAPI
-    - Отключение от Redis при завершении
+    - Инициализация кэша FastAPI (Redis или in-process LRU + Redis, см. CACHE_BACKEND)
+    - Прогрев пулов соединений с БД (если включён)
+    - Загрузка in-memory индекса доступности комнат и подписка на его изменения в других процессах (если включён)
+    - Закрытие пулов соединений с БД и отключение от Redis при завершении
     """
     await redis_manager.connect()
-    FastAPICache.init(RedisBackend(redis_manager.redis), prefix="fastapi-cache")
-    logging.info("FastAPI cache initialized")
+    FastAPICache.init(await cache_backend(), prefix="fastapi-cache")
+    logging.info(f"FastAPI cache initialized: {settings.CACHE_BACKEND}")
+    if settings.DB_POOL_WARMUP and not settings.DB_PGBOUNCER:  # С PgBouncer у приложения нет своего пула
+        for name, engine in pooled_engines().items():
+            await warmup_pool(engine, settings.DB_POOL_SIZE)
+            logging.info(f"DB pool {name} warmed up: {settings.DB_POOL_SIZE} connections")
+    if settings.AVAILABILITY_ENGINE == "memory":
+        # Индекс каждого процесса получает изменения остальных через канал AVAILABILITY_INDEX_CHANNEL
+        await availability_index.start(redis_manager, settings.AVAILABILITY_INDEX_CHANNEL, partial(DBManager, session_factory=async_session_maker))
     yield
+    await availability_index.close()
+    for engine in created_engines().values():  # Только использованные: неиспользованные движки не создаём ради dispose
+        await engine.dispose()
+    logging.info("DB pools disposed")
+    if isinstance(FastAPICache.get_backend(), TwoTierBackend):
+        await FastAPICache.get_backend().close()
     await redis_manager.close()
 
 
@@ -54,8 +93,32 @@ app.include_router(router_rooms)
 app.include_router(router_bookings)
 app.include_router(router_facilities)
 app.include_router(router_images)
+app.include_router(router_metrics)
+
+
+def server_options() -> dict:
+    """
+    Параметры uvicorn.run из настроек.
+
+    - MODE=LOCAL — режим разработки: один процесс, автоперезагрузка при изменении кода
+    - остальные режимы — APP_WORKERS процессов с uvloop и httptools. При остановке (SIGTERM) сервер
+      перестаёт принимать соединения и до APP_GRACEFUL_SHUTDOWN_TIMEOUT секунд дожидается активных
+      запросов, после чего lifespan закрывает пулы соединений с БД
+    """
+    if settings.MODE == "LOCAL":
+        return {"host": settings.APP_HOST, "port": settings.APP_PORT, "reload": True}  # reload=True — автообновление при изменении кода
+    return {
+        "host": settings.APP_HOST,
+        "port": settings.APP_PORT,
+        "workers": settings.APP_WORKERS,
+        "loop": settings.APP_LOOP,
+        "http": settings.APP_HTTP,
+        "backlog": settings.APP_BACKLOG,
+        "timeout_keep_alive": settings.APP_KEEP_ALIVE_TIMEOUT,
+        "timeout_graceful_shutdown": settings.APP_GRACEFUL_SHUTDOWN_TIMEOUT,
+    }
 
 
 # Точка входа при запуске через `python main.py`
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", reload=True)  # reload=True — автообновление при изменении кода
+    uvicorn.run("main:app", **server_options())
@@ -0,0 +1,48 @@
+"""add room_inventory
+
+Revision ID: 97cb7a3965c9
+Revises: bc7df04c1e94
+Create Date: 2026-10-18 10:10:27.418305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "97cb7a3965c9"
+down_revision: Union[str, None] = "bc7df04c1e94"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "room_inventory",
+        sa.Column("room_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("booked", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["room_id"], ["rooms.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("room_id", "day"),
+    )
+    # Заполняем загрузку из уже существующих бронирований (дни с date_from по date_to включительно)
+    op.execute(
+        """
+        INSERT INTO room_inventory (room_id, day, booked)
+        SELECT bookings_days.room_id, bookings_days.day, count(*)
+        FROM (
+            SELECT room_id, generate_series(date_from, date_to, interval '1 day')::date AS day
+            FROM bookings
+        ) AS bookings_days
+        GROUP BY bookings_days.room_id, bookings_days.day
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("room_inventory")
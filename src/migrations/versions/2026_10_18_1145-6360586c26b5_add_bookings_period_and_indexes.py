@@ -0,0 +1,48 @@
+"""add bookings period and indexes
+
+Revision ID: 6360586c26b5
+Revises: 97cb7a3965c9
+Create Date: 2026-10-18 11:45:03.192744
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6360586c26b5"
+down_revision: Union[str, None] = "97cb7a3965c9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # btree_gist позволяет включить integer-колонку room_id в GiST-индекс вместе с диапазоном
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.add_column(
+        "bookings",
+        sa.Column(
+            "period",
+            postgresql.DATERANGE(),
+            sa.Computed("daterange(date_from, date_to, '[]')", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index("ix_bookings_room_id_period", "bookings", ["room_id", "period"], unique=False, postgresql_using="gist")
+    op.create_index(op.f("ix_bookings_user_id"), "bookings", ["user_id"], unique=False)
+    op.create_index(op.f("ix_rooms_hotel_id"), "rooms", ["hotel_id"], unique=False)
+    op.create_index("ix_rooms_facilities_room_id_facility_id", "rooms_facilities", ["room_id", "facility_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_rooms_facilities_room_id_facility_id", table_name="rooms_facilities")
+    op.drop_index(op.f("ix_rooms_hotel_id"), table_name="rooms")
+    op.drop_index(op.f("ix_bookings_user_id"), table_name="bookings")
+    op.drop_index("ix_bookings_room_id_period", table_name="bookings", postgresql_using="gist")
+    op.drop_column("bookings", "period")
@@ -0,0 +1,45 @@
+"""add hotels trgm indexes
+
+Revision ID: 5b1f0e2c7a94
+Revises: 6360586c26b5
+Create Date: 2026-10-18 15:30:12.480113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1f0e2c7a94"
+down_revision: Union[str, None] = "6360586c26b5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm даёт триграммные операторы и классы операторов для GIN-индексов (LIKE '%...%', <%, similarity)
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_hotels_title_trgm",
+        "hotels",
+        [sa.text("lower(title) gin_trgm_ops")],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_hotels_location_trgm",
+        "hotels",
+        [sa.text("lower(location) gin_trgm_ops")],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_hotels_location_trgm", table_name="hotels", postgresql_using="gin")
+    op.drop_index("ix_hotels_title_trgm", table_name="hotels", postgresql_using="gin")
@@ -5,6 +5,7 @@ from src.models.rooms import RoomsOrm  # Модель комнаты
 from src.models.users import UsersOrm  # Модель пользователя
 from src.models.bookings import BookingsOrm  # Модель бронирования
 from src.models.facilities import FacilitiesOrm  # Модель удобства (услуги)
+from src.models.room_inventory import RoomInventoryOrm  # Посуточная загрузка комнат
 
 # Указываем, какие модели экспортируются при использовании `from src.models import *`
 __all__ = [
@@ -13,4 +14,5 @@ __all__ = [
     "UsersOrm",
     "BookingsOrm",
     "FacilitiesOrm",
+    "RoomInventoryOrm",
 ]
@@ -1,5 +1,6 @@
 from datetime import date
-from sqlalchemy import ForeignKey
+from sqlalchemy import Computed, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import DATERANGE, Range
 from sqlalchemy.ext.hybrid import hybrid_property  # Позволяет использовать свойство и в Python, и в SQL
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -12,14 +13,22 @@ class BookingsOrm(Base):
     """
 
     __tablename__ = "bookings"
+    __table_args__ = (
+        # GiST-индекс (room_id, period) для запросов пересечения периодов: room_id = ... AND period && ...
+        # Требует расширения btree_gist (для integer в GiST)
+        Index("ix_bookings_room_id_period", "room_id", "period", postgresql_using="gist"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)  # Уникальный ID бронирования
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))  # Связь с пользователем (внешний ключ)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)  # Связь с пользователем (внешний ключ)
     room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id"))  # Связь с комнатой (внешний ключ)
     date_from: Mapped[date]  # Дата заезда
     date_to: Mapped[date]  # Дата выезда
     price: Mapped[int]  # Цена за одну ночь
 
+    # Период брони [date_from, date_to] как daterange — вычисляется самой БД
+    period: Mapped[Range[date]] = mapped_column(DATERANGE, Computed("daterange(date_from, date_to, '[]')", persisted=True))
+
     @hybrid_property
     def total_cost(self) -> int:
         """
@@ -1,6 +1,6 @@
 import typing
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import String, ForeignKey, Index
 from src.database import Base  # Базовый класс всех моделей
 
 if typing.TYPE_CHECKING:
@@ -32,6 +32,7 @@ class RoomsFacilitiesOrm(Base):
     """
 
     __tablename__ = "rooms_facilities"
+    __table_args__ = (Index("ix_rooms_facilities_room_id_facility_id", "room_id", "facility_id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)  # Уникальный ID связи
     room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id"))  # Внешний ключ на таблицу комнат
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String
+from sqlalchemy import Index, String, column, func
 from src.database import Base
 
 
@@ -11,6 +11,12 @@ class HotelsOrm(Base):
     """
 
     __tablename__ = "hotels"
+    __table_args__ = (
+        # Триграммные GIN-индексы для поиска подстроки (LIKE '%...%') и нечёткого поиска (<%) по lower(...)
+        # Требуют расширения pg_trgm
+        Index("ix_hotels_title_trgm", func.lower(column("title")).label("title_lower"), postgresql_using="gin", postgresql_ops={"title_lower": "gin_trgm_ops"}),
+        Index("ix_hotels_location_trgm", func.lower(column("location")).label("location_lower"), postgresql_using="gin", postgresql_ops={"location_lower": "gin_trgm_ops"}),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)  # Уникальный ID отеля
     title: Mapped[str] = mapped_column(String(100))  # Название отеля (до 100 символов)
@@ -0,0 +1,21 @@
+from datetime import date
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import Base  # Базовый класс для всех ORM-моделей
+
+
+class RoomInventoryOrm(Base):
+    """
+    ORM-модель таблицы 'room_inventory' — материализованная посуточная загрузка комнат.
+
+    Одна строка = сколько экземпляров комнаты занято в конкретный день.
+    Поддерживается при каждой записи в bookings, поэтому проверка доступности
+    не пересчитывает бронирования, а читает индексированный диапазон дней.
+    """
+
+    __tablename__ = "room_inventory"
+
+    room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True)  # Комната
+    day: Mapped[date] = mapped_column(primary_key=True)  # День (бронь занимает дни с date_from по date_to включительно)
+    booked: Mapped[int] = mapped_column(default=0)  # Количество занятых экземпляров комнаты в этот день
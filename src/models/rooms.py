@@ -18,7 +18,7 @@ class RoomsOrm(Base):
     __tablename__ = "rooms"
 
     id: Mapped[int] = mapped_column(primary_key=True)  # Уникальный идентификатор комнаты
-    hotel_id: Mapped[int] = mapped_column(ForeignKey("hotels.id"))  # Внешний ключ на таблицу отелей
+    hotel_id: Mapped[int] = mapped_column(ForeignKey("hotels.id"), index=True)  # Внешний ключ на таблицу отелей
     title: Mapped[str]  # Название комнаты (например, "Standard", "Deluxe Suite")
     description: Mapped[str | None]  # Описание комнаты (опционально)
     price: Mapped[int]  # Цена за одну ночь
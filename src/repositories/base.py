@@ -4,8 +4,11 @@ from pydantic import BaseModel
 from sqlalchemy import select, insert, update, delete
 from sqlalchemy.exc import NoResultFound, IntegrityError
 
+from src.config import settings
 from src.exceptions import ObjectNotFoundException, ObjectAlreadyExistsException
 from src.repositories.mappers.base import DataMapper
+from src.utils.entity_cache import EntityCache
+from src.utils.pagination import decode_cursor, encode_cursor
 
 
 class BaseRepository:
@@ -16,6 +19,7 @@ class BaseRepository:
 
     model = None  # SQLAlchemy ORM-модель
     mapper: DataMapper = None  # Маппер ORM → Pydantic
+    entity_cache: EntityCache | None = None  # Read-through кэш объектов по id (get_one(id=...), get_many_by_ids)
 
     def __init__(self, session):
         """
@@ -23,17 +27,87 @@ class BaseRepository:
         """
         self.session = session
 
-    async def get_filtered(self, *filter, **filtered_by):
+    async def get_filtered(self, *filter, limit: int | None = None, offset: int = 0, **filtered_by):
         """
         Получение списка записей по фильтрам.
 
         :param filter: SQLAlchemy фильтры
+        :param limit: количество записей (если None — все, в порядке, выбранном БД; с limit записи упорядочены по id)
+        :param offset: смещение (вместе с limit)
         :param filtered_by: именованные фильтры (например, id=1)
         :return: список Pydantic-моделей
         """
-        query = select(self.model).filter(*filter).filter_by(**filtered_by)
+        query = select(*self.mapper.columns()).filter(*filter).filter_by(**filtered_by)
+        if limit is not None:
+            query = query.order_by(self.model.id).limit(limit).offset(offset)
         result = await self.session.execute(query)
-        return [self.mapper.map_to_domain_entity(model) for model in result.scalars().all()]
+        return self.mapper.map_rows_to_domain_entities(result.all())
+
+    async def stream_filtered(self, *filter, chunk_size: int | None = None, **filtered_by):
+        """
+        Потоковое чтение записей по фильтрам через серверный курсор (session.stream).
+
+        Строки забираются из БД порциями по chunk_size и сразу отдаются вызывающему коду,
+        поэтому потребление памяти не зависит от размера таблицы. Записи упорядочены по id.
+        Сессия должна оставаться открытой, пока итератор не исчерпан.
+
+        :param filter: SQLAlchemy фильтры
+        :param chunk_size: размер порции (по умолчанию DB_STREAM_CHUNK_SIZE)
+        :param filtered_by: именованные фильтры (например, user_id=1)
+        :return: асинхронный итератор Pydantic-моделей
+        """
+        chunk_size = chunk_size or settings.DB_STREAM_CHUNK_SIZE
+        query = select(*self.mapper.columns()).filter(*filter).filter_by(**filtered_by).order_by(self.model.id).execution_options(yield_per=chunk_size)
+        result = await self.session.stream(query)
+        async for partition in result.partitions():
+            for entity in self.mapper.map_rows_to_domain_entities(partition):
+                yield entity
+
+    async def get_page(self, *filter, limit: int, cursor: str | None = None, **filtered_by):
+        """
+        Страница записей по фильтрам с keyset-пагинацией по id.
+
+        :param filter: SQLAlchemy фильтры
+        :param limit: количество записей на странице
+        :param cursor: курсор из next_cursor предыдущей страницы (None или "" — первая страница)
+        :param filtered_by: именованные фильтры (например, user_id=1)
+        :return: (список Pydantic-моделей, курсор следующей страницы или None)
+        """
+        query = select(*self.mapper.columns()).filter(*filter).filter_by(**filtered_by)
+        return await self._get_page(query, limit, cursor)
+
+    async def _get_page(self, query, limit: int, cursor: str | None = None):
+        """
+        Выполняет запрос по модели репозитория постранично: WHERE id > :last_id ORDER BY id LIMIT :limit + 1.
+
+        В отличие от OFFSET, следующая страница не пересчитывает и не отбрасывает предыдущие строки,
+        а порядок по id стабилен — записи не повторяются и не пропускаются между страницами.
+
+        :param query: select(*self.mapper.columns()) с фильтрами (без LIMIT)
+        :param limit: количество записей на странице
+        :param cursor: курсор предыдущей страницы
+        :raises IncorrectCursorException: если курсор некорректен
+        :return: (список Pydantic-моделей, курсор следующей страницы или None)
+        """
+        last_id = decode_cursor(cursor)
+        if last_id is not None:
+            query = query.filter(self.model.id > last_id)
+        query = query.order_by(None).order_by(self.model.id).limit(limit + 1)
+
+        result = await self.session.execute(query)
+        return self._page(result.all(), limit)
+
+    def _page(self, rows, limit: int):
+        """
+        Страница из limit + 1 строк, упорядоченных по id: записи страницы и курсор следующей.
+
+        :param rows: строки запроса select(*self.mapper.columns()) c LIMIT limit + 1
+        :param limit: количество записей на странице
+        :return: (список Pydantic-моделей, курсор следующей страницы или None)
+        """
+        # Лишняя (limit + 1)-я запись говорит о том, что следующая страница существует
+        next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+        return self.mapper.map_rows_to_domain_entities(rows[:limit]), next_cursor
 
     async def get_all(self, *args, **kwargs):
         """
@@ -48,28 +122,49 @@ class BaseRepository:
         :param filter_by: параметры фильтрации (например, id=1)
         :return: Pydantic-модель или None
         """
-        query = select(self.model).filter_by(**filter_by)
+        query = select(*self.mapper.columns()).filter_by(**filter_by)
         result = await self.session.execute(query)
-        model = result.scalars().one_or_none()
-        if model is None:
+        row = result.one_or_none()
+        if row is None:
             return None
-        return self.mapper.map_to_domain_entity(model)
+        return self.mapper.map_row_to_domain_entity(row)
 
     async def get_one(self, **filter_by):
         """
         Получение одного объекта по фильтру. Если не найден — исключение.
+        Поиск только по id идёт через entity_cache, если он задан.
 
         :param filter_by: параметры фильтрации (например, id=1)
         :raises ObjectNotFoundException: если объект не найден
         :return: Pydantic-модель
         """
-        query = select(self.model).filter_by(**filter_by)
+        if self.entity_cache is not None and filter_by.keys() == {"id"}:
+            entity = await self.entity_cache.get(filter_by["id"], self._get_by_ids)
+            if entity is None:
+                raise ObjectNotFoundException
+            return entity
+
+        query = select(*self.mapper.columns()).filter_by(**filter_by)
         result = await self.session.execute(query)
         try:
-            model = result.scalar_one()
+            row = result.one()
         except NoResultFound:
             raise ObjectNotFoundException
-        return self.mapper.map_to_domain_entity(model)
+        return self.mapper.map_row_to_domain_entity(row)
+
+    async def get_many_by_ids(self, ids) -> dict:
+        """
+        Объекты по списку id (через entity_cache, если он задан): недостающие в кэше — одним запросом.
+
+        :param ids: id объектов
+        :return: словарь id → Pydantic-модель (только найденные)
+        """
+        if self.entity_cache is not None:
+            return await self.entity_cache.get_many(ids, self._get_by_ids)
+        return {entity.id: entity for entity in await self._get_by_ids(list(ids))}
+
+    async def _get_by_ids(self, ids: list[int]) -> list:
+        return await self.get_filtered(self.model.id.in_(ids))
 
     async def add(self, data: BaseModel):
         """
@@ -80,10 +175,9 @@ class BaseRepository:
         :return: созданный объект (Pydantic)
         """
         try:
-            add_data_stmt = insert(self.model).values(**data.model_dump()).returning(self.model)
+            add_data_stmt = insert(self.model).values(**data.model_dump()).returning(*self.mapper.columns())
             result = await self.session.execute(add_data_stmt)
-            model = result.scalars().one()
-            return self.mapper.map_to_domain_entity(model)
+            return self.mapper.map_row_to_domain_entity(result.one())
         except IntegrityError as ex:
             logging.exception(f"Не удалось добавить данные в БД, входные данные:{data}")
             if isinstance(ex.orig.__cause__, UniqueViolationError):
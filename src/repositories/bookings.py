@@ -1,59 +1,157 @@
 from datetime import date
-from sqlalchemy import select
+from pydantic import BaseModel
+from sqlalchemy import select, delete, insert, func, literal, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from src.exceptions import AllRoomsAreBookedException
+from src.exceptions import AllRoomsAreBookedException, RoomNotFoundException
 from src.models.bookings import BookingsOrm  # ORM-модель бронирований
+from src.models.room_inventory import RoomInventoryOrm  # ORM-модель посуточной загрузки
+from src.models.rooms import RoomsOrm  # ORM-модель комнат
 from src.repositories.base import BaseRepository  # Базовый репозиторий
 from src.repositories.mappers.mappers import BookingDataMapper  # Маппер ORM → доменная модель
-from src.repositories.utils import rooms_ids_for_booking  # Функция получения ID доступных комнат
-from src.schemas.bookings import BookingAdd  # Pydantic-схема для создания брони
+from src.repositories.room_inventory import RoomInventoryRepository, booking_days, inventory_upsert  # Посуточная загрузка комнат
+from src.schemas.bookings import BookingAdd, BookingAddRequest  # Pydantic-схемы для создания брони
+
+# Пространство ключей advisory-блокировок комнат: pg_advisory_xact_lock(ROOM_LOCK_NAMESPACE, room_id)
+ROOM_LOCK_NAMESPACE = 1
 
 
 class BookingsRepository(BaseRepository):
     """
     Репозиторий для работы с бронированиями.
     Позволяет добавлять брони и получать список броней с заездом на сегодня.
+
+    Все записи в bookings сопровождаются обновлением room_inventory в той же транзакции.
     """
 
     model = BookingsOrm
     mapper = BookingDataMapper
 
+    def __init__(self, session):
+        super().__init__(session)
+        self.inventory = RoomInventoryRepository(session)
+
+    async def add(self, data: BookingAdd):
+        """
+        Добавление брони с увеличением посуточной загрузки комнаты.
+        """
+        booking = await super().add(data)
+        await self.inventory.apply_bookings([booking], delta=1)
+        return booking
+
+    async def add_bulk(self, data: list[BookingAdd]):
+        """
+        Массовое добавление броней с увеличением посуточной загрузки комнат.
+        """
+        await super().add_bulk(data)
+        await self.inventory.apply_bookings(data, delta=1)
+
+    async def edit(self, data: BaseModel, exclude_unset: bool = False, **filter_by):
+        """
+        Обновление броней: загрузка старых дат снимается, новых — добавляется.
+        """
+        old_bookings = await self.get_filtered(**filter_by)
+        await super().edit(data, exclude_unset=exclude_unset, **filter_by)
+        new_bookings = await self.get_filtered(self.model.id.in_([booking.id for booking in old_bookings]))
+
+        await self.inventory.apply_bookings(old_bookings, delta=-1)
+        await self.inventory.apply_bookings(new_bookings, delta=1)
+
+    async def delete(self, **filter_by):
+        """
+        Удаление броней с уменьшением посуточной загрузки комнат.
+        Удаление без фильтра очищает и room_inventory целиком.
+        """
+        if not filter_by:
+            await self.session.execute(delete(self.model))
+            await self.session.execute(delete(self.inventory.model))
+            return
+
+        delete_stmt = delete(self.model).filter_by(**filter_by).returning(self.model.room_id, self.model.date_from, self.model.date_to)
+        result = await self.session.execute(delete_stmt)
+        await self.inventory.apply_bookings(result.all(), delta=-1)
+
     async def get_bookings_with_today_checkin(self):
         """
         Получение всех бронирований, у которых дата заезда — сегодня.
 
         :return: список доменных сущностей бронирований
         """
-        query = select(BookingsOrm).filter(BookingsOrm.date_from == date.today())
+        query = select(*self.mapper.columns()).filter(BookingsOrm.date_from == date.today())
 
         res = await self.session.execute(query)
 
-        return [self.mapper.map_to_domain_entity(booking) for booking in res.scalars().all()]
+        return self.mapper.map_rows_to_domain_entities(res.all())
+
+    async def lock_room(self, room_id: int, mode: str) -> None:
+        """
+        Блокирует комнату до конца транзакции, чтобы брони одной комнаты проверялись по очереди,
+        а брони разных комнат — параллельно.
+
+        Блокировка берётся отдельным запросом до add_booking: в READ COMMITTED следующий запрос
+        получает новый снимок данных и видит брони, закоммиченные предыдущим владельцем блокировки.
 
-    async def add_booking(self, data: BookingAdd, hotel_id: int):
+        :param room_id: ID комнаты
+        :param mode: "advisory" — pg_advisory_xact_lock, "row" — SELECT ... FOR NO KEY UPDATE по комнате
         """
-        Добавление нового бронирования, если комната действительно доступна в указанные даты.
+        if mode == "advisory":
+            lock_stmt = select(func.pg_advisory_xact_lock(ROOM_LOCK_NAMESPACE, room_id))
+        else:
+            lock_stmt = select(RoomsOrm.id).filter_by(id=room_id).with_for_update(key_share=True)  # FOR NO KEY UPDATE: не мешает FK-проверкам вставки броней
+        await self.session.execute(lock_stmt)
 
-        :param data: данные для бронирования (room_id, date_from, date_to, user_id)
-        :param hotel_id: ID отеля, в котором запрашивается комната
+    async def add_booking(self, user_id: int, data: BookingAddRequest):
+        """
+        Добавление нового бронирования одним SQL-запросом, если комната доступна в указанные даты.
+
+        Поиск комнаты, фиксация её цены, проверка свободных мест только для этой комнаты,
+        вставка брони и обновление room_inventory выполняются в одном
+        INSERT ... SELECT ... WHERE <есть места> RETURNING (через CTE).
+
+        :param user_id: ID пользователя, который бронирует
+        :param data: данные для бронирования (room_id, date_from, date_to)
+        :raises RoomNotFoundException: если комнаты с таким ID нет
         :raises AllRoomsAreBookedException: если указанная комната недоступна
-        :return: объект созданной брони
+        :return: (объект созданной брони, ID отеля комнаты — для инвалидации кэша)
         """
-        # Получаем SQL-запрос на доступные комнаты
-        rooms_ids_to_get = rooms_ids_for_booking(
-            date_from=data.date_from,
-            date_to=data.date_to,
-            hotel_id=hotel_id,
+        # Комната, которую бронируем (цена и количество берутся из БД)
+        room = select(RoomsOrm.id, RoomsOrm.hotel_id, RoomsOrm.price, RoomsOrm.quantity).filter(RoomsOrm.id == data.room_id).cte(name="room")
+
+        # Максимальная посуточная загрузка комнаты за период
+        room_booked = (
+            select(func.coalesce(func.max(RoomInventoryOrm.booked), 0))
+            .filter(
+                RoomInventoryOrm.room_id == room.c.id,
+                RoomInventoryOrm.day.between(data.date_from, data.date_to),
+            )
+            .scalar_subquery()
+        )
+
+        # Вставляем бронь, только если в каждый день периода осталось свободное место
+        new_booking = (
+            insert(BookingsOrm)
+            .from_select(
+                ["user_id", "room_id", "date_from", "date_to", "price"],
+                select(literal(user_id), room.c.id, literal(data.date_from), literal(data.date_to), room.c.price).filter(room_booked < room.c.quantity),
+            )
+            .returning(BookingsOrm.id, BookingsOrm.user_id, BookingsOrm.room_id, BookingsOrm.date_from, BookingsOrm.date_to, BookingsOrm.price)
+            .cte(name="new_booking")
         )
 
-        # Выполняем запрос и получаем список ID доступных комнат
-        rooms_ids_to_book_res = await self.session.execute(rooms_ids_to_get)
-        rooms_ids_to_book: list[int] = rooms_ids_to_book_res.scalars().all()
+        # Увеличиваем загрузку room_inventory по дням новой брони
+        new_booking_days = inventory_upsert(
+            pg_insert(RoomInventoryOrm).from_select(
+                ["room_id", "day", "booked"],
+                select(new_booking.c.room_id, booking_days(new_booking.c.date_from, new_booking.c.date_to), literal(1)),
+            )
+        ).cte(name="new_booking_days")
 
-        # Если нужная комната доступна — создаём бронь
-        if data.room_id in rooms_ids_to_book:
-            new_booking = await self.add(data)
-            return new_booking
+        # Нет строки — нет комнаты; строка без id брони — мест не осталось
+        query = select(room.c.id.label("found_room_id"), room.c.hotel_id.label("hotel_id"), *new_booking.c).select_from(room.outerjoin(new_booking, true())).add_cte(new_booking_days)
+        result = (await self.session.execute(query)).one_or_none()
 
-        # Иначе — выбрасываем исключение
-        raise AllRoomsAreBookedException
+        if result is None:
+            raise RoomNotFoundException
+        if result.id is None:
+            raise AllRoomsAreBookedException
+        return self.mapper.map_to_domain_entity(result), result.hotel_id
@@ -1,11 +1,15 @@
 from datetime import date
-from sqlalchemy import select, func
+from functools import cache
+
+from sqlalchemy import bindparam, select
 
 from src.models.hotels import HotelsOrm  # ORM-модель отелей
 from src.models.rooms import RoomsOrm  # ORM-модель комнат
 from src.repositories.base import BaseRepository  # Базовый репозиторий
 from src.repositories.mappers.mappers import HotelDataMapper  # Маппер ORM → доменная модель
-from src.repositories.utils import rooms_ids_for_booking  # Утилита для фильтрации свободных комнат
+from src.repositories.utils import free_rooms_filter, free_rooms_params, search_term, text_search, text_similarity  # Условия свободных комнат и текстового поиска
+from src.utils.entity_cache import hotels_cache
+from src.utils.pagination import decode_cursor
 
 
 class HotelsRepository(BaseRepository):
@@ -15,6 +19,7 @@ class HotelsRepository(BaseRepository):
 
     model = HotelsOrm
     mapper = HotelDataMapper
+    entity_cache = hotels_cache
 
     async def get_filtered_by_time(
         self,
@@ -24,6 +29,7 @@ class HotelsRepository(BaseRepository):
         title: str | None = None,
         limit: int = 10,
         offset: int = 0,
+        fuzzy: bool = False,
     ):
         """
         Получение отелей, у которых есть хотя бы одна свободная комната в заданном диапазоне дат.
@@ -35,28 +41,103 @@ class HotelsRepository(BaseRepository):
         :param title: фильтрация по названию (необязательно)
         :param limit: количество отелей на странице
         :param offset: смещение для пагинации
+        :param fuzzy: нечёткий поиск по локации и названию с сортировкой по похожести
         :return: список доменных сущностей отелей
         """
-        # Получаем список ID свободных комнат за указанный период
-        rooms_ids_to_get = rooms_ids_for_booking(date_from=date_from, date_to=date_to)
+        query, params = self._filtered_by_time_query(date_from, date_to, location, title, fuzzy, paged=False)
 
-        # Получаем ID отелей, в которых есть такие свободные комнаты
-        hotels_ids_to_get = select(RoomsOrm.hotel_id).select_from(RoomsOrm).filter(RoomsOrm.id.in_(rooms_ids_to_get))
+        # Выполняем запрос и маппим строки в доменные модели (без ORM-объектов)
+        result = await self.session.execute(query, {**params, "limit": limit, "offset": offset})
+        return self.mapper.map_rows_to_domain_entities(result.all())
 
-        # Формируем запрос к таблице отелей с фильтрацией по наличию свободных комнат
-        query = select(HotelsOrm).filter(HotelsOrm.id.in_(hotels_ids_to_get))
+    async def get_page_filtered_by_time(
+        self,
+        date_from: date,
+        date_to: date,
+        location: str | None = None,
+        title: str | None = None,
+        limit: int = 10,
+        cursor: str | None = None,
+        fuzzy: bool = False,
+    ):
+        """
+        То же, что get_filtered_by_time, но с keyset-пагинацией по курсору (см. BaseRepository._get_page).
 
-        # Фильтрация по локации (регистронезависимо)
-        if location:
-            query = query.filter(func.lower(HotelsOrm.location).contains(location.strip().lower()))
+        Страницы упорядочены по id отеля (при fuzzy=True похожесть только фильтрует, но не сортирует).
+
+        :param cursor: курсор из next_cursor предыдущей страницы (None или "" — первая страница)
+        :raises IncorrectCursorException: если курсор некорректен
+        :return: (список доменных сущностей отелей, курсор следующей страницы или None)
+        """
+        last_id = decode_cursor(cursor)
+        query, params = self._filtered_by_time_query(date_from, date_to, location, title, fuzzy, paged=True)
+
+        # id > 0 на первой странице отбирает все отели — отдельная форма запроса не нужна
+        result = await self.session.execute(query, {**params, "last_id": last_id or 0, "limit": limit + 1})
+        return self._page(result.all(), limit)
+
+    @staticmethod
+    def _filtered_by_time_query(
+        date_from: date,
+        date_to: date,
+        location: str | None,
+        title: str | None,
+        fuzzy: bool,
+        paged: bool,
+    ) -> tuple:
+        """
+        Закэшированный запрос отелей со свободными комнатами под набор фильтров и значения его параметров.
 
-        # Фильтрация по названию (регистронезависимо)
+        :return: (запрос, значения bind-параметров без limit/offset/last_id)
+        """
+        in_memory, params = free_rooms_params(date_from, date_to)
+        if location:
+            params["location"] = search_term(location)
         if title:
-            query = query.filter(func.lower(HotelsOrm.title).contains(title.strip().lower()))
+            params["title"] = search_term(title)
+        return _hotels_by_time_query(in_memory, bool(location), bool(title), fuzzy, paged), params
+
+
+@cache
+def _hotels_by_time_query(in_memory: bool, by_location: bool, by_title: bool, fuzzy: bool, paged: bool):
+    """
+    Запрос отелей со свободными комнатами и текстовыми фильтрами с параметрами :date_from, :date_to
+    (или :free_rooms_ids), :location, :title и :limit с :offset (paged=False) или :last_id (paged=True).
+
+    Дерево выражения строится и компилируется один раз на форму запроса — значения передаются
+    при выполнении, а SQLAlchemy и asyncpg переиспользуют скомпилированный текст и подготовленное выражение.
+
+    Наличие свободной комнаты проверяется коррелированным EXISTS для каждого отеля,
+    прошедшего текстовые фильтры, а отели перебираются по порядку id — поэтому LIMIT
+    останавливает проверку, как только набрана страница.
+
+    Текстовые фильтры обслуживаются триграммными GIN-индексами. При fuzzy=True они
+    терпимы к опечаткам, а отели (кроме постраничного режима) сортируются по похожести на запрос.
+    """
+    # Есть ли в отеле хотя бы одна свободная за период комната (semi-join по rooms.hotel_id)
+    free_room_exists = select(RoomsOrm.id).filter(RoomsOrm.hotel_id == HotelsOrm.id, free_rooms_filter(in_memory)).exists()
+
+    # Формируем запрос к таблице отелей с фильтрацией по наличию свободных комнат
+    query = select(*HotelDataMapper.columns())
+    ranking = []
+
+    # Фильтрация по локации (регистронезависимо)
+    if by_location:
+        query = query.filter(text_search(HotelsOrm.location, bindparam("location"), fuzzy))
+        ranking.append(text_similarity(HotelsOrm.location, bindparam("location")))
+
+    # Фильтрация по названию (регистронезависимо)
+    if by_title:
+        query = query.filter(text_search(HotelsOrm.title, bindparam("title"), fuzzy))
+        ranking.append(text_similarity(HotelsOrm.title, bindparam("title")))
+
+    # Проверка свободных комнат — после дешёвых текстовых фильтров
+    query = query.filter(free_room_exists)
 
-        # Применяем пагинацию
-        query = query.limit(limit).offset(offset)
+    if paged:
+        return query.filter(HotelsOrm.id > bindparam("last_id")).order_by(HotelsOrm.id).limit(bindparam("limit"))
 
-        # Выполняем запрос и маппим результат в доменные модели
-        result = await self.session.execute(query)
-        return [self.mapper.map_to_domain_entity(hotel) for hotel in result.scalars().all()]
+    # При нечётком поиске сначала самые похожие отели, затем стабильный порядок для пагинации
+    if fuzzy and ranking:
+        query = query.order_by(*(similarity.desc() for similarity in ranking))
+    return query.order_by(HotelsOrm.id).limit(bindparam("limit")).offset(bindparam("offset"))
@@ -1,6 +1,7 @@
+from functools import cache
 from typing import TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 from src.database import Base
 
@@ -8,6 +9,14 @@ DBModelType = TypeVar("DBModelType", bound=Base)
 SchemaType = TypeVar("SchemaType", bound=BaseModel)
 
 
+@cache
+def list_adapter(schema: type[SchemaType]) -> TypeAdapter:
+    """
+    Скомпилированный один раз на схему валидатор списка: TypeAdapter(list[schema]).
+    """
+    return TypeAdapter(list[schema])
+
+
 class DataMapper:
     # Базовый класс маппера. Предназначен для наследования.
 
@@ -22,6 +31,43 @@ class DataMapper:
         """
         return cls.schema.model_validate(data, from_attributes=True)
 
+    @classmethod
+    @cache
+    def columns(cls) -> tuple:
+        """
+        Колонки модели БД, соответствующие полям схемы (в порядке полей схемы).
+
+        Используются в select(*mapper.columns()), чтобы читать строки без создания ORM-объектов.
+        Поля схемы, которых нет среди колонок таблицы (например, связи), пропускаются.
+        """
+        table_columns = cls.db_model.__table__.c
+        return tuple(getattr(cls.db_model, name) for name in cls.schema.model_fields if name in table_columns)
+
+    @classmethod
+    def map_rows_to_domain_entities(cls, rows) -> list:
+        """
+        Преобразует строки запроса select(*cls.columns()) в список Pydantic-схем одним вызовом валидатора.
+
+        Без ORM-объектов, identity map и from_attributes — строки превращаются в словари
+        по именам колонок и валидируются пакетом.
+        """
+        keys = [column.key for column in cls.columns()]
+        return cls.map_dicts_to_domain_entities([dict(zip(keys, row)) for row in rows])
+
+    @classmethod
+    def map_row_to_domain_entity(cls, row):
+        """
+        Преобразует одну строку запроса select(*cls.columns()) в Pydantic-схему.
+        """
+        return cls.map_rows_to_domain_entities([row])[0]
+
+    @classmethod
+    def map_dicts_to_domain_entities(cls, data: list[dict]) -> list:
+        """
+        Пакетная валидация словарей (например, строк с подгруженными связями) в список Pydantic-схем.
+        """
+        return list_adapter(cls.schema).validate_python(data)
+
     @classmethod
     def map_to_persistence_entity(cls, data):
         """
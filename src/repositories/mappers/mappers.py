@@ -1,6 +1,7 @@
 from src.models.bookings import BookingsOrm
 from src.models.facilities import FacilitiesOrm
 from src.models.hotels import HotelsOrm
+from src.models.room_inventory import RoomInventoryOrm
 from src.models.rooms import RoomsOrm
 from src.models.users import UsersOrm
 
@@ -8,6 +9,7 @@ from src.repositories.mappers.base import DataMapper  # Базовый мапп
 from src.schemas.bookings import Booking
 from src.schemas.facilities import Facility
 from src.schemas.hotels import Hotel
+from src.schemas.room_inventory import RoomInventory
 from src.schemas.rooms import Room, RoomWithRels
 from src.schemas.users import User
 
@@ -70,3 +72,13 @@ class FacilityDataMapper(DataMapper):
 
     db_model = FacilitiesOrm
     schema = Facility
+
+
+class RoomInventoryDataMapper(DataMapper):
+    """
+    Маппер посуточной загрузки комнаты:
+    ORM-модель → Pydantic-схема RoomInventory
+    """
+
+    db_model = RoomInventoryOrm
+    schema = RoomInventory
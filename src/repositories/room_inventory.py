@@ -0,0 +1,100 @@
+from collections import Counter
+from datetime import date, timedelta
+from sqlalchemy import select, delete, func, Date, literal_column
+from sqlalchemy.dialects.postgresql import insert
+
+from src.models.bookings import BookingsOrm  # ORM-модель бронирований
+from src.models.room_inventory import RoomInventoryOrm  # ORM-модель посуточной загрузки
+from src.repositories.base import BaseRepository  # Базовый репозиторий
+from src.repositories.mappers.mappers import RoomInventoryDataMapper  # Маппер ORM → доменная модель
+from src.repositories.utils import bookings_overlap  # Условие пересечения брони с периодом
+from src.schemas.bookings import BookingAdd  # Pydantic-схема брони (нужны room_id и даты)
+
+# Максимум строк в одном INSERT (у asyncpg ограничение на количество параметров в запросе)
+INSERT_CHUNK_SIZE = 5000
+
+
+def booking_days(date_from, date_to):
+    """
+    SQL-выражение: все дни брони с date_from по date_to включительно (generate_series).
+
+    :param date_from: дата заезда (значение или колонка)
+    :param date_to: дата выезда (значение или колонка)
+    """
+    return func.generate_series(date_from, date_to, literal_column("interval '1 day'")).cast(Date)
+
+
+def inventory_upsert(upsert_stmt):
+    """
+    Добавляет к INSERT в room_inventory ON CONFLICT (room_id, day) DO UPDATE:
+    booked прибавляется к уже существующей загрузке дня.
+
+    :param upsert_stmt: postgresql insert(RoomInventoryOrm) с values() или from_select()
+    """
+    return upsert_stmt.on_conflict_do_update(
+        index_elements=[RoomInventoryOrm.room_id, RoomInventoryOrm.day],
+        set_={"booked": RoomInventoryOrm.booked + upsert_stmt.excluded.booked},
+    )
+
+
+class RoomInventoryRepository(BaseRepository):
+    """
+    Репозиторий посуточной загрузки комнат (room_inventory).
+
+    Обновляется в той же транзакции, что и bookings, и умеет пересобираться
+    из bookings для устранения расхождений.
+    """
+
+    model = RoomInventoryOrm
+    mapper = RoomInventoryDataMapper
+
+    async def apply_bookings(self, bookings: list[BookingAdd], delta: int) -> None:
+        """
+        Прибавляет delta к загрузке каждого дня каждой из переданных броней.
+
+        :param bookings: брони (используются room_id, date_from, date_to)
+        :param delta: +1 при создании брони, -1 при удалении
+        """
+        days_booked = Counter()
+        for booking in bookings:
+            day = booking.date_from
+            while day <= booking.date_to:
+                days_booked[(booking.room_id, day)] += delta
+                day += timedelta(days=1)
+
+        rows = [{"room_id": room_id, "day": day, "booked": booked} for (room_id, day), booked in days_booked.items() if booked]
+        for i in range(0, len(rows), INSERT_CHUNK_SIZE):
+            upsert_stmt = inventory_upsert(insert(self.model).values(rows[i : i + INSERT_CHUNK_SIZE]))
+            await self.session.execute(upsert_stmt)
+
+    async def rebuild(self, room_id: int | None = None, date_from: date | None = None, date_to: date | None = None) -> None:
+        """
+        Пересобирает загрузку из таблицы bookings (для одной комнаты или целиком).
+
+        Если передан период, пересобираются только его дни: брони выбираются
+        по пересечению периодов (GiST-индекс), а их дни обрезаются границами периода.
+
+        :param room_id: ID комнаты (если None — все комнаты)
+        :param date_from: начало периода (вместе с date_to; если None — все дни)
+        :param date_to: конец периода
+        """
+        delete_stmt = delete(self.model)
+        days_from, days_to = BookingsOrm.date_from, BookingsOrm.date_to
+        bookings_filter = []
+        if room_id is not None:
+            delete_stmt = delete_stmt.filter_by(room_id=room_id)
+            bookings_filter.append(BookingsOrm.room_id == room_id)
+        if date_from is not None and date_to is not None:
+            delete_stmt = delete_stmt.filter(self.model.day.between(date_from, date_to))
+            bookings_filter.append(bookings_overlap(date_from, date_to))
+            days_from, days_to = func.greatest(days_from, date_from), func.least(days_to, date_to)
+
+        bookings_days = select(BookingsOrm.room_id, booking_days(days_from, days_to).label("day")).filter(*bookings_filter).subquery(name="bookings_days")
+
+        await self.session.execute(delete_stmt)
+        await self.session.execute(
+            insert(self.model).from_select(
+                ["room_id", "day", "booked"],
+                select(bookings_days.c.room_id, bookings_days.c.day, func.count()).group_by(bookings_days.c.room_id, bookings_days.c.day),
+            )
+        )
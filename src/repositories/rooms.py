@@ -1,16 +1,20 @@
+from collections import defaultdict
 from datetime import date
-from sqlalchemy import select
-from sqlalchemy.exc import NoResultFound
-from sqlalchemy.orm import selectinload
+from functools import cache
+
+from sqlalchemy import Integer, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from src.exceptions import RoomNotFoundException
+from src.models.facilities import FacilitiesOrm, RoomsFacilitiesOrm  # ORM-модели удобств и связи комната-удобство
 from src.models.rooms import RoomsOrm  # ORM-модель комнат
 from src.repositories.base import BaseRepository  # Базовый репозиторий
 from src.repositories.mappers.mappers import (
     RoomDataMapper,
     RoomDataWithRelsMapper,
 )  # Мапперы ORM → доменная модель
-from src.repositories.utils import rooms_ids_for_booking  # Утилита для фильтрации доступных комнат по датам
+from src.repositories.utils import free_rooms_filter, free_rooms_params  # Условие «комната свободна в период»
+from src.utils.entity_cache import rooms_cache, rooms_with_rels_cache  # Кэш комнат по id
 
 
 class RoomsRepository(BaseRepository):
@@ -21,6 +25,7 @@ class RoomsRepository(BaseRepository):
 
     model = RoomsOrm
     mapper = RoomDataMapper
+    entity_cache = rooms_cache
 
     async def get_filtered_by_time(
         self,
@@ -36,16 +41,11 @@ class RoomsRepository(BaseRepository):
         :param date_to: дата окончания периода бронирования
         :return: список доменных сущностей комнат с удобствами
         """
-        # Получаем ID всех свободных комнат для заданного отеля и дат
-        rooms_ids_to_get = rooms_ids_for_booking(date_from, date_to, hotel_id)
-
-        # Формируем запрос с жадной загрузкой удобств
-        query = select(self.model).options(selectinload(self.model.facilities)).filter(RoomsOrm.id.in_(rooms_ids_to_get))
-
-        result = await self.session.execute(query)
+        in_memory, params = free_rooms_params(date_from, date_to, hotel_id)
+        result = await self.session.execute(_free_rooms_query(in_memory), {"hotel_id": hotel_id, **params})
 
-        # Преобразуем ORM-модели в доменные модели
-        return [RoomDataWithRelsMapper.map_to_domain_entity(model) for model in result.unique().scalars().all()]
+        # Преобразуем строки в доменные модели вместе с удобствами
+        return await self._with_facilities(result.all())
 
     async def get_one_with_rels(self, **filter_by):
         """
@@ -55,13 +55,73 @@ class RoomsRepository(BaseRepository):
         :raises RoomNotFoundException: если комната не найдена
         :return: доменная модель комнаты с удобствами
         """
-        # Жадно загружаем связанные удобства
-        query = select(self.model).options(selectinload(self.model.facilities)).filter_by(**filter_by)
+        if "id" in filter_by and filter_by.keys() <= {"id", "hotel_id"}:
+            # По id — через кэш комнат с удобствами; принадлежность отелю проверяем по закэшированной комнате
+            room = await rooms_with_rels_cache.get(filter_by["id"], self._get_with_rels_by_ids)
+            if room is None or room.hotel_id != filter_by.get("hotel_id", room.hotel_id):
+                raise RoomNotFoundException
+            return room
+
+        query = select(*RoomDataWithRelsMapper.columns()).filter_by(**filter_by)
         result = await self.session.execute(query)
 
-        try:
-            model = result.scalar_one()
-        except NoResultFound:
+        rooms = await self._with_facilities(result.all())
+        if len(rooms) != 1:
             raise RoomNotFoundException
 
-        return RoomDataWithRelsMapper.map_to_domain_entity(model)
+        return rooms[0]
+
+    async def get_many_with_rels_by_ids(self, ids) -> dict:
+        """
+        Комнаты с удобствами по списку id (через кэш): недостающие в кэше — двумя запросами на все.
+
+        :param ids: id комнат
+        :return: словарь id → доменная модель комнаты с удобствами (только найденные)
+        """
+        return await rooms_with_rels_cache.get_many(ids, self._get_with_rels_by_ids)
+
+    async def _get_with_rels_by_ids(self, ids: list[int]) -> list:
+        result = await self.session.execute(select(*RoomDataWithRelsMapper.columns()).filter(RoomsOrm.id.in_(ids)))
+        return await self._with_facilities(result.all())
+
+    async def _with_facilities(self, rows) -> list:
+        """
+        Дополняет строки комнат их удобствами (одним запросом на все комнаты) и маппит в RoomWithRels.
+
+        :param rows: строки запроса select(*RoomDataWithRelsMapper.columns())
+        :return: список доменных сущностей комнат с удобствами
+        """
+        keys = [column.key for column in RoomDataWithRelsMapper.columns()]
+        rooms = [dict(zip(keys, row)) for row in rows]
+        if not rooms:
+            return []
+
+        facilities = defaultdict(list)
+        for room_id, facility_id, title in await self.session.execute(_rooms_facilities_query(), {"rooms_ids": [room["id"] for room in rooms]}):
+            facilities[room_id].append({"id": facility_id, "title": title})
+
+        for room in rooms:
+            room["facilities"] = facilities[room["id"]]
+        return RoomDataWithRelsMapper.map_dicts_to_domain_entities(rooms)
+
+
+@cache
+def _free_rooms_query(in_memory: bool):
+    """
+    Комнаты отеля :hotel_id, свободные в заданные даты (загрузка проверяется только для комнат этого отеля).
+
+    Строится один раз на источник данных о загрузке; значения передаются параметрами при выполнении.
+    """
+    return select(*RoomDataWithRelsMapper.columns()).filter(RoomsOrm.hotel_id == bindparam("hotel_id"), free_rooms_filter(in_memory))
+
+
+@cache
+def _rooms_facilities_query():
+    """
+    Удобства комнат из списка :rooms_ids (массив — текст запроса не зависит от количества комнат).
+    """
+    return (
+        select(RoomsFacilitiesOrm.room_id, FacilitiesOrm.id, FacilitiesOrm.title)
+        .join(FacilitiesOrm, FacilitiesOrm.id == RoomsFacilitiesOrm.facility_id)
+        .filter(RoomsFacilitiesOrm.room_id == any_(bindparam("rooms_ids", type_=ARRAY(Integer))))
+    )
@@ -1,7 +1,34 @@
 from datetime import date
-from sqlalchemy import select, func
-from src.models.rooms import RoomsOrm
+from functools import cache
+
+from sqlalchemy import Integer, any_, bindparam, select, func, or_
+from sqlalchemy.dialects.postgresql import ARRAY
+from src.config import settings
+from src.init import availability_index
 from src.models.bookings import BookingsOrm
+from src.models.rooms import RoomsOrm
+from src.models.room_inventory import RoomInventoryOrm
+
+
+def room_is_free(date_from: date, date_to: date):
+    """
+    Коррелированное условие «у комнаты RoomsOrm есть свободный экземпляр на весь период».
+
+    Комната свободна, если в периоде нет ни одного дня, где занято не меньше экземпляров,
+    чем quantity (NOT EXISTS по первичному ключу room_inventory (room_id, day)).
+    Условие вычисляется для конкретной комнаты, поэтому фильтры по отелю и LIMIT внешнего
+    запроса применяются до проверки загрузки, а не после агрегации по всем комнатам.
+
+    :param date_from: дата заезда
+    :param date_to: дата выезда
+    :return: SQL-условие для filter() в запросе, где участвует RoomsOrm
+    """
+    full_days = select(RoomInventoryOrm.day).filter(
+        RoomInventoryOrm.room_id == RoomsOrm.id,
+        RoomInventoryOrm.day.between(date_from, date_to),
+        RoomInventoryOrm.booked >= RoomsOrm.quantity,
+    )
+    return ~full_days.exists()
 
 
 def rooms_ids_for_booking(
@@ -10,51 +37,113 @@ def rooms_ids_for_booking(
     hotel_id: int | None = None,
 ):
     """
-    Возвращает SQL-запрос на выборку ID свободных комнат на указанный период.
+    Возвращает SQL-запрос на выборку ID свободных комнат на указанный период и значения его параметров.
 
     Комната считается свободной, если:
-    - она не полностью забронирована в указанные даты;
+    - в каждый день периода занято меньше экземпляров, чем quantity (см. room_is_free);
     - относится к нужному отелю (если передан hotel_id).
 
+    Запрос строится один раз на форму (с отелем или без) и дальше переиспользуется:
+    SQLAlchemy берёт его из кэша компиляции, а asyncpg — готовое подготовленное выражение.
+
     :param date_from: дата заезда
     :param date_to: дата выезда
     :param hotel_id: фильтрация по отелю (необязательно)
-    :return: SQL-запрос (select), который можно использовать в других ORM-запросах
-    """
-
-    # Считаем количество бронирований по room_id, которые пересекаются с диапазоном дат
-    rooms_count = (
-        select(BookingsOrm.room_id, func.count("*").label("rooms_booked"))
-        .filter(
-            BookingsOrm.date_from <= date_to,  # Бронь начинается до окончания периода
-            BookingsOrm.date_to >= date_from,  # Бронь заканчивается после начала периода
-        )
-        .group_by(BookingsOrm.room_id)
-        .cte(name="rooms_count")  # Создаём CTE (временную таблицу)
-    )
+    :return: (запрос с параметрами :date_from, :date_to[, :hotel_id], значения параметров) для session.execute
+    """
+    params = {"date_from": date_from, "date_to": date_to}
+    if hotel_id is not None:
+        params["hotel_id"] = hotel_id
+    return _rooms_ids_for_booking_query(hotel_id is not None), params
 
-    # Вычисляем количество свободных мест по каждой комнате:
-    # total_quantity - уже забронировано
-    rooms_left_table = (
-        select(
-            RoomsOrm.id.label("room_id"),
-            (RoomsOrm.quantity - func.coalesce(rooms_count.c.rooms_booked, 0)).label("rooms_left"),
-        )
-        .outerjoin(rooms_count, RoomsOrm.id == rooms_count.c.room_id)
-        .cte(name="rooms_left_table")
-    )
 
-    # Фильтрация: получаем ID комнат для нужного отеля (если указан)
-    rooms_ids_for_hotel = select(RoomsOrm.id)
-    if hotel_id is not None:
-        rooms_ids_for_hotel = rooms_ids_for_hotel.filter_by(hotel_id=hotel_id)
-    rooms_ids_for_hotel = rooms_ids_for_hotel.subquery(name="rooms_ids_for_hotel")
-
-    # Финальный SQL-запрос:
-    # выбираем только те комнаты, у которых осталось > 0 мест и которые принадлежат нужному отелю
-    rooms_ids_to_get = select(rooms_left_table.c.room_id).filter(
-        rooms_left_table.c.rooms_left > 0,
-        rooms_left_table.c.room_id.in_(rooms_ids_for_hotel),
-    )
+@cache
+def _rooms_ids_for_booking_query(by_hotel: bool):
+    query = select(RoomsOrm.id).filter(room_is_free(bindparam("date_from"), bindparam("date_to")))
+    if by_hotel:
+        query = query.filter(RoomsOrm.hotel_id == bindparam("hotel_id"))
+    return query  # Возвращаем сам SQL-запрос (не выполняем его)
+
+
+def bookings_overlap(date_from: date, date_to: date):
+    """
+    Условие «бронь пересекается с периодом [date_from, date_to]» через оператор диапазонов &&.
+
+    В отличие от пары сравнений date_from/date_to, такой предикат использует
+    GiST-индекс ix_bookings_room_id_period (в том числе вместе с фильтром по room_id).
+
+    :param date_from: начало периода (включительно)
+    :param date_to: конец периода (включительно)
+    :return: SQL-условие для filter()
+    """
+    return BookingsOrm.period.overlaps(func.daterange(date_from, date_to, "[]"))
 
-    return rooms_ids_to_get  # Возвращаем сам SQL-запрос (не выполняем его)
+
+def search_term(term: str) -> str:
+    """
+    Строка поиска в том виде, в котором её сравнивают с lower(column): без пробелов по краям, в нижнем регистре.
+    """
+    return term.strip().lower()
+
+
+def text_search(column, term, fuzzy: bool = False):
+    """
+    Регистронезависимый поиск подстроки в колонке: lower(column) LIKE '%term%'.
+
+    При fuzzy=True дополнительно находит строки, содержащие слово, похожее на term
+    (оператор pg_trgm `<%`, порог pg_trgm.word_similarity_threshold) — терпимо к опечаткам.
+    Оба варианта используют триграммный GIN-индекс по lower(column).
+
+    :param column: колонка ORM-модели
+    :param term: строка поиска, уже нормализованная search_term, или bind-параметр с ней
+    :param fuzzy: включить нечёткое совпадение
+    :return: SQL-условие для filter()
+    """
+    condition = func.lower(column).contains(term)
+    if fuzzy:
+        condition = or_(condition, func.lower(column).bool_op("%>")(term))
+    return condition
+
+
+def text_similarity(column, term):
+    """
+    Похожесть term (см. text_search) на лучшее совпадающее слово в колонке (word_similarity, от 0 до 1) — для сортировки.
+    """
+    return func.word_similarity(term, func.lower(column))
+
+
+def free_rooms_params(
+    date_from: date,
+    date_to: date,
+    hotel_id: int | None = None,
+) -> tuple[bool, dict]:
+    """
+    Источник данных о свободных комнатах и значения параметров условия free_rooms_filter.
+
+    При AVAILABILITY_ENGINE="memory" и загруженном индексе ID свободных комнат берутся из памяти
+    (для периодов, начинающихся не в прошлом), иначе загрузку проверяет сама БД по датам.
+
+    :param date_from: дата заезда
+    :param date_to: дата выезда
+    :param hotel_id: отель, которым ограничивается список ID из индекса (необязательно)
+    :return: (in_memory для free_rooms_filter, значения bind-параметров)
+    """
+    if settings.AVAILABILITY_ENGINE == "memory" and availability_index.covers(date_from):
+        return True, {"free_rooms_ids": availability_index.free_rooms_ids(date_from, date_to, hotel_id)}
+    return False, {"date_from": date_from, "date_to": date_to}
+
+
+def free_rooms_filter(in_memory: bool):
+    """
+    Условие на RoomsOrm «комната свободна в период» для запросов комнат и отелей (значения — из free_rooms_params).
+
+    - in_memory=True: `rooms.id = ANY(:free_rooms_ids)` — список ID передаётся одним массивом,
+      поэтому текст запроса (и подготовленное выражение) не зависит от длины списка
+    - in_memory=False: коррелированное условие room_is_free по :date_from и :date_to
+
+    :param in_memory: ID свободных комнат взяты из in-memory индекса
+    :return: SQL-условие для filter()
+    """
+    if in_memory:
+        return RoomsOrm.id == any_(bindparam("free_rooms_ids", type_=ARRAY(Integer)))
+    return room_is_free(bindparam("date_from"), bindparam("date_to"))
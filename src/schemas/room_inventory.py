@@ -0,0 +1,14 @@
+from datetime import date
+from pydantic import BaseModel, ConfigDict
+
+
+class RoomInventory(BaseModel):
+    """
+    Загрузка комнаты в конкретный день: сколько экземпляров уже забронировано.
+    """
+
+    room_id: int
+    day: date
+    booked: int
+
+    model_config = ConfigDict(from_attributes=True)  # Автоматическое преобразование из ORM
@@ -1,5 +1,7 @@
 from src.utils.db_manager import DBManager
 
+DEFAULT_PER_PAGE = 5  # Размер страницы, если per_page не передан
+
 
 class BaseService:
     """
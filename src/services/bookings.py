@@ -1,6 +1,8 @@
-from src.exceptions import ObjectNotFoundException, RoomNotFoundException
-from src.schemas.bookings import BookingAddRequest, BookingAdd
-from src.services.base import BaseService
+from src.config import settings
+from src.init import availability_index
+from src.schemas.bookings import BookingAddRequest
+from src.services.base import BaseService, DEFAULT_PER_PAGE
+from src.utils.cache import AVAILABILITY_TAG, hotel_availability_tag, invalidate_cache_tags
 
 
 class BookingService(BaseService):
@@ -15,49 +17,57 @@ class BookingService(BaseService):
         """
         Добавляет новое бронирование для пользователя.
 
-        Этот метод выполняет проверку доступности комнаты и её цены, затем создает
-        бронирование с переданными данными. Если комната не найдена, выбрасывается исключение.
+        Поиск комнаты, её цена, проверка свободных мест и вставка брони выполняются
+        в репозитории одним SQL-запросом (один round trip до БД). Одновременные брони
+        одной комнаты упорядочиваются согласно BOOKING_LOCK_MODE.
 
         Args:
             user_id (int): ID авторизованного пользователя.
             booking_data (BookingAddRequest): Данные для бронирования, включая ID комнаты, даты.
 
         Returns:
-            BookingAdd: Объект с данными добавленного бронирования.
+            Booking: Объект с данными добавленного бронирования.
 
         Raises:
             RoomNotFoundException: Если комната с указанным ID не найдена в базе.
-            AllRoomsAreBookedException: Если все номера в отеле заняты.
+            AllRoomsAreBookedException: Если все номера этой комнаты заняты.
+            TransactionConflictException: Если в режиме "serializable" бронь не прошла за DB_SERIALIZATION_RETRIES повторов.
         """
-        try:
-            room = await self.db.rooms.get_one(id=booking_data.room_id)  # Получаем объект комнаты по ID, чтобы узнать её цену
-        except ObjectNotFoundException as ex:
-            raise RoomNotFoundException from ex
-        hotel = await self.db.hotels.get_one(id=room.hotel_id)  # Получаем отель, к которому принадлежит комната (нужен для проверки доступности)
-        room_price: int = room.price  # Получаем цену комнаты
-        # Собираем полные данные для бронирования:
-        # добавляем user_id и цену, а остальные поля берём из запроса
-        _booking_data = BookingAdd(
-            user_id=user_id,
-            price=room_price,
-            **booking_data.model_dump(),
-        )
-        booking = await self.db.bookings.add_booking(_booking_data, hotel_id=hotel.id)  # Добавляем бронирование с учётом доступности комнаты в отеле
-        await self.db.commit()  # Сохраняем изменения в базе
+        if settings.BOOKING_LOCK_MODE == "serializable":
+            booking, hotel_id = await self.db.run_serializable(self._add_booking, user_id, booking_data)
+        else:
+            booking, hotel_id = await self._add_booking(user_id, booking_data)
+        await availability_index.notify_booking(booking)  # Учитываем бронь в in-memory индексах процессов (только после коммита)
+        await invalidate_cache_tags(AVAILABILITY_TAG, hotel_availability_tag(hotel_id))  # Свободных комнат стало меньше
         return booking
 
-    async def get_bookings(self):
+    async def _add_booking(self, user_id: int, booking_data: BookingAddRequest):
+        """
+        Транзакция бронирования: блокировка комнаты (если нужна), вставка брони и commit.
+        Возвращает бронь и ID отеля комнаты.
+        """
+        if settings.BOOKING_LOCK_MODE in ("advisory", "row"):
+            await self.db.bookings.lock_room(booking_data.room_id, settings.BOOKING_LOCK_MODE)
+        booking, hotel_id = await self.db.bookings.add_booking(user_id, booking_data)  # Проверка доступности и вставка одним запросом
+        await self.db.commit()  # Сохраняем изменения в базе
+        return booking, hotel_id
+
+    async def get_bookings(self, pagination=None):
         """
         Получает все бронирования.
 
         Этот метод возвращает список всех бронирований, доступных в системе.
+        Если в пагинации передан per_page — только одну страницу (LIMIT/OFFSET по id).
+
+        Args:
+            pagination (PaginationParams | None): Параметры пагинации `page` и `per_page`.
 
         Returns:
             list: Список всех бронирований.
         """
-        return await self.db.bookings.get_all()
+        return await self.db.bookings.get_filtered(**self._page_kwargs(pagination))
 
-    async def get_my_bookings(self, user_id: int):
+    async def get_my_bookings(self, user_id: int, pagination=None):
         """
         Получает все бронирования текущего пользователя.
 
@@ -65,8 +75,61 @@ class BookingService(BaseService):
 
         Args:
             user_id (int): ID текущего пользователя.
+            pagination (PaginationParams | None): Параметры пагинации `page` и `per_page`.
 
         Returns:
             list: Список бронирований текущего пользователя.
         """
-        return await self.db.bookings.get_filtered(user_id=user_id)
+        return await self.db.bookings.get_filtered(user_id=user_id, **self._page_kwargs(pagination))
+
+    async def get_bookings_page(self, cursor: str, per_page: int | None, **filter_by):
+        """
+        Получает страницу бронирований по курсору (keyset-пагинация по id).
+
+        Args:
+            cursor (str): Курсор из next_cursor предыдущей страницы ("" — первая страница).
+            per_page (int | None): Размер страницы (по умолчанию 5).
+            filter_by: Фильтры, например user_id.
+
+        Returns:
+            tuple: Список бронирований и курсор следующей страницы (или None).
+        """
+        return await self.db.bookings.get_page(limit=per_page or DEFAULT_PER_PAGE, cursor=cursor, **filter_by)
+
+    async def export_bookings(self, export_format: str, **filter_by):
+        """
+        Потоковая выгрузка бронирований в NDJSON (по объекту на строку) или JSON-массив.
+
+        Бронирования читаются из БД серверным курсором и сериализуются порциями,
+        так что в памяти одновременно находится не больше одной порции.
+
+        Args:
+            export_format (str): "ndjson" или "json".
+            filter_by: Фильтры, например user_id.
+
+        Yields:
+            str: Очередной фрагмент ответа.
+        """
+        is_json = export_format == "json"
+        chunk, exported = ["["] if is_json else [], 0
+
+        async for booking in self.db.bookings.stream_filtered(**filter_by):
+            if is_json and exported:
+                chunk.append(",")
+            chunk.append(booking.model_dump_json())
+            if not is_json:
+                chunk.append("\n")
+            exported += 1
+            if exported % settings.DB_STREAM_CHUNK_SIZE == 0:
+                yield "".join(chunk)
+                chunk = []
+
+        if is_json:
+            chunk.append("]")
+        yield "".join(chunk)
+
+    @staticmethod
+    def _page_kwargs(pagination) -> dict:
+        if pagination is None or pagination.per_page is None:
+            return {}  # Без per_page — все бронирования, как раньше
+        return {"limit": pagination.per_page, "offset": pagination.per_page * (pagination.page - 1)}
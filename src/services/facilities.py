@@ -1,6 +1,6 @@
 from src.schemas.facilities import FacilityAdd
 from src.services.base import BaseService
-from src.tasks.tasks import test_task
+from src.utils.cache import FACILITIES_TAG, invalidate_cache_tags
 
 
 class FacilityService(BaseService):
@@ -18,8 +18,12 @@ class FacilityService(BaseService):
         # Добавляем удобство в базу данных
         facility = await self.db.facilities.add(data)
         await self.db.commit()
+        await invalidate_cache_tags(FACILITIES_TAG)
+
+        # Запускаем фоновую задачу (например, для логов или уведомлений).
+        # Celery импортируется при первом вызове, а не при старте веб-процесса
+        from src.tasks.tasks import test_task
 
-        # Запускаем фоновую задачу (например, для логов или уведомлений)
         test_task.delay()  # type: ignore — отключаем проверку типов для Celery
 
         return facility
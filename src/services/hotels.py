@@ -2,7 +2,9 @@ from datetime import date
 
 from src.exceptions import check_date_to_after_date_from, ObjectNotFoundException, HotelNotFoundException
 from src.schemas.hotels import HotelAdd, HotelPatch, Hotel
-from src.services.base import BaseService
+from src.services.base import BaseService, DEFAULT_PER_PAGE
+from src.utils.cache import HOTELS_TAG, hotel_availability_tag, invalidate_cache_tags
+from src.utils.entity_cache import hotels_cache
 
 
 class HotelService(BaseService):
@@ -17,6 +19,7 @@ class HotelService(BaseService):
         title: str | None,  # Название отеля (опционально)
         date_from: date,  # Дата начала периода
         date_to: date,  # Дата конца периода
+        fuzzy: bool = False,  # Нечёткий поиск по локации и названию
     ):
         """
         Получение списка отелей по фильтрам: локация, название, дата, пагинация.
@@ -29,11 +32,12 @@ class HotelService(BaseService):
         :param title: фильтрация по названию (необязательно)
         :param date_from: дата начала периода
         :param date_to: дата конца периода
+        :param fuzzy: нечёткий поиск (терпимый к опечаткам) с сортировкой по похожести
         :return: список подходящих отелей
         """
         check_date_to_after_date_from(date_from, date_to)  # Проверка корректности дат
 
-        per_page = pagination.per_page or 5  # Значение по умолчанию
+        per_page = pagination.per_page or DEFAULT_PER_PAGE
         offset = per_page * (pagination.page - 1)
 
         # Получение отелей с фильтрацией и пагинацией
@@ -44,6 +48,36 @@ class HotelService(BaseService):
             title=title,
             limit=per_page,
             offset=offset,
+            fuzzy=fuzzy,
+        )
+
+    async def get_hotels_page(
+        self,
+        pagination,  # Параметры пагинации: используется только per_page
+        cursor: str,  # Курсор предыдущей страницы ("" — первая страница)
+        location: str | None,
+        title: str | None,
+        date_from: date,
+        date_to: date,
+        fuzzy: bool = False,
+    ):
+        """
+        Получение страницы отелей по курсору (keyset-пагинация по id отеля).
+
+        :param pagination: объект с полем `per_page`
+        :param cursor: курсор из next_cursor предыдущей страницы
+        :return: (список отелей, курсор следующей страницы или None)
+        """
+        check_date_to_after_date_from(date_from, date_to)  # Проверка корректности дат
+
+        return await self.db.hotels.get_page_filtered_by_time(
+            date_from=date_from,
+            date_to=date_to,
+            location=location,
+            title=title,
+            limit=pagination.per_page or DEFAULT_PER_PAGE,
+            cursor=cursor,
+            fuzzy=fuzzy,
         )
 
     async def get_hotel(self, hotel_id: int):
@@ -64,6 +98,7 @@ class HotelService(BaseService):
         """
         hotel = await self.db.hotels.add(data)
         await self.db.commit()
+        await invalidate_cache_tags(HOTELS_TAG)
         return hotel
 
     async def edit_hotel(self, hotel_id: int, data: HotelAdd):
@@ -76,6 +111,8 @@ class HotelService(BaseService):
         """
         await self.db.hotels.edit(data, id=hotel_id)
         await self.db.commit()
+        await invalidate_cache_tags(HOTELS_TAG)
+        await hotels_cache.invalidate(hotel_id)
 
     async def edit_hotel_partially(self, hotel_id: int, data: HotelPatch, exclude_unset: bool = False):
         """
@@ -88,6 +125,8 @@ class HotelService(BaseService):
         """
         await self.db.hotels.edit(data, exclude_unset=exclude_unset, id=hotel_id)
         await self.db.commit()
+        await invalidate_cache_tags(HOTELS_TAG)
+        await hotels_cache.invalidate(hotel_id)
 
     async def delete_hotel(self, hotel_id: int):
         """
@@ -98,6 +137,8 @@ class HotelService(BaseService):
         """
         await self.db.hotels.delete(id=hotel_id)
         await self.db.commit()
+        await invalidate_cache_tags(HOTELS_TAG, hotel_availability_tag(hotel_id))
+        await hotels_cache.invalidate(hotel_id)
 
     async def get_hotel_with_check(self, hotel_id: int) -> Hotel:
         """
@@ -3,7 +3,6 @@ import shutil
 from fastapi import UploadFile, BackgroundTasks
 
 from src.services.base import BaseService
-from src.tasks.tasks import resize_image
 
 
 class ImagesService(BaseService):
@@ -26,5 +25,7 @@ class ImagesService(BaseService):
         with open(image_path, "wb+") as new_file:
             shutil.copyfileobj(file.file, new_file)
 
-        # Добавляем фоновую задачу для ресайза изображения
+        # Добавляем фоновую задачу для ресайза изображения (Pillow и Celery импортируются при первой загрузке)
+        from src.tasks.tasks import resize_image
+
         background_tasks.add_task(resize_image, image_path)
@@ -1,10 +1,13 @@
 from datetime import date
 
 from src.exceptions import check_date_to_after_date_from, ObjectNotFoundException, HotelNotFoundException, RoomNotFoundException
+from src.init import availability_index
 from src.schemas.facilities import RoomFacilityAdd
 from src.schemas.rooms import RoomAddRequest, Room, RoomAdd, RoomPatchRequest, RoomPatch
 from src.services.base import BaseService
 from src.services.hotels import HotelService
+from src.utils.cache import AVAILABILITY_TAG, hotel_availability_tag, invalidate_cache_tags
+from src.utils.entity_cache import rooms_cache, rooms_with_rels_cache
 
 
 class RoomService(BaseService):
@@ -62,6 +65,8 @@ class RoomService(BaseService):
             await self.db.rooms_facilities.add_bulk(rooms_facilities_data)
 
         await self.db.commit()
+        await availability_index.notify_room(room.id, room.hotel_id, room.quantity)
+        await invalidate_cache_tags(AVAILABILITY_TAG, hotel_availability_tag(hotel_id))
 
     async def edit_room(self, hotel_id: int, room_id: int, room_data: RoomAddRequest):
         """
@@ -84,6 +89,10 @@ class RoomService(BaseService):
         # Обновляем удобства
         await self.db.rooms_facilities.set_room_facilities(room_id, facilities_ids=room_data.facilities_ids)
         await self.db.commit()
+        await availability_index.notify_room(room_id, hotel_id, _room_data.quantity)
+        await invalidate_cache_tags(AVAILABILITY_TAG, hotel_availability_tag(hotel_id))
+        await rooms_cache.invalidate(room_id)
+        await rooms_with_rels_cache.invalidate(room_id)
 
     async def partially_edit_room(self, hotel_id: int, room_id: int, room_data: RoomPatchRequest):
         """
@@ -97,7 +106,7 @@ class RoomService(BaseService):
         :return: None
         """
         await HotelService(self.db).get_hotel_with_check(hotel_id)
-        await self.get_room_with_check(room_id)
+        room = await self.get_room_with_check(room_id)
 
         # Получаем только переданные поля (exclude_unset)
         _room_data_dict = room_data.model_dump(exclude_unset=True)
@@ -111,6 +120,10 @@ class RoomService(BaseService):
             await self.db.rooms_facilities.set_room_facilities(room_id, facilities_ids=_room_data_dict["facilities_ids"])
 
         await self.db.commit()
+        await availability_index.notify_room(room_id, hotel_id, _room_data_dict.get("quantity", room.quantity))
+        await invalidate_cache_tags(AVAILABILITY_TAG, hotel_availability_tag(hotel_id))
+        await rooms_cache.invalidate(room_id)
+        await rooms_with_rels_cache.invalidate(room_id)
 
     async def delete_room(self, hotel_id: int, room_id: int):
         """
@@ -127,6 +140,10 @@ class RoomService(BaseService):
 
         await self.db.rooms.delete(id=room_id, hotel_id=hotel_id)
         await self.db.commit()
+        await availability_index.notify_room_removed(room_id)
+        await invalidate_cache_tags(AVAILABILITY_TAG, hotel_availability_tag(hotel_id))
+        await rooms_cache.invalidate(room_id)
+        await rooms_with_rels_cache.invalidate(room_id)
 
     async def get_room_with_check(self, room_id: int) -> Room:
         """
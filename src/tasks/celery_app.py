@@ -1,7 +1,9 @@
 from celery import Celery
+from celery.signals import worker_process_init
 from src.config import (
     settings,
 )  # Импорт настроек (где хранится REDIS_URL и другие переменные окружения)
+from src.database import reset_engines_after_fork  # Сброс унаследованных пулов соединений
 
 # Создание экземпляра Celery
 # "tasks" — имя приложения Celery
@@ -15,6 +17,13 @@ celery_instance = Celery(
     ],
 )
 
+
+# 🍴 Prefork-воркер получает копию родительского процесса: пулы соединений с БД у каждого воркера свои
+@worker_process_init.connect
+def reset_db_engines(**kwargs):
+    reset_engines_after_fork()
+
+
 # Конфигурация планировщика задач (beat)
 # beat_schedule — словарь периодических задач
 celery_instance.conf.beat_schedule = {
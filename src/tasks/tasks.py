@@ -1,7 +1,7 @@
 import asyncio
 import logging
+from datetime import date
 from time import sleep
-from PIL import Image
 import os
 
 from src.database import async_session_maker_null_pool
@@ -21,6 +21,8 @@ def resize_image(image_path: str):
     sizes = [1000, 500, 200]
     output_folder = "src/static/images"
 
+    from PIL import Image  # Pillow нужен только этой задаче
+
     # Открываем изображение
     img = Image.open(image_path)
 
@@ -54,3 +56,23 @@ async def get_bookings_with_today_checkin_helper():
 @celery_instance.task(name="booking_today_checkin")
 def send_emails_to_users_with_today_checkin():
     asyncio.run(get_bookings_with_today_checkin_helper())
+
+
+async def rebuild_room_inventory_helper(room_id: int | None = None, date_from: date | None = None, date_to: date | None = None):
+    async with DBManager(session_factory=async_session_maker_null_pool) as db:
+        await db.room_inventory.rebuild(room_id=room_id, date_from=date_from, date_to=date_to)
+        await db.commit()
+    logging.info(f"room_inventory пересобрана из bookings ({room_id=}, {date_from=}, {date_to=})")
+
+
+# Ручной запуск для устранения расхождений room_inventory с bookings:
+# celery --app=src.tasks.celery_app:celery_instance call rebuild_room_inventory [--args='[<room_id>, "2025-08-01", "2025-08-31"]']
+@celery_instance.task(name="rebuild_room_inventory")
+def rebuild_room_inventory(room_id: int | None = None, date_from: str | None = None, date_to: str | None = None):
+    asyncio.run(
+        rebuild_room_inventory_helper(
+            room_id,
+            date.fromisoformat(date_from) if date_from else None,
+            date.fromisoformat(date_to) if date_to else None,
+        )
+    )
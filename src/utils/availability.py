@@ -0,0 +1,283 @@
+import asyncio
+import json
+import logging
+from collections.abc import Callable
+from datetime import date, timedelta
+from typing import TYPE_CHECKING
+
+from src.models.bookings import BookingsOrm
+from src.schemas.bookings import Booking
+from src.schemas.rooms import Room
+
+if TYPE_CHECKING:
+    from src.connectors.redis_connector import RedisManager
+    from src.utils.db_manager import DBManager  # Только для аннотаций (избегаем циклического импорта)
+
+
+def today() -> date:
+    """
+    Текущая дата: прошедшие дни индекс не хранит (отдельной функцией — чтобы подменять в тестах).
+    """
+    return date.today()
+
+
+class RoomOccupancy:
+    """
+    Занятость одной комнаты: сколько экземпляров занято в каждый день (как в room_inventory).
+
+    Комната свободна в период, если в каждый его день занято меньше экземпляров, чем quantity.
+    hotel_id=None, quantity=0 — комната ещё неизвестна (бронь пришла раньше её создания): она не свободна,
+    а брони сохраняются до прихода данных комнаты.
+    """
+
+    __slots__ = ("hotel_id", "quantity", "booked")
+
+    def __init__(self, hotel_id: int | None, quantity: int):
+        self.hotel_id = hotel_id
+        self.quantity = quantity
+        self.booked: dict[date, int] = {}  # День → количество занятых экземпляров
+
+    def add(self, date_from: date, date_to: date) -> None:
+        day = max(date_from, today())  # Прошедшие дни не храним
+        while day <= date_to:
+            self.booked[day] = self.booked.get(day, 0) + 1
+            day += timedelta(days=1)
+
+    def max_booked(self, date_from: date, date_to: date) -> int:
+        """
+        Максимальная посуточная загрузка в периоде [date_from, date_to].
+        """
+        if not self.booked:
+            return 0
+        days = (date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1))
+        return max(self.booked.get(day, 0) for day in days)
+
+    def rooms_left(self, date_from: date, date_to: date) -> int:
+        return self.quantity - self.max_booked(date_from, date_to)
+
+    def prune(self, before: date) -> None:
+        self.booked = {day: count for day, count in self.booked.items() if day >= before}
+
+
+class RoomsAvailabilityIndex:
+    """
+    In-memory индекс доступности комнат.
+
+    Загружается при старте приложения, обновляется после каждого нового бронирования
+    и отвечает на вопрос «какие комнаты свободны в период» без запроса к БД.
+    Пока индекс не загружен, все методы обновления ничего не делают.
+
+    Хранятся только сегодняшний и будущие дни (раз в сутки прошедшие удаляются), поэтому индекс
+    отвечает только за периоды, которые начинаются не раньше сегодняшнего дня (см. covers).
+
+    У каждого процесса приложения (APP_WORKERS, несколько экземпляров) свой индекс. Сервисы меняют его
+    через notify_* — изменение применяется локально и рассылается остальным процессам через канал
+    Redis pub/sub (см. start). При каждой (пере)подписке на канал индекс полностью перезагружается из БД,
+    а пока подписки нет, is_loaded=False и поиск идёт через SQL. Изменения идемпотентны:
+    бронь, уже учтённая при загрузке, повторно не добавляется.
+    """
+
+    def __init__(self):
+        self._rooms: dict[int, RoomOccupancy] = {}  # room_id → занятость комнаты
+        self._hotels: dict[int, set[int]] = {}  # hotel_id → ID комнат отеля
+        self._bookings: dict[int, date] = {}  # Учтённые брони: id → date_to (для идемпотентности)
+        self._pruned_on: date | None = None  # Когда последний раз удалялись прошедшие дни
+        self.is_loaded = False
+        self.redis_manager: "RedisManager | None" = None  # Задаётся в start
+        self.channel: str | None = None
+        self._listener: asyncio.Task | None = None
+
+    async def load(self, db: "DBManager") -> None:
+        """
+        Полная загрузка индекса из БД: все комнаты и все бронирования.
+
+        :param db: менеджер БД с открытой сессией
+        """
+        rooms = await db.rooms.get_all()
+        bookings = await db.bookings.get_filtered(BookingsOrm.date_to >= today())  # Закончившиеся брони индексу не нужны
+        self.rebuild(rooms, bookings)
+
+    def rebuild(self, rooms: list[Room], bookings: list[Booking]) -> None:
+        """
+        Пересобирает индекс по переданным комнатам и бронированиям.
+        """
+        self._rooms = {}
+        self._hotels = {}
+        self._bookings = {}
+        self._pruned_on = today()
+        for room in rooms:
+            self._set_room(room.id, room.hotel_id, room.quantity)
+
+        for booking in bookings:
+            self._add_booking(booking)
+
+        self.is_loaded = True
+
+    def covers(self, date_from: date) -> bool:
+        """
+        Индекс загружен и хранит все дни периода, начинающегося с date_from.
+        """
+        return self.is_loaded and date_from >= today()
+
+    def free_rooms_ids(self, date_from: date, date_to: date, hotel_id: int | None = None) -> list[int]:
+        """
+        ID комнат, у которых осталось хотя бы одно свободное место в указанный период.
+
+        :param date_from: дата заезда
+        :param date_to: дата выезда
+        :param hotel_id: фильтрация по отелю (необязательно)
+        :return: список ID свободных комнат
+        """
+        if hotel_id is None:
+            rooms_ids = self._rooms.keys()
+        else:
+            rooms_ids = self._hotels.get(hotel_id, ())
+
+        return [room_id for room_id in rooms_ids if self._rooms[room_id].rooms_left(date_from, date_to) > 0]
+
+    def add_booking(self, booking: Booking) -> None:
+        """
+        Учитывает новое (уже закоммиченное) бронирование.
+        """
+        if not self.is_loaded:
+            return
+        self._add_booking(booking)
+
+    def set_room(self, room_id: int, hotel_id: int, quantity: int) -> None:
+        """
+        Добавляет комнату или обновляет её отель и количество (брони сохраняются).
+        """
+        if not self.is_loaded:
+            return
+        self._set_room(room_id, hotel_id, quantity)
+
+    def remove_room(self, room_id: int) -> None:
+        """
+        Удаляет комнату из индекса.
+        """
+        if not self.is_loaded:
+            return
+        occupancy = self._rooms.pop(room_id, None)
+        if occupancy is not None and occupancy.hotel_id is not None:
+            self._hotels[occupancy.hotel_id].discard(room_id)
+
+    def apply(self, change: dict) -> None:
+        """
+        Применяет изменение, полученное из канала (формат — см. notify_*).
+        """
+        if change["op"] == "booking":
+            self.add_booking(Booking.model_validate(change["booking"]))
+        elif change["op"] == "room":
+            self.set_room(change["room_id"], change["hotel_id"], change["quantity"])
+        elif change["op"] == "remove_room":
+            self.remove_room(change["room_id"])
+
+    async def notify_booking(self, booking: Booking) -> None:
+        """
+        Учитывает закоммиченную бронь в индексе этого процесса и рассылает её остальным.
+        """
+        self.add_booking(booking)
+        await self._publish({"op": "booking", "booking": booking.model_dump(mode="json")})
+
+    async def notify_room(self, room_id: int, hotel_id: int, quantity: int) -> None:
+        """
+        Добавленная или изменённая комната — в индекс этого процесса и остальным процессам.
+        """
+        self.set_room(room_id, hotel_id, quantity)
+        await self._publish({"op": "room", "room_id": room_id, "hotel_id": hotel_id, "quantity": quantity})
+
+    async def notify_room_removed(self, room_id: int) -> None:
+        """
+        Удалённая комната — из индекса этого процесса и остальных процессов.
+        """
+        self.remove_room(room_id)
+        await self._publish({"op": "remove_room", "room_id": room_id})
+
+    async def start(self, redis_manager: "RedisManager", channel: str, db_factory: Callable[[], "DBManager"]) -> None:
+        """
+        Подписка на канал изменений и загрузка индекса (вызывается в lifespan после подключения к Redis).
+
+        :param redis_manager: подключённый менеджер Redis
+        :param channel: канал pub/sub (общий для всех процессов приложения)
+        :param db_factory: новый DBManager для загрузки индекса из БД
+        """
+        self.redis_manager = redis_manager
+        self.channel = channel
+        ready = asyncio.Event()
+        self._listener = asyncio.create_task(self._listen(ready, db_factory))
+        await ready.wait()
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        self.is_loaded = False
+
+    async def _publish(self, change: dict) -> None:
+        if self.redis_manager is None:
+            return
+        try:
+            await self.redis_manager.publish(self.channel, json.dumps(change))
+        except Exception:
+            # Изменение уже в БД: остальные процессы увидят его после перезагрузки индекса
+            logging.exception(f"Не удалось разослать изменение индекса доступности {change}")
+
+    async def _listen(self, ready: asyncio.Event, db_factory: Callable[[], "DBManager"]) -> None:
+        """
+        Применяет изменения из канала. Подписка — до загрузки из БД: изменения, закоммиченные во время
+        загрузки, ждут в буфере соединения и применяются после неё. При обрыве — переподписка и перезагрузка.
+        """
+        while True:
+            try:
+                async with self.redis_manager.redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async with db_factory() as db:
+                        await self.load(db)
+                    logging.info("Rooms availability index loaded")
+                    ready.set()
+                    while True:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message is not None:
+                            self.apply(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Подписка на изменения индекса доступности прервалась, перезагружаем индекс")
+                self.is_loaded = False  # Изменения могли потеряться: до перезагрузки свободные комнаты ищутся через SQL
+                ready.set()  # Старт приложения не ждёт Redis и БД
+                await asyncio.sleep(1)
+
+    def _add_booking(self, booking: Booking) -> None:
+        self._prune()
+        if booking.id in self._bookings or booking.date_to < today():
+            return
+        occupancy = self._rooms.get(booking.room_id)
+        if occupancy is None:
+            # Комната ещё неизвестна (её создание придёт из канала позже) — бронь не теряем
+            occupancy = self._rooms[booking.room_id] = RoomOccupancy(None, 0)
+        occupancy.add(booking.date_from, booking.date_to)
+        self._bookings[booking.id] = booking.date_to
+
+    def _prune(self) -> None:
+        """
+        Раз в сутки удаляет прошедшие дни и закончившиеся брони: у долго живущего процесса память не растёт.
+        """
+        current = today()
+        if self._pruned_on == current:
+            return
+        self._pruned_on = current
+        for occupancy in self._rooms.values():
+            occupancy.prune(current)
+        self._bookings = {booking_id: date_to for booking_id, date_to in self._bookings.items() if date_to >= current}
+
+    def _set_room(self, room_id: int, hotel_id: int, quantity: int) -> None:
+        occupancy = self._rooms.get(room_id)
+        if occupancy is None:
+            occupancy = self._rooms[room_id] = RoomOccupancy(hotel_id, quantity)
+        elif occupancy.hotel_id != hotel_id:
+            if occupancy.hotel_id is not None:
+                self._hotels[occupancy.hotel_id].discard(room_id)
+            occupancy.hotel_id = hotel_id
+        occupancy.quantity = quantity
+        self._hotels.setdefault(hotel_id, set()).add(room_id)
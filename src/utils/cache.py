@@ -0,0 +1,416 @@
+import asyncio
+import hashlib
+import logging
+import math
+import random
+import time
+from collections.abc import Iterable
+from contextlib import AsyncExitStack
+from datetime import date
+from functools import partial, wraps
+from inspect import Parameter
+from typing import Literal
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from fastapi import Request, Response
+from fastapi.dependencies.utils import get_typed_return_annotation, get_typed_signature
+from fastapi_cache import FastAPICache
+from pydantic import BaseModel
+from starlette.status import HTTP_304_NOT_MODIFIED
+
+from src.config import settings
+from src.connectors.two_tier_cache import TwoTierBackend
+from src.init import redis_manager
+from src.repositories.utils import search_term
+from src.services.base import DEFAULT_PER_PAGE
+from src.utils.db_manager import DBManager
+from src.utils.entity_cache import is_cache_enabled
+
+# Имена параметров, которые cache добавляет в сигнатуру ручки (Request и Response)
+INJECTED_PARAMS = ("__fastapi_cache_request", "__fastapi_cache_response")
+
+# Версия формата закэшированных ответов: увеличьте при изменении схем ответов, чтобы не читать записи старого формата
+CACHE_SCHEMA_VERSION = 1
+
+# Параметры текстового поиска: сравниваются без учёта регистра и пробелов по краям (как в search_term)
+SEARCH_PARAMS = ("location", "title")
+
+# Как часто ждущий процесс проверяет, не сохранил ли владелец блокировки ответ, секунды
+LOCK_POLL_INTERVAL = 0.05
+
+# Снятие блокировки только её владельцем (по токену), чтобы не снять чужую после истечения своей
+RELEASE_LOCK_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+redis_manager.register_script("release_cache_lock", RELEASE_LOCK_SCRIPT)
+
+# Вычисления ответов, идущие в этом процессе: ключ записи → задача
+_in_flight: dict[str, asyncio.Task] = {}
+
+# Фоновые обновления записей (ссылки на задачи, чтобы их не собрал сборщик мусора)
+_background: set[asyncio.Task] = set()
+
+# Сглаженное время вычисления ответа ручки, секунды (для XFetch): имя ручки → время
+_compute_seconds: dict[str, float] = {}
+
+# Теги кэша — сущности, от которых зависят закэшированные ответы
+HOTELS_TAG = "hotels"  # Состав и данные отелей (списки отелей)
+FACILITIES_TAG = "facilities"  # Справочник удобств
+AVAILABILITY_TAG = "availability"  # Свободные комнаты в любом отеле (поиск отелей по датам)
+
+
+def hotel_availability_tag(hotel_id: int) -> str:
+    """
+    Комнаты отеля и их занятость (список свободных комнат отеля).
+    """
+    return f"availability:hotel:{hotel_id}"
+
+
+def tag_key(tag: str) -> str:
+    return f"{FastAPICache.get_prefix()}:tag:{tag}"
+
+
+async def tags_version(tags: list[str]) -> str:
+    """
+    Текущие версии тегов одной строкой (один MGET; с TwoTierBackend — сначала из in-process LRU). Версия тега растёт при каждой инвалидации,
+    поэтому ключи записей, сохранённых до неё, больше не запрашиваются и истекают по TTL.
+    """
+    keys = [tag_key(tag) for tag in tags]
+    backend = FastAPICache.get_backend()
+    versions = await (backend.mget(keys) if isinstance(backend, TwoTierBackend) else redis_manager.mget(keys))
+    return ".".join((version or b"0").decode() for version in versions)
+
+
+async def invalidate_cache_tags(*tags: str) -> None:
+    """
+    Инвалидирует закэшированные ответы, помеченные любым из тегов (INCR версий тегов в Redis).
+
+    Вызывается сервисами после commit: запись, закэшированная параллельным запросом до коммита,
+    остаётся под старой версией тега и больше не читается.
+
+    :param tags: теги изменённых сущностей (см. HOTELS_TAG, hotel_availability_tag и т.д.)
+    """
+    if not tags or not is_cache_enabled():
+        return
+    keys = [tag_key(tag) for tag in tags]
+    backend = FastAPICache.get_backend()
+    try:
+        if isinstance(backend, TwoTierBackend):
+            await backend.incr(keys)  # Заодно удаляет локальные копии версий во всех процессах
+            return
+        async with redis_manager.pipeline() as pipe:
+            for key in keys:
+                pipe.incr(key)
+            await pipe.execute()
+    except Exception:
+        # Кэш не должен ломать запись: без инвалидации ответы устареют максимум на CACHE_EXPIRE
+        logging.exception(f"Не удалось инвалидировать теги кэша {tags}")
+
+
+def cache_params(kwargs: dict) -> dict:
+    """
+    Параметры запроса, от которых зависит ответ ручки, в нормализованном виде.
+
+    - модели параметров из зависимостей (PaginationParams, CursorParams) раскрываются в свои поля
+    - прочие внедрённые зависимости (DBManager и т.п.) пропускаются — они не влияют на ответ
+    - location/title — как в поиске, per_page — со значением по умолчанию, даты — в ISO-формате
+    - параметры со значением None (не переданы) в ключ не входят: пустая строка — другое значение
+      (например, ?cursor= — первая страница в курсорном режиме, а без cursor — обычный список)
+
+    :param kwargs: аргументы ручки
+    :return: словарь "имя параметра — строковое значение"
+    """
+    params = {}
+    for name, value in kwargs.items():
+        if isinstance(value, BaseModel):
+            params.update(cache_params(dict(value)))
+        elif value is None or isinstance(value, (str, int, float, date)):
+            params[name] = value
+
+    if "per_page" in params and params["per_page"] is None:
+        params["per_page"] = DEFAULT_PER_PAGE
+    for name in SEARCH_PARAMS:
+        if isinstance(params.get(name), str):
+            params[name] = search_term(params[name])
+    return {name: value.isoformat() if isinstance(value, date) else str(value) for name, value in params.items() if value is not None}
+
+
+def cache_key(func, namespace: str, kwargs: dict) -> str:
+    """
+    Детерминированный ключ кэша: пространство имён, ручка, версия формата ответа и хэш нормализованных параметров.
+    Одинаковые по смыслу запросы (другой регистр в location, per_page по умолчанию) получают один ключ.
+    """
+    params = urlencode(sorted(cache_params(kwargs).items()))
+    digest = hashlib.md5(params.encode()).hexdigest()  # noqa: S324 — не для безопасности
+    return f"{namespace.rstrip(':')}:{func.__module__}.{func.__name__}:s{CACHE_SCHEMA_VERSION}:{digest}"
+
+
+async def single_flight(key: str, compute):
+    """
+    Одновременные вычисления с одинаковым ключом выполняются в процессе один раз: остальные ждут результат первого.
+
+    Вычисление идёт в отдельной задаче, поэтому если первый запрос отменён (клиент ушёл),
+    остальные всё равно получат результат. Ресурсы запроса (сессию БД) compute использовать не должен — см. call_with_own_db.
+
+    :param key: ключ записи кэша
+    :param compute: корутинная функция без аргументов
+    :return: результат compute
+    """
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.create_task(compute())
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def acquire_lock(lock_key: str) -> str | None:
+    """
+    Блокировка SET NX в Redis на CACHE_LOCK_TIMEOUT.
+
+    :return: токен владельца или None, если блокировку держит другой процесс
+    """
+    token = uuid4().hex
+    if await redis_manager.redis.set(lock_key, token, nx=True, px=int(settings.CACHE_LOCK_TIMEOUT * 1000)):
+        return token
+    return None
+
+
+async def release_lock(lock_key: str, token: str) -> None:
+    try:
+        await redis_manager.run_script("release_cache_lock", keys=[lock_key], args=[token])
+    except Exception:
+        logging.exception(f"Не удалось снять блокировку кэша {lock_key}, истечёт сама")
+
+
+async def compute_and_store(key: str, compute, expire: int, stale_key: str | None = None) -> tuple[object, bytes]:
+    """
+    Вычисляет ответ и сохраняет его в кэш (и копию под stale_key, если он передан).
+    Ошибка записи в кэш не ломает ответ.
+
+    :return: (ответ, закодированный ответ)
+    """
+    result = await compute()
+    encoded = FastAPICache.get_coder().encode(result)
+    backend = FastAPICache.get_backend()
+    try:
+        await backend.set(key, encoded, expire)
+        if stale_key is not None:
+            await backend.set(stale_key, encoded, settings.CACHE_STALE_EXPIRE)
+    except Exception:
+        logging.exception(f"Не удалось сохранить ответ по ключу кэша {key}")
+    return result, encoded
+
+
+async def compute_with_lock(key: str, stale_key: str, compute, return_type=None) -> tuple[object, bytes]:
+    """
+    Вычисление ответа одним процессом на весь кластер (блокировка в Redis).
+
+    Владелец блокировки вычисляет и сохраняет ответ (compute — см. compute_and_store) до снятия блокировки.
+    Остальные до CACHE_LOCK_WAIT секунд ждут появления ответа в кэше, затем отдают устаревшую копию
+    (stale_key — без версий тегов, переживает инвалидацию), а если её нет — вычисляют сами.
+    При недоступности Redis ответ просто вычисляется.
+
+    :param key: ключ записи кэша
+    :param stale_key: ключ устаревшей копии
+    :param compute: корутинная функция без аргументов, возвращающая (ответ, закодированный ответ)
+    :param return_type: тип ответа ручки для декодирования записи из кэша
+    :return: (ответ, закодированный ответ)
+    """
+    backend, coder = FastAPICache.get_backend(), FastAPICache.get_coder()
+    lock_key = f"{key}:lock"
+    try:
+        token = await acquire_lock(lock_key)
+    except Exception:
+        logging.exception(f"Не удалось взять блокировку кэша {lock_key}")
+        return await compute()
+
+    if token is not None:
+        try:
+            return await compute()
+        finally:
+            await release_lock(lock_key, token)
+
+    try:
+        deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            if (cached := await backend.get(key)) is not None:
+                return coder.decode_as_type(cached, type_=return_type), cached
+        if (stale := await backend.get(stale_key)) is not None:
+            return coder.decode_as_type(stale, type_=return_type), stale
+    except Exception:
+        logging.exception(f"Не удалось дождаться ответа по ключу кэша {key}")
+    return await compute()
+
+
+def should_refresh(age: float, fresh: int, compute_seconds: float, beta: float) -> bool:
+    """
+    Пора ли обновить запись в фоне.
+
+    Запись старше fresh — всегда (stale-while-revalidate). Раньше — с вероятностью по XFetch:
+    обновляем, если age + compute_seconds * beta * (-ln(U)) >= fresh, где U ~ (0, 1]. Чем ближе
+    конец fresh и чем дольше вычисляется ответ, тем вероятнее досрочное обновление;
+    beta > 1 обновляет раньше, beta = 0 отключает досрочные обновления.
+
+    :param age: возраст записи, секунды
+    :param fresh: сколько секунд запись считается свежей
+    :param compute_seconds: сколько в среднем вычисляется ответ, секунды
+    :param beta: коэффициент XFetch
+    """
+    return age - compute_seconds * beta * math.log(1 - random.random()) >= fresh
+
+
+async def call_with_own_db(func, args, kwargs):
+    """
+    Вызов ручки вне запроса (фоновое обновление, объединённый промах): DBManager запроса к этому времени
+    может быть закрыт, поэтому для каждого открывается новый с той же фабрикой сессий.
+    """
+    async with AsyncExitStack() as stack:
+        own_kwargs = {}
+        for name, value in kwargs.items():
+            if isinstance(value, DBManager):
+                value = await stack.enter_async_context(DBManager(value.session_factory, read_only=value.read_only))
+            own_kwargs[name] = value
+        return await func(*args, **own_kwargs)
+
+
+def refresh_in_background(key: str, refresh) -> None:
+    """
+    Запускает обновление записи в фоне, если её уже не вычисляют в этом процессе.
+    """
+    if key in _in_flight:
+        return
+
+    async def run():
+        try:
+            await single_flight(key, refresh)
+        except Exception:
+            logging.exception(f"Не удалось обновить запись кэша {key}")
+
+    task = asyncio.create_task(run())
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+def cache(
+    expire: int | None = None,
+    tags: Iterable[str] = (),
+    coalesce: Literal["none", "local", "redis"] | None = None,
+    fresh: int | None = None,
+    beta: float = 0.0,
+):
+    """
+    Кэширование ответа GET-ручки в бэкенде FastAPICache с инвалидацией по тегам.
+
+    Теги — строки или шаблоны с параметрами ручки, например "availability:hotel:{hotel_id}".
+    Ключ строится по нормализованным параметрам запроса (см. cache_key) и текущим версиям тегов,
+    поэтому invalidate_cache_tags делает старые записи недоступными.
+    Если кэш не инициализирован (тесты, скрипты), ручка вызывается напрямую.
+
+    При промахе одновременные одинаковые запросы объединяются (coalesce):
+    "local" — одно вычисление на процесс (single_flight), "redis" — ещё и блокировка в Redis,
+    чтобы ответ вычислял один процесс на весь кластер (compute_with_lock), "none" — без объединения.
+
+    С fresh запись живёт expire секунд, но свежей считается только fresh: более старая отдаётся сразу,
+    а в фоне вычисляется новая (stale-while-revalidate). С beta > 0 горячие записи обновляются
+    ещё до конца fresh (XFetch, см. should_refresh).
+
+    Заголовки ответа — как у fastapi_cache: X-FastAPI-Cache (HIT/MISS), Cache-Control, ETag (и 304 по If-None-Match).
+
+    :param expire: время жизни записи, секунды
+    :param tags: теги, от которых зависит ответ
+    :param coalesce: режим объединения запросов (по умолчанию CACHE_COALESCE)
+    :param fresh: сколько секунд запись свежая (по умолчанию — все expire, без фонового обновления)
+    :param beta: коэффициент досрочного обновления XFetch
+    """
+    tags = tuple(tags)
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__name__}"
+        return_type = get_typed_return_annotation(func)
+        signature = get_typed_signature(func)
+        injected = [Parameter(param, Parameter.KEYWORD_ONLY, annotation=annotation) for param, annotation in zip(INJECTED_PARAMS, (Request, Response))]
+
+        async def keys(kwargs: dict) -> tuple[str, str]:
+            """
+            (ключ записи, ключ устаревшей копии без версий тегов)
+            """
+            key = versioned_key = cache_key(func, FastAPICache.get_prefix(), kwargs)
+            if tags:
+                try:
+                    versioned_key = f"{key}:v{await tags_version([tag.format(**kwargs) for tag in tags])}"
+                except Exception:
+                    # Без версий тегов нельзя отличить актуальную запись — берём ключ, который ни с чем не совпадёт
+                    logging.exception(f"Не удалось получить версии тегов кэша {tags}")
+                    versioned_key = f"{key}:v{uuid4().hex}"
+            return versioned_key, f"{key}:stale"
+
+        async def timed(call):
+            started = time.perf_counter()
+            result = await call()
+            elapsed = time.perf_counter() - started
+            previous = _compute_seconds.get(name)
+            _compute_seconds[name] = elapsed if previous is None else 0.8 * previous + 0.2 * elapsed
+            return result
+
+        async def refresh(key: str, stale_key: str, ttl: int, mode: str, args, kwargs):
+            compute = partial(compute_and_store, key, partial(timed, partial(call_with_own_db, func, args, kwargs)), ttl)
+            if mode != "redis":
+                return await compute()
+            # Если запись уже обновляет другой процесс — дожидаемся его ответа, а не вычисляем ещё раз
+            return await compute_with_lock(key, stale_key, partial(compute, stale_key), return_type)
+
+        @wraps(func)
+        async def inner(*args, **kwargs):
+            request = kwargs.pop(INJECTED_PARAMS[0], None)
+            response = kwargs.pop(INJECTED_PARAMS[1], None)
+            if not is_cache_enabled() or (request is not None and (request.method != "GET" or request.headers.get("Cache-Control") == "no-store")):
+                return await func(*args, **kwargs)
+
+            ttl = expire or FastAPICache.get_expire()
+            fresh_ttl = ttl if fresh is None else fresh
+            mode = coalesce or settings.CACHE_COALESCE
+            backend, coder = FastAPICache.get_backend(), FastAPICache.get_coder()
+            key, stale_key = await keys(kwargs)
+            try:
+                remaining, cached = await backend.get_with_ttl(key)
+            except Exception:
+                logging.exception(f"Не удалось прочитать ключ кэша {key}")
+                remaining, cached = 0, None
+
+            if cached is None or (request is not None and request.headers.get("Cache-Control") == "no-cache"):
+                # Объединённое вычисление переживает запрос, который его начал (клиент ушёл — DBManager запроса
+                # закрыт), поэтому идёт со своими DBManager. Сессия запроса ленивая и соединение не берёт
+                call = partial(func, *args, **kwargs) if mode == "none" else partial(call_with_own_db, func, args, kwargs)
+                compute = partial(compute_and_store, key, partial(timed, call), ttl, stale_key if mode == "redis" else None)
+                if mode == "redis":
+                    compute = partial(compute_with_lock, key, stale_key, compute, return_type)
+                result, encoded = await compute() if mode == "none" else await single_flight(key, compute)
+                set_cache_headers(response, encoded, fresh_ttl, "MISS")
+                return result
+
+            age = ttl - remaining
+            if fresh is not None and should_refresh(age, fresh, _compute_seconds.get(name, 0.0), beta):
+                refresh_in_background(key, partial(refresh, key, stale_key, ttl, mode, args, kwargs))
+            etag = set_cache_headers(response, cached, max(int(fresh_ttl - age), 0), "HIT")
+            if response is not None and request is not None and request.headers.get("if-none-match") == etag:
+                response.status_code = HTTP_304_NOT_MODIFIED
+                return response
+            return coder.decode_as_type(cached, type_=return_type)
+
+        inner.__signature__ = signature.replace(parameters=[*signature.parameters.values(), *injected])  # Request/Response для DI FastAPI
+        return inner
+
+    return decorator
+
+
+def set_cache_headers(response: Response | None, encoded: bytes, max_age: int, status: str) -> str:
+    """
+    Заголовки закэшированного ответа: Cache-Control, ETag и статус кэша (X-FastAPI-Cache).
+
+    :return: ETag ответа
+    """
+    etag = f'W/"{hashlib.md5(encoded).hexdigest()}"'  # noqa: S324 — не для безопасности
+    if response is not None:
+        response.headers.update({"Cache-Control": f"max-age={max_age}", "ETag": etag, FastAPICache.get_cache_status_header(): status})
+    return etag
@@ -1,29 +1,119 @@
+import asyncio
+import logging
+import random
+from functools import cached_property
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+
+from src.config import settings
+from src.exceptions import TransactionConflictException
 from src.repositories.bookings import BookingsRepository
 from src.repositories.facilities import FacilitiesRepository, RoomsFacilitiesRepository
 from src.repositories.hotels import HotelsRepository
+from src.repositories.room_inventory import RoomInventoryRepository
 from src.repositories.rooms import RoomsRepository
 from src.repositories.users import UsersRepository
 
+# SQLSTATE ошибок, после которых транзакцию можно безопасно повторить
+RETRYABLE_SQLSTATES = {
+    "40001",  # serialization_failure
+    "40P01",  # deadlock_detected
+}
+
 
 class DBManager:
-    def __init__(self, session_factory):
-        self.session_factory = session_factory
+    """
+    Unit of work: сессия БД и репозитории поверх неё.
 
-    async def __aenter__(self):
-        self.session = self.session_factory()
+    Сессия и репозитории создаются лениво — при первом обращении. Запрос, который
+    не обратился к БД (например, ответ из кэша), не берёт соединение из пула и не делает rollback.
+    connections_acquired — сколько раз за время жизни менеджера сессия брала соединение
+    (начинала транзакцию); для зависимостей запроса попадает в метрику db_request_connections (/metrics).
 
-        self.hotels = HotelsRepository(self.session)
-        self.rooms = RoomsRepository(self.session)
-        self.users = UsersRepository(self.session)
-        self.bookings = BookingsRepository(self.session)
-        self.facilities = FacilitiesRepository(self.session)
-        self.rooms_facilities = RoomsFacilitiesRepository(self.session)
+    read_only=True — все транзакции только на чтение (SET TRANSACTION READ ONLY,
+    если движок фабрики сам не открывает их как READ ONLY).
+    """
 
+    def __init__(self, session_factory, read_only: bool = False):
+        self.session_factory = session_factory
+        self.read_only = read_only
+        self.connections_acquired = 0
+
+    async def __aenter__(self):
         return self
 
     async def __aexit__(self, *args):
-        await self.session.rollback()
+        if "session" not in self.__dict__:
+            return  # Сессия не создавалась — к БД не обращались
+        if self.session.in_transaction():
+            await self.session.rollback()
         await self.session.close()
 
+    @cached_property
+    def session(self):
+        session = self.session_factory()
+        event.listen(session.sync_session, "after_begin", self._on_session_begin)
+        return session
+
+    def _on_session_begin(self, session, transaction, connection):
+        self.connections_acquired += 1
+        if self.read_only and not connection.get_execution_options().get("postgresql_readonly"):
+            connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+
+    @cached_property
+    def hotels(self):
+        return HotelsRepository(self.session)
+
+    @cached_property
+    def rooms(self):
+        return RoomsRepository(self.session)
+
+    @cached_property
+    def users(self):
+        return UsersRepository(self.session)
+
+    @cached_property
+    def bookings(self):
+        return BookingsRepository(self.session)
+
+    @cached_property
+    def facilities(self):
+        return FacilitiesRepository(self.session)
+
+    @cached_property
+    def rooms_facilities(self):
+        return RoomsFacilitiesRepository(self.session)
+
+    @cached_property
+    def room_inventory(self):
+        return RoomInventoryRepository(self.session)
+
     async def commit(self):
         await self.session.commit()
+
+    async def run_serializable(self, func, *args, retries: int | None = None, **kwargs):
+        """
+        Выполняет func (она сама делает commit) в транзакции SERIALIZABLE.
+
+        При ошибке сериализации или дедлоке транзакция откатывается и повторяется
+        с небольшой случайной паузой, но не более retries раз.
+
+        :param func: корутинная функция с работой транзакции
+        :param retries: количество повторов (по умолчанию DB_SERIALIZATION_RETRIES)
+        :raises TransactionConflictException: если конфликты продолжились после всех повторов
+        :return: результат func
+        """
+        retries = settings.DB_SERIALIZATION_RETRIES if retries is None else retries
+        for attempt in range(retries + 1):
+            await self.session.connection(execution_options={"isolation_level": "SERIALIZABLE"})
+            try:
+                return await func(*args, **kwargs)
+            except DBAPIError as ex:
+                await self.session.rollback()
+                if getattr(ex.orig, "sqlstate", None) not in RETRYABLE_SQLSTATES:
+                    raise
+                if attempt == retries:
+                    raise TransactionConflictException from ex
+                logging.warning(f"Конфликт сериализации, повтор транзакции ({attempt + 1}/{retries})")
+                await asyncio.sleep(random.uniform(0, 0.01 * 2**attempt))
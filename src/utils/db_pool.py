@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Границы бакетов гистограммы ожидания соединения, секунды
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Границы бакетов гистограммы соединений, взятых за один HTTP-запрос
+REQUEST_CONNECTIONS_BUCKETS = (0, 1, 2, 3, 5, 10)
+
+
+class Histogram:
+    """
+    Кумулятивная гистограмма в духе Prometheus: количество наблюдений не больше каждой границы,
+    а также сумма и общее количество.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = POOL_WAIT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Последний бакет — +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """
+        Пары (граница le, количество наблюдений <= le), включая "+Inf".
+        """
+        result, total = [], 0
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class PoolStats:
+    """
+    Статистика ожидания соединений пула: гистограмма времени ожидания и число таймаутов.
+    Хранится по имени пула (pool_logging_name), поэтому переживает пересоздание пула (dispose).
+    """
+
+    by_pool: dict[str, "PoolStats"] = {}
+
+    def __init__(self):
+        self.wait_seconds = Histogram()
+        self.timeouts = 0
+
+    @classmethod
+    def get(cls, name: str) -> "PoolStats":
+        return cls.by_pool.setdefault(name, cls())
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, измеряющий, сколько запрос ждал соединение (включая открытие нового).
+    """
+
+    def _do_get(self):
+        stats = PoolStats.get(self.logging_name or "default")
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            stats.timeouts += 1
+            raise
+        finally:
+            stats.wait_seconds.observe(time.perf_counter() - started)
+
+
+def pool_metrics(pools: dict) -> str:
+    """
+    Метрики пулов соединений в текстовом формате Prometheus.
+
+    :param pools: имя пула → пул SQLAlchemy (engine.pool)
+    :return: текст для ответа /metrics
+    """
+    lines = [
+        "# HELP db_pool_size Настроенный размер пула соединений",
+        "# TYPE db_pool_size gauge",
+        "# HELP db_pool_checked_out Соединения, выданные из пула",
+        "# TYPE db_pool_checked_out gauge",
+        "# HELP db_pool_checked_in Свободные соединения в пуле",
+        "# TYPE db_pool_checked_in gauge",
+        "# HELP db_pool_overflow Соединения сверх pool_size (отрицательное — ещё не открытые до pool_size)",
+        "# TYPE db_pool_overflow gauge",
+        "# HELP db_pool_timeouts_total Запросы, не дождавшиеся соединения за pool_timeout",
+        "# TYPE db_pool_timeouts_total counter",
+        "# HELP db_pool_wait_seconds Время ожидания соединения из пула",
+        "# TYPE db_pool_wait_seconds histogram",
+    ]
+    for name, pool in pools.items():
+        label = f'pool="{name}"'
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            lines += [
+                f"db_pool_size{{{label}}} {pool.size()}",
+                f"db_pool_checked_out{{{label}}} {pool.checkedout()}",
+                f"db_pool_checked_in{{{label}}} {pool.checkedin()}",
+                f"db_pool_overflow{{{label}}} {pool.overflow()}",
+            ]
+        stats = PoolStats.get(name)
+        lines.append(f"db_pool_timeouts_total{{{label}}} {stats.timeouts}")
+        for bound, count in stats.wait_seconds.cumulative():
+            lines.append(f'db_pool_wait_seconds_bucket{{{label},le="{bound}"}} {count}')
+        lines += [
+            f"db_pool_wait_seconds_sum{{{label}}} {stats.wait_seconds.sum}",
+            f"db_pool_wait_seconds_count{{{label}}} {stats.wait_seconds.count}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+# Соединения, взятые DBManager за HTTP-запрос (connections_acquired), по зависимости: "primary", "read_only", "cached"
+request_connections: dict[str, Histogram] = {}
+
+
+def observe_request_connections(dependency: str, connections: int) -> None:
+    """
+    Учитывает, сколько соединений взял DBManager зависимости за запрос (0 — ответ без обращения к БД, например из кэша).
+    """
+    request_connections.setdefault(dependency, Histogram(REQUEST_CONNECTIONS_BUCKETS)).observe(connections)
+    logging.debug(f"DB connections acquired by request ({dependency}): {connections}")
+
+
+def request_connections_metrics() -> str:
+    """
+    Гистограммы соединений на запрос в текстовом формате Prometheus.
+    """
+    lines = [
+        "# HELP db_request_connections Соединения, взятые DBManager за один HTTP-запрос (0 — запрос без обращения к БД)",
+        "# TYPE db_request_connections histogram",
+    ]
+    for dependency, histogram in request_connections.items():
+        label = f'dependency="{dependency}"'
+        for bound, count in histogram.cumulative():
+            lines.append(f'db_request_connections_bucket{{{label},le="{bound}"}} {count}')
+        lines += [
+            f"db_request_connections_sum{{{label}}} {histogram.sum}",
+            f"db_request_connections_count{{{label}}} {histogram.count}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+async def warmup_pool(engine, connections: int) -> None:
+    """
+    Заранее открывает connections соединений пула (одновременно), чтобы первые
+    запросы после старта не платили за установку соединения.
+
+    :param engine: асинхронный движок
+    :param connections: сколько соединений открыть (обычно pool_size)
+    """
+
+    opened = 0
+    all_opened = asyncio.Event()
+
+    async def open_connection():
+        nonlocal opened
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                opened += 1
+                if opened == connections:
+                    all_opened.set()
+                await all_opened.wait()  # Держим соединение, пока не откроются все — иначе пул выдаст то же самое
+        except Exception:
+            all_opened.set()  # Не оставляем остальные задачи ждать
+            raise
+
+    await asyncio.gather(*(open_connection() for _ in range(connections)))
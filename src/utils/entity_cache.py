@@ -0,0 +1,146 @@
+import logging
+import uuid
+from collections.abc import Awaitable, Callable, Iterable
+
+from fastapi_cache import FastAPICache
+from pydantic import BaseModel
+
+from src.config import settings
+from src.connectors.two_tier_cache import TwoTierBackend
+from src.init import redis_manager
+from src.schemas.hotels import Hotel
+from src.schemas.rooms import Room, RoomWithRels
+
+# Версия формата закэшированных сущностей: увеличьте при изменении их схем
+ENTITY_SCHEMA_VERSION = 1
+
+# Заполнение кэша только для объектов, не инвалидированных после чтения их версий:
+# KEYS — пары (ключ объекта, ключ версии), ARGV — TTL и пары (прочитанная версия, значение)
+FILL_IF_UNCHANGED_SCRIPT = """
+for i = 1, #KEYS, 2 do
+    local j = (i + 1) / 2
+    if (redis.call('get', KEYS[i + 1]) or '') == ARGV[2 * j] then
+        redis.call('set', KEYS[i], ARGV[2 * j + 1], 'EX', ARGV[1])
+    end
+end
+return 0
+"""
+redis_manager.register_script("entity_cache_fill", FILL_IF_UNCHANGED_SCRIPT)
+
+
+def is_cache_enabled() -> bool:
+    """
+    Кэш инициализирован (FastAPICache.init в lifespan). В тестах и скриптах без lifespan кэша нет.
+    """
+    return FastAPICache._init and FastAPICache.get_enable()
+
+
+class EntityCache:
+    """
+    Read-through кэш доменных объектов по id в бэкенде кэша ответов (Redis или LRU процесса + Redis).
+
+    Репозиторий читает через get_many/get: найденное в кэше не запрашивается из БД, остальное
+    загружается одним запросом и сохраняется. Сервисы после commit вызывают invalidate для изменённых id.
+    Ошибки кэша не ломают чтение — объекты просто загружаются из БД. Если кэш не инициализирован, его нет.
+
+    invalidate, кроме удаления объекта, меняет его версию (случайный токен в Redis). Версии читаются
+    до запроса к БД, а загруженное сохраняется только при неизменной версии (Lua-скрипт): иначе строка,
+    прочитанная до чужого commit, пережила бы его инвалидацию на ENTITY_CACHE_EXPIRE.
+    """
+
+    def __init__(self, name: str, schema: type[BaseModel]):
+        self.name = name
+        self.schema = schema
+
+    def key(self, entity_id: int) -> str:
+        return f"{FastAPICache.get_prefix()}:entity:{self.name}:s{ENTITY_SCHEMA_VERSION}:{entity_id}"
+
+    def version_key(self, entity_id: int) -> str:
+        return f"{FastAPICache.get_prefix()}:entity:{self.name}:version:{entity_id}"
+
+    async def get_many(self, ids: Iterable[int], load: Callable[[list[int]], Awaitable[list]]) -> dict[int, BaseModel]:
+        """
+        Объекты по списку id: из кэша одним MGET, недостающие — одним вызовом load.
+
+        :param ids: id объектов
+        :param load: загрузка из БД списка id → список объектов (отсутствующих в БД в нём нет)
+        :return: словарь id → объект (только найденные)
+        """
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return {}
+        if not is_cache_enabled():
+            return {entity.id: entity for entity in await load(ids)}
+
+        found = {}
+        try:
+            for entity_id, value in zip(ids, await self._mget([self.key(entity_id) for entity_id in ids])):
+                if value is not None:
+                    found[entity_id] = self.schema.model_validate_json(value)
+        except Exception:
+            logging.exception(f"Не удалось прочитать кэш сущностей {self.name}")
+
+        missing = [entity_id for entity_id in ids if entity_id not in found]
+        if missing:
+            try:
+                versions = dict(zip(missing, await redis_manager.mget([self.version_key(entity_id) for entity_id in missing])))
+            except Exception:
+                logging.exception(f"Не удалось прочитать версии сущностей {self.name}")
+                versions = None  # Без версий нельзя безопасно сохранить загруженное
+            loaded = await load(missing)
+            found.update((entity.id, entity) for entity in loaded)
+            if versions is not None and loaded:
+                try:
+                    await self._fill(loaded, versions)
+                except Exception:
+                    logging.exception(f"Не удалось сохранить сущности {self.name} в кэш")
+        return found
+
+    async def get(self, entity_id: int, load: Callable[[list[int]], Awaitable[list]]) -> BaseModel | None:
+        return (await self.get_many([entity_id], load)).get(entity_id)
+
+    async def invalidate(self, *ids: int) -> None:
+        """
+        Удаляет объекты из кэша (вызывается после commit изменения или удаления).
+        """
+        if not ids or not is_cache_enabled():
+            return
+        keys = [self.key(entity_id) for entity_id in ids]
+        backend = FastAPICache.get_backend()
+        try:
+            # Сначала версия: чтение, начатое до commit, уже не сохранит старую строку
+            async with redis_manager.pipeline() as pipe:
+                for entity_id in ids:
+                    pipe.set(self.version_key(entity_id), uuid.uuid4().hex, ex=settings.ENTITY_CACHE_EXPIRE)
+                await pipe.execute()
+            if isinstance(backend, TwoTierBackend):
+                await backend.delete(keys)  # Заодно удаляет локальные копии во всех процессах
+            else:
+                await redis_manager.delete(*keys)
+        except Exception:
+            # Без инвалидации объект устареет максимум на ENTITY_CACHE_EXPIRE
+            logging.exception(f"Не удалось инвалидировать сущности {self.name} {ids}")
+
+    @staticmethod
+    async def _mget(keys: list[str]) -> list[bytes | None]:
+        backend = FastAPICache.get_backend()
+        if isinstance(backend, TwoTierBackend):
+            return await backend.mget(keys, remember_missing=False)  # Заполняется в обход бэкенда (см. _fill)
+        return await redis_manager.mget(keys)
+
+    async def _fill(self, loaded: list, versions: dict[int, bytes | None]) -> None:
+        """
+        Сохраняет загруженные объекты в Redis, если их версии не изменились с момента чтения versions.
+        С TwoTierBackend локальные копии появятся при следующем чтении.
+        """
+        keys, args = [], [settings.ENTITY_CACHE_EXPIRE]
+        for entity in loaded:
+            keys += [self.key(entity.id), self.version_key(entity.id)]
+            args += [versions.get(entity.id) or b"", entity.model_dump_json().encode()]
+        await redis_manager.run_script("entity_cache_fill", keys=keys, args=args)
+
+
+# 🏨 Кэши сущностей по id
+hotels_cache = EntityCache("hotel", Hotel)
+rooms_cache = EntityCache("room", Room)
+rooms_with_rels_cache = EntityCache("room_with_rels", RoomWithRels)
@@ -0,0 +1,36 @@
+import base64
+import binascii
+import json
+
+from src.exceptions import IncorrectCursorException
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Кодирует позицию keyset-пагинации в непрозрачную для клиента строку.
+
+    :param last_id: id последней записи текущей страницы
+    :return: курсор (url-safe base64 от JSON)
+    """
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int | None:
+    """
+    Раскодирует курсор, полученный от клиента.
+
+    :param cursor: курсор из next_cursor (пустая строка — первая страница)
+    :raises IncorrectCursorException: если курсор повреждён или подделан
+    :return: id, после которого начинается страница, или None для первой страницы
+    """
+    if not cursor:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        last_id = payload["id"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as ex:
+        raise IncorrectCursorException from ex
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise IncorrectCursorException
+    return last_id
@@ -1,19 +1,18 @@
-# ruff: noqa: E402 — отключаем проверку порядка импортов
 import json
-from unittest import mock
-
-# 🚫 Отключаем кэширование в тестах
-# Заменяем декоратор @cache на пустую обёртку, чтобы кэш не мешал тестам
-mock.patch("fastapi_cache.decorator.cache", lambda *args, **kwargs: lambda f: f).start()
 
+import uuid
 
 import pytest
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
 from httpx import AsyncClient
+from sqlalchemy import text
 
-# ⛓️ Зависимости и база
-from src.api.dependencies import get_db
+# ⛓️ Зависимости и база (кэш ответов в тестах выключен: FastAPICache.init вызывается только в lifespan)
+from src.api.dependencies import get_db, get_db_cached, get_db_read_only, get_session_factory_read_only
 from src.config import settings
-from src.database import Base, engine_null_pool, async_session_maker_null_pool
+from src.database import Base, get_engine, async_session_maker_null_pool
+from src.init import redis_manager
 from src.main import app
 from src.models import *  # noqa: F403
 from src.schemas.hotels import HotelAdd
@@ -36,6 +35,12 @@ async def get_db_null_pool():
         yield db
 
 
+# 📖 Read-only доступ для поисковых ручек: та же тестовая БД, но транзакции READ ONLY
+async def get_db_read_only_null_pool():
+    async with DBManager(session_factory=async_session_maker_null_pool, read_only=True) as db:
+        yield db
+
+
 # 💾 Фикстура: менеджер базы данных для использования в тестах напрямую
 @pytest.fixture(scope="function")
 async def db() -> DBManager:
@@ -48,6 +53,9 @@ async def db() -> DBManager:
 
 # 🔁 Переопределение зависимости get_db внутри FastAPI на тестовую версию
 app.dependency_overrides[get_db] = get_db_null_pool
+app.dependency_overrides[get_session_factory_read_only] = lambda: async_session_maker_null_pool
+app.dependency_overrides[get_db_read_only] = get_db_read_only_null_pool
+app.dependency_overrides[get_db_cached] = get_db_read_only_null_pool
 
 
 # 🧱 Инициализация базы данных (удаление всех таблиц, создание, наполнение данными)
@@ -58,7 +66,9 @@ async def setup_database(check_test_mode):
     - Очистка и пересоздание всех таблиц
     - Наполнение данными из JSON-файлов
     """
-    async with engine_null_pool.begin() as conn:
+    async with get_engine("null_pool").begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))  # Нужен для GiST-индекса по (room_id, period)
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))  # Нужен для триграммных индексов отелей
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
 
@@ -109,3 +119,16 @@ async def authenticated_ac(register_user, ac):
     assert ac.cookies["access_token"], "Access token не установлен после логина"
 
     yield ac  # Возвращаем клиент с авторизацией
+
+
+# 🗄️ Кэш ответов на настоящем Redis (как в lifespan), с отдельным префиксом ключей на каждый тест
+@pytest.fixture(scope="function")
+async def response_cache():
+    """
+    Включает кэш GET-ручек на время теста. Без этой фикстуры ручки вызываются без кэша.
+    """
+    await redis_manager.connect()
+    FastAPICache.init(RedisBackend(redis_manager.redis), prefix=f"test-cache-{uuid.uuid4().hex}")
+    yield
+    FastAPICache.reset()
+    await redis_manager.close()
@@ -1,5 +1,10 @@
 # ✅ Тест на создание бронирования
+import json
+
 import pytest
+from src.api.dependencies import get_db_read_only
+from src.config import settings
+from src.main import app
 from tests.conftest import get_db_null_pool
 
 
@@ -15,6 +20,7 @@ from tests.conftest import get_db_null_pool
         (1, "2024-08-05", "2024-08-14", 200),
         (1, "2024-08-06", "2024-08-15", 409),  # Ожидаем ошибку (например, пересечение дат)
         (1, "2024-08-17", "2024-08-25", 200),
+        (999, "2024-08-17", "2024-08-25", 404),  # Комнаты не существует
     ],
 )
 async def test_add_booking(
@@ -92,3 +98,46 @@ async def test_add_and_get_my_bookings(
     assert isinstance(data, dict)
     assert "data" in data
     assert len(data["data"]) == booked_rooms  # Сравниваем количество бронирований
+
+
+# 🔖 Курсорная пагинация: страницы не пересекаются и вместе дают все бронирования пользователя
+async def test_get_my_bookings_by_cursor(authenticated_ac):
+    all_bookings = (await authenticated_ac.get("/bookings/me")).json()["data"]
+
+    ids, cursor = [], ""
+    while cursor is not None:
+        response = await authenticated_ac.get("/bookings/me", params={"cursor": cursor, "per_page": 2})
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["data"]) <= 2
+        ids += [booking["id"] for booking in page["data"]]
+        cursor = page["next_cursor"]
+
+    assert ids == sorted(booking["id"] for booking in all_bookings)
+
+    # Повреждённый курсор — ошибка клиента, а не 500
+    response = await authenticated_ac.get("/bookings/me", params={"cursor": "не-курсор"})
+    assert response.status_code == 400
+
+
+# 🌊 Потоковая выгрузка бронирований в NDJSON и JSON-массив совпадает с обычным списком
+@pytest.mark.parametrize("export_format", ["ndjson", "json"])
+async def test_export_bookings(authenticated_ac, monkeypatch, export_format):
+    monkeypatch.setattr(settings, "DB_STREAM_CHUNK_SIZE", 2)  # Несколько порций даже на тестовых данных
+    all_bookings = (await authenticated_ac.get("/bookings")).json()
+
+    response = await authenticated_ac.get("/bookings/export", params={"format": export_format})
+    assert response.status_code == 200
+
+    if export_format == "ndjson":
+        exported = [json.loads(line) for line in response.text.splitlines()]
+    else:
+        exported = response.json()
+    assert exported == sorted(all_bookings, key=lambda booking: booking["id"])
+
+
+# 📖 Некэшируемые списки бронирований читают через read-only зависимость (реплика, если настроена)
+def test_uncached_lists_read_from_replica():
+    for route in app.routes:
+        if getattr(route, "path", None) in {"/bookings", "/bookings/me"} and "GET" in route.methods:
+            assert get_db_read_only in {dependency.call for dependency in route.dependant.dependencies}
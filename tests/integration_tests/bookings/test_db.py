@@ -1,5 +1,21 @@
+import asyncio
+import uuid
 from datetime import date
-from src.schemas.bookings import BookingAdd
+from functools import partial
+
+import pytest
+from sqlalchemy import select, text
+
+from src.config import settings
+from src.connectors.redis_connector import RedisManager
+from src.database import async_session_maker_null_pool
+from src.exceptions import AllRoomsAreBookedException, TransactionConflictException
+from src.models.bookings import BookingsOrm
+from src.repositories.utils import bookings_overlap, rooms_ids_for_booking
+from src.schemas.bookings import Booking, BookingAdd, BookingAddRequest
+from src.services.bookings import BookingService
+from src.utils.availability import RoomsAvailabilityIndex
+from src.utils.db_manager import DBManager
 
 
 # 🔁 Полный тест всех CRUD-операций над бронированием
@@ -48,3 +64,198 @@ async def test_booking_crud(db):
     # 🧪 Проверяем, что бронирование удалено
     booking = await db.bookings.get_one_or_none(id=new_booking.id)
     assert not booking  # должно быть None
+
+
+# 🔁 In-memory индекс доступности должен отвечать так же, как SQL-запрос (оракул)
+async def test_availability_index_matches_sql(db, monkeypatch):
+    monkeypatch.setattr("src.utils.availability.today", lambda: date(2024, 1, 1))  # Даты теста — «будущие» для индекса
+    user_id = (await db.users.get_all())[0].id
+    room = (await db.rooms.get_all())[0]
+
+    # Полностью занимаем комнату на 2024-09-05 и частично — вокруг этой даты
+    for day_from, day_to in [(1, 5)] * room.quantity + [(6, 9), (8, 12)]:
+        await db.bookings.add(
+            BookingAdd(
+                user_id=user_id,
+                room_id=room.id,
+                date_from=date(2024, 9, day_from),
+                date_to=date(2024, 9, day_to),
+                price=100,
+            )
+        )
+
+    index = RoomsAvailabilityIndex()
+    await index.load(db)
+
+    periods = [
+        (date(2024, 9, 1), date(2024, 9, 3)),
+        (date(2024, 9, 5), date(2024, 9, 6)),
+        (date(2024, 9, 6), date(2024, 9, 7)),
+        (date(2024, 9, 10), date(2024, 9, 20)),
+        (date(2025, 1, 1), date(2025, 1, 10)),
+    ]
+    for date_from, date_to in periods:
+        for hotel_id in (None, room.hotel_id):
+            res = await db.session.execute(*rooms_ids_for_booking(date_from, date_to, hotel_id))
+            assert sorted(index.free_rooms_ids(date_from, date_to, hotel_id)) == sorted(res.scalars().all())
+
+    # Инкрементальное обновление: бронь, добавленная после загрузки, тоже учитывается
+    booking = await db.bookings.add(BookingAdd(user_id=user_id, room_id=room.id, date_from=date(2024, 9, 10), date_to=date(2024, 9, 11), price=100))
+    index.add_booking(booking)
+    for date_from, date_to in periods:
+        res = await db.session.execute(*rooms_ids_for_booking(date_from, date_to, room.hotel_id))
+        assert sorted(index.free_rooms_ids(date_from, date_to, room.hotel_id)) == sorted(res.scalars().all())
+
+
+# 📡 Индексы разных процессов получают брони и изменения комнат друг друга через Redis pub/sub
+async def test_availability_index_sync_between_processes(db):
+    room = (await db.rooms.get_all())[0]
+    channel = f"test-availability-{uuid.uuid4().hex}"
+    managers, indexes = [], []
+    for _ in range(2):
+        manager = RedisManager(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
+        await manager.connect()
+        index = RoomsAvailabilityIndex()
+        await index.start(manager, channel, partial(DBManager, session_factory=async_session_maker_null_pool))
+        managers.append(manager)
+        indexes.append(index)
+    first, second = indexes
+    try:
+        assert first.is_loaded and second.is_loaded
+        period = (date(2031, 3, 1), date(2031, 3, 2))
+        assert room.id in second.free_rooms_ids(*period)
+
+        # Полностью занимаем комнату в первом процессе — второй узнаёт об этом из канала
+        bookings = [Booking(id=10**9 + i, user_id=1, room_id=room.id, date_from=period[0], date_to=period[1], price=100) for i in range(room.quantity)]
+        for booking in bookings:
+            await first.notify_booking(booking)
+        async with asyncio.timeout(2):
+            while room.id in second.free_rooms_ids(*period):
+                await asyncio.sleep(0.01)
+
+        # Повторно полученная бронь не учитывается дважды
+        second.add_booking(bookings[0])
+        assert second._rooms[room.id].max_booked(*period) == room.quantity
+
+        await first.notify_room(room.id, room.hotel_id, room.quantity + 1)
+        async with asyncio.timeout(2):
+            while room.id not in second.free_rooms_ids(*period):
+                await asyncio.sleep(0.01)
+    finally:
+        for index in indexes:
+            await index.close()
+        for manager in managers:
+            await manager.close()
+
+
+# 🧹 Бронь неизвестной комнаты не теряется, а прошедшие дни и брони удаляются из индекса
+def test_availability_index_unknown_room_and_prune(monkeypatch):
+    current = date(2031, 5, 10)
+    monkeypatch.setattr("src.utils.availability.today", lambda: current)
+    index = RoomsAvailabilityIndex()
+    index.rebuild([], [])
+
+    # Бронь пришла раньше создания комнаты: комната не свободна, а после её создания бронь учтена
+    period = (date(2031, 5, 10), date(2031, 5, 12))
+    index.add_booking(Booking(id=1, user_id=1, room_id=7, date_from=date(2031, 5, 1), date_to=period[1], price=100))
+    assert index.free_rooms_ids(*period) == []
+    index.set_room(7, hotel_id=3, quantity=1)
+    assert index.free_rooms_ids(*period) == []
+    index.set_room(7, hotel_id=3, quantity=2)
+    assert index.free_rooms_ids(*period, hotel_id=3) == [7]
+    assert min(index._rooms[7].booked) == current  # Дни до сегодняшнего не хранятся
+
+    # Наступил следующий день: прошедший день и закончившиеся брони удаляются при следующем обновлении
+    current = date(2031, 5, 12)
+    index.add_booking(Booking(id=2, user_id=1, room_id=7, date_from=date(2031, 5, 20), date_to=date(2031, 5, 21), price=100))
+    assert min(index._rooms[7].booked) == current
+    assert set(index._bookings) == {1, 2}
+    current = date(2031, 5, 13)
+    index.add_booking(Booking(id=3, user_id=1, room_id=7, date_from=date(2031, 5, 20), date_to=date(2031, 5, 21), price=100))
+    assert set(index._bookings) == {2, 3}
+    assert not index.covers(date(2031, 5, 12)) and index.covers(current)
+
+
+# 🔁 Инкрементально поддерживаемая room_inventory совпадает с пересборкой из bookings
+async def test_room_inventory_matches_rebuild(db):
+    user_id = (await db.users.get_all())[0].id
+    room_id = (await db.rooms.get_all())[0].id
+
+    bookings = [
+        await db.bookings.add(BookingAdd(user_id=user_id, room_id=room_id, date_from=date(2024, 10, day_from), date_to=date(2024, 10, day_to), price=100))
+        for day_from, day_to in [(1, 5), (3, 8), (4, 4)]
+    ]
+    await db.bookings.edit(
+        BookingAdd(user_id=user_id, room_id=room_id, date_from=date(2024, 10, 2), date_to=date(2024, 10, 10), price=100),
+        id=bookings[0].id,
+    )
+    await db.bookings.delete(id=bookings[2].id)
+
+    def snapshot(rows):
+        return sorted((row.room_id, row.day, row.booked) for row in rows if row.booked)
+
+    incremental = snapshot(await db.room_inventory.get_all())
+    assert (room_id, date(2024, 10, 5), 2) in incremental
+
+    await db.room_inventory.rebuild(date_from=date(2024, 10, 3), date_to=date(2024, 10, 6))
+    assert snapshot(await db.room_inventory.get_all()) == incremental
+
+    await db.room_inventory.rebuild()
+    assert snapshot(await db.room_inventory.get_all()) == incremental
+
+
+# 🔍 Запрос пересечения периодов использует GiST-индекс (room_id, period)
+async def test_bookings_overlap_uses_gist_index(db):
+    query = select(BookingsOrm.id).filter(BookingsOrm.room_id == 1, bookings_overlap(date(2024, 8, 1), date(2024, 8, 10)))
+    compiled = query.compile(dialect=db.session.bind.dialect, compile_kwargs={"literal_binds": True})
+
+    # На маленькой тестовой таблице планировщик выбрал бы seq scan, поэтому запрещаем его на время транзакции
+    await db.session.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = "\n".join((await db.session.execute(text(f"EXPLAIN {compiled}"))).scalars().all())
+
+    assert "ix_bookings_room_id_period" in plan
+    assert "&&" in plan
+
+
+# 🏁 Одновременные брони одной комнаты не приводят к овербукингу
+@pytest.mark.parametrize("lock_mode", ["advisory", "row", "serializable"])
+async def test_concurrent_bookings_no_overbooking(db, monkeypatch, lock_mode):
+    monkeypatch.setattr(settings, "BOOKING_LOCK_MODE", lock_mode)
+    monkeypatch.setattr(settings, "DB_SERIALIZATION_RETRIES", 10)
+    user_id = (await db.users.get_all())[0].id
+    room = (await db.rooms.get_all())[0]
+    booking_data = BookingAddRequest(room_id=room.id, date_from=date(2030, 1, 10), date_to=date(2030, 1, 12))
+
+    async def book():
+        async with DBManager(session_factory=async_session_maker_null_pool) as db_:
+            try:
+                return await BookingService(db_).add_booking(user_id, booking_data)
+            except AllRoomsAreBookedException:
+                return None
+
+    results = await asyncio.gather(*(book() for _ in range(room.quantity * 3)), return_exceptions=True)
+    booked = [result for result in results if result is not None and not isinstance(result, BaseException)]
+
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if lock_mode == "serializable":
+        # Часть транзакций может исчерпать повторы (доменная ошибка, 409), но лишних броней быть не должно
+        assert 1 <= len(booked) <= room.quantity
+        assert all(isinstance(error, TransactionConflictException) for error in errors)
+    else:
+        assert len(booked) == room.quantity
+        assert not errors
+
+    bookings = await db.bookings.get_filtered(room_id=room.id, date_from=booking_data.date_from)
+    assert len(bookings) == len(booked)
+    inventory = await db.room_inventory.get_filtered(room_id=room.id, day=booking_data.date_from)
+    assert sum(row.booked for row in inventory) == len(booked)
+
+    await db.bookings.delete(room_id=room.id, date_from=booking_data.date_from)
+    await db.commit()
+
+
+# 🌊 Потоковое чтение порциями отдаёт те же записи, что и get_filtered
+async def test_stream_filtered_matches_get_filtered(db):
+    bookings = await db.bookings.get_filtered(limit=1000)
+    streamed = [booking async for booking in db.bookings.stream_filtered(chunk_size=2)]
+    assert streamed == bookings
@@ -1,3 +1,6 @@
+from src.utils.cache import FACILITIES_TAG, tags_version
+
+
 # ✅ Тест на получение списка удобств (GET /facilities)
 async def test_get_facilities(ac):
     # Отправляем GET-запрос на ручку /facilities
@@ -26,3 +29,14 @@ async def test_post_facilities(ac):
     assert res["data"]["title"] == facility_title  # Название соответствует отправленному
     assert "data" in res  # Есть поле "data"
     assert res["status"] == "OK"  # Статус успешный
+
+
+# 🗄️ Добавление удобства увеличивает версию тега "facilities" — закэшированные списки больше не читаются
+async def test_post_facilities_invalidates_cache(ac, response_cache):
+    assert await tags_version([FACILITIES_TAG, "hotels"]) == "0.0"
+
+    await ac.post("/facilities", json={"title": "Бассейн"})
+
+    assert await tags_version([FACILITIES_TAG, "hotels"]) == "1.0"  # Другие теги не затронуты
+    titles = [facility["title"] for facility in (await ac.get("/facilities")).json()]
+    assert "Бассейн" in titles
@@ -1,3 +1,9 @@
+import pytest
+from sqlalchemy import event
+
+from src.database import get_engine
+
+
 # ✅ Тест получения списка отелей по диапазону дат
 async def test_get_hotels(ac):
     """
@@ -14,3 +20,77 @@ async def test_get_hotels(ac):
 
     # 🔹 Убедимся, что в ответе — список
     assert isinstance(response.json(), list)
+
+
+# 🔎 Поиск отелей по подстроке в локации и названии (регистронезависимо)
+@pytest.mark.parametrize(
+    "location, title, expected_titles",
+    [
+        ("алтай", None, {"Cosmos Collection Altay Resort", "Skala"}),
+        (None, "SKALA", {"Skala"}),
+        ("  сириус ", "resort", {"Bridge Resort"}),
+        ("Казань", None, set()),
+    ],
+)
+async def test_search_hotels(ac, location, title, expected_titles):
+    params = {"date_from": "2025-08-01", "date_to": "2025-08-10", "location": location, "title": title}
+    response = await ac.get("/hotels", params={key: value for key, value in params.items() if value is not None})
+
+    assert response.status_code == 200
+    assert {hotel["title"] for hotel in response.json()} == expected_titles
+
+
+# 🔤 Нечёткий поиск находит отель с опечаткой в запросе и ставит самый похожий первым
+async def test_search_hotels_fuzzy(ac):
+    params = {"date_from": "2025-08-01", "date_to": "2025-08-10", "title": "Brige Resort", "fuzzy": True}
+    response = await ac.get("/hotels", params=params)
+
+    assert response.status_code == 200
+    assert response.json()[0]["title"] == "Bridge Resort"
+
+
+# 🔖 Курсорная пагинация отелей совпадает с обычной выдачей, упорядоченной по id
+async def test_get_hotels_by_cursor(ac):
+    dates = {"date_from": "2025-08-01", "date_to": "2025-08-10"}
+    expected_ids = [hotel["id"] for hotel in (await ac.get("/hotels", params={**dates, "per_page": 20})).json()]
+
+    ids, cursor = [], ""
+    while cursor is not None:
+        page = (await ac.get("/hotels", params={**dates, "cursor": cursor, "per_page": 1})).json()
+        ids += [hotel["id"] for hotel in page["data"]]
+        cursor = page["next_cursor"]
+
+    assert ids == expected_ids
+
+
+# 🗄️ Одинаковые по смыслу запросы попадают в один ключ кэша: в БД уходит только первый
+async def test_get_hotels_cached_once(ac, response_cache):
+    statements = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = get_engine("null_pool").sync_engine
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        first = await ac.get("/hotels", params={"date_from": "2025-08-01", "date_to": "2025-08-10", "location": "Алтай"})
+        hotels_queries = len(statements)
+        second = await ac.get("/hotels", params={"date_from": "2025-08-01", "date_to": "2025-08-10", "location": " алтай ", "per_page": 5})
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert len([statement for statement in statements if statement.startswith("SELECT")]) == 1  # Один запрос отелей
+    assert len(statements) == hotels_queries  # Второй запрос обслужен из кэша, без обращений к БД
+
+
+# 🔑 Без cursor и с пустым cursor — разные ответы и разные ключи кэша
+async def test_get_hotels_cursor_not_cached_as_list(ac, response_cache):
+    params = {"date_from": "2025-08-01", "date_to": "2025-08-10"}
+    plain = await ac.get("/hotels", params=params)
+    paged = await ac.get("/hotels", params={**params, "cursor": ""})
+
+    assert plain.status_code == paged.status_code == 200
+    assert isinstance(plain.json(), list)
+    assert set(paged.json()) == {"status", "data", "next_cursor"}
@@ -1,4 +1,17 @@
-from src.schemas.hotels import HotelAdd  # Pydantic-схема для добавления отеля
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from src.config import settings
+from src.database import get_engine
+from src.exceptions import RoomNotFoundException
+from src.init import redis_manager
+from src.schemas.hotels import Hotel, HotelAdd, HotelPatch  # Pydantic-схемы для добавления и изменения отеля
+from src.services.hotels import HotelService
+from src.utils.availability import RoomsAvailabilityIndex
+from src.utils.entity_cache import EntityCache
 
 
 # ✅ Асинхронный тест добавления нового отеля в базу данных
@@ -23,3 +36,81 @@ async def test_add_hotel(db):
     assert new_hotel_data.location == hotel_data.location
 
     print(f"{new_hotel_data=}")  # Можно временно оставить для отладки
+
+
+# ♻️ Запрос поиска строится один раз на набор фильтров, а in-memory индекс и SQL отвечают одинаково
+async def test_filtered_by_time_query_is_cached(db, monkeypatch):
+    date_from, date_to = date(2024, 8, 1), date(2024, 8, 10)
+    query, _ = db.hotels._filtered_by_time_query(date_from, date_to, " Сочи ", None, False, paged=False)
+    same_query, params = db.hotels._filtered_by_time_query(date(2030, 1, 1), date(2030, 1, 2), "Дубай", None, False, paged=False)
+    assert query is same_query
+    assert params == {"date_from": date(2030, 1, 1), "date_to": date(2030, 1, 2), "location": "дубай"}
+
+    hotels = await db.hotels.get_filtered_by_time(date_from, date_to, limit=100)
+    rooms = await db.rooms.get_filtered_by_time(hotels[0].id, date_from, date_to)
+
+    monkeypatch.setattr("src.utils.availability.today", lambda: date(2024, 1, 1))  # Даты теста — «будущие» для индекса
+    index = RoomsAvailabilityIndex()
+    await index.load(db)
+    monkeypatch.setattr(settings, "AVAILABILITY_ENGINE", "memory")
+    monkeypatch.setattr("src.repositories.utils.availability_index", index)
+    assert await db.hotels.get_filtered_by_time(date_from, date_to, limit=100) == hotels
+    assert await db.rooms.get_filtered_by_time(hotels[0].id, date_from, date_to) == rooms
+
+
+# 🏷️ Отели и комнаты по id читаются из кэша сущностей; изменение через сервис удаляет объект из кэша
+async def test_entity_cache(db, response_cache):
+    hotel = await db.hotels.add(HotelAdd(title="Кэш", location="Сочи"))
+    await db.commit()
+    statements = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = get_engine("null_pool").sync_engine
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        assert await db.hotels.get_one(id=hotel.id) == hotel
+        assert await db.hotels.get_one(id=hotel.id) == hotel
+        assert len(statements) == 1  # Второе чтение — из кэша
+
+        # Пакетное чтение: из БД — только отсутствующие в кэше, одним запросом
+        assert set(await db.hotels.get_many_by_ids([hotel.id, 1, 10**6])) == {hotel.id, 1}
+        assert len(statements) == 2
+
+        room = await db.rooms.get_one_with_rels(id=1, hotel_id=1)
+        assert await db.rooms.get_one_with_rels(id=1) == room
+        with pytest.raises(RoomNotFoundException):
+            await db.rooms.get_one_with_rels(id=1, hotel_id=hotel.id)  # Комната другого отеля
+        assert len(statements) == 4  # Комната и её удобства — только при первом чтении
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    await HotelService(db).edit_hotel_partially(hotel.id, HotelPatch(title="Кэш 2"), exclude_unset=True)
+    assert (await db.hotels.get_one(id=hotel.id)).title == "Кэш 2"
+
+
+# 🏁 Строка, прочитанная из БД до чужого commit, не сохраняется в кэш после его инвалидации
+async def test_entity_cache_load_races_invalidate(response_cache):
+    entities = EntityCache("race_hotel", Hotel)
+    old = Hotel(id=1, title="До изменения", location="Сочи")
+    selected, invalidated = asyncio.Event(), asyncio.Event()
+
+    async def slow_load(ids):
+        selected.set()  # SELECT выполнен — строка ещё старая
+        await invalidated.wait()
+        return [old]
+
+    async def writer():
+        await selected.wait()
+        await entities.invalidate(1)  # commit и инвалидация между SELECT читателя и сохранением в кэш
+        invalidated.set()
+
+    await asyncio.gather(entities.get(1, slow_load), writer())
+    assert await redis_manager.get(entities.key(1)) is None
+
+    async def load(ids):
+        return [old]
+
+    await entities.get(1, load)  # Без гонки загруженное сохраняется
+    assert await redis_manager.get(entities.key(1)) is not None
@@ -0,0 +1,40 @@
+from src.api.dependencies import request_db
+from src.database import async_session_maker_null_pool, get_engine, pooled_engines
+from src.utils.db_pool import PoolStats, warmup_pool
+
+
+# 📈 /metrics отдаёт состояние пулов соединений в формате Prometheus
+async def test_get_metrics(ac):
+    response = await ac.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for pool in pooled_engines():  # "read_only" — отдельный пул, только если настроена реплика
+        assert f'db_pool_checked_out{{pool="{pool}"}} 0' in response.text
+        assert f'db_pool_wait_seconds_bucket{{pool="{pool}",le="+Inf"}}' in response.text
+
+
+# 🔥 Прогрев открывает соединения пула заранее, и ожидание каждого попадает в гистограмму
+async def test_warmup_pool():
+    engine = get_engine("primary")
+    waits_before = PoolStats.get("primary").wait_seconds.count
+
+    await warmup_pool(engine, 3)
+
+    assert engine.pool.checkedin() >= 3
+    assert engine.pool.checkedout() == 0
+    assert PoolStats.get("primary").wait_seconds.count == waits_before + 3
+    await engine.dispose()  # Соединения пула привязаны к event loop теста
+
+
+# 🔢 Соединения, взятые за запрос, видны в /metrics (0 — запрос без обращения к БД)
+async def test_request_connections_metric(ac):
+    async with request_db("test", async_session_maker_null_pool) as db:
+        pass
+    async with request_db("test", async_session_maker_null_pool) as db:
+        await db.hotels.get_all()
+
+    response = await ac.get("/metrics")
+    assert 'db_request_connections_bucket{dependency="test",le="0"} 1' in response.text
+    assert 'db_request_connections_bucket{dependency="test",le="1"} 2' in response.text
+    assert 'db_request_connections_count{dependency="test"} 2' in response.text
@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import NullPool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.config import settings
+from src.database import connect_args
+from src.utils.db_manager import DBManager
+from tests.integration_tests.pgbouncer.pooler import TransactionPooler
+
+
+# 🔀 Пулер с pool_mode=transaction перед тестовой БД: 2 серверных соединения на всех клиентов
+@pytest.fixture(scope="function")
+async def pooler() -> TransactionPooler:
+    pooler = TransactionPooler(settings.DB_HOST, settings.DB_PORT, settings.DB_USER, settings.DB_PASS, settings.DB_NAME, server_connections=2)
+    await pooler.start()
+    yield pooler
+    await pooler.stop()
+
+
+# 🏭 Фабрика сессий через пулер — как у приложения с DB_PGBOUNCER=True
+@pytest.fixture(scope="function")
+async def session_maker(pooler) -> async_sessionmaker:
+    engine = create_async_engine(pooler.url, poolclass=NullPool, connect_args=connect_args(pgbouncer=True))
+    yield async_sessionmaker(bind=engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+# 💾 Менеджер БД через пулер (переопределяет общую фикстуру db)
+@pytest.fixture(scope="function")
+async def db(session_maker) -> DBManager:
+    async with DBManager(session_factory=session_maker) as db:
+        yield db
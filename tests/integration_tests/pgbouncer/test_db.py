@@ -0,0 +1,84 @@
+import asyncio
+from datetime import date
+
+import pytest
+from asyncpg.exceptions import InvalidSQLStatementNameError
+from sqlalchemy import NullPool
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.config import settings
+from src.database import connect_args
+from src.exceptions import AllRoomsAreBookedException
+from src.schemas.bookings import BookingAddRequest
+from src.schemas.hotels import HotelAdd
+from src.services.bookings import BookingService
+from src.utils.db_manager import DBManager
+
+
+# 🧨 Без режима совместимости кэшированное подготовленное выражение теряется при смене серверного соединения
+async def test_default_connect_args_break_on_transaction_pooling(pooler):
+    engine = create_async_engine(pooler.url, poolclass=NullPool, connect_args=connect_args(pgbouncer=False))
+    session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
+    try:
+        # Ошибка возможна уже при подключении (интроспекция типов asyncpg) — тогда она не обёрнута SQLAlchemy
+        with pytest.raises((DBAPIError, InvalidSQLStatementNameError)) as ex:
+            async with DBManager(session_factory=session_maker) as db:
+                for _ in range(3):
+                    await db.hotels.get_all()
+                    await db.commit()  # Сервер возвращается в пул, следующая транзакция идёт на другой
+        assert getattr(ex.value, "orig", ex.value).sqlstate == "26000"  # invalid_sql_statement_name
+    finally:
+        await engine.dispose()
+
+
+# 🔁 CRUD через репозитории: каждая транзакция может попасть на другое серверное соединение
+async def test_repositories_crud_through_pooler(db, pooler):
+    for i in range(3):
+        hotel = await db.hotels.add(HotelAdd(title=f"Пулер {i}", location="pgbouncer"))
+        await db.commit()
+        assert await db.hotels.get_one_or_none(id=hotel.id) == hotel
+        await db.commit()
+
+    hotels = await db.hotels.get_filtered(location="pgbouncer")
+    assert len(hotels) == 3
+    assert [hotel async for hotel in db.hotels.stream_filtered(chunk_size=2, location="pgbouncer")] == hotels
+
+    await db.hotels.delete(location="pgbouncer")
+    await db.commit()
+    assert pooler.transactions >= 7
+
+
+# 🏁 Блокировки бронирования транзакционные — работают и при пулинге транзакций (клиентов больше, чем соединений)
+@pytest.mark.parametrize("lock_mode", ["advisory", "row"])
+async def test_concurrent_bookings_through_pooler(db, session_maker, monkeypatch, lock_mode):
+    monkeypatch.setattr(settings, "BOOKING_LOCK_MODE", lock_mode)
+    user_id = (await db.users.get_all())[0].id
+    room = (await db.rooms.get_all())[0]
+    await db.commit()
+    booking_data = BookingAddRequest(room_id=room.id, date_from=date(2031, 1, 10), date_to=date(2031, 1, 12))
+
+    async def book():
+        async with DBManager(session_factory=session_maker) as db_:
+            try:
+                return await BookingService(db_).add_booking(user_id, booking_data)
+            except AllRoomsAreBookedException:
+                return None
+
+    results = await asyncio.gather(*(book() for _ in range(room.quantity * 3)))
+    assert len([result for result in results if result is not None]) == room.quantity
+
+    await db.bookings.delete(room_id=room.id, date_from=booking_data.date_from)
+    await db.commit()
+
+
+# 🧾 В режиме PgBouncer кэши выражений выключены, имена уникальны, стартовых параметров сервера нет
+def test_connect_args_for_pgbouncer(monkeypatch):
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+    args = connect_args(pgbouncer=True)
+
+    assert args["statement_cache_size"] == 0
+    assert args["prepared_statement_cache_size"] == 0
+    assert args["prepared_statement_name_func"]() != args["prepared_statement_name_func"]()
+    assert "server_settings" not in args
+    assert connect_args(pgbouncer=False)["server_settings"] == {"statement_timeout": "5000"}
@@ -0,0 +1,240 @@
+import asyncio
+import uuid
+from functools import partial
+
+import pytest
+from sqlalchemy import text
+
+from src.api.dependencies import get_db_cached, get_db_read_only
+from src.config import settings
+from src.connectors.redis_connector import RedisManager
+from src.connectors.two_tier_cache import TwoTierBackend
+from src.init import redis_manager
+from src.main import app
+from src.database import async_session_maker_null_pool
+from src.utils.cache import _in_flight, cache, compute_and_store, compute_with_lock, single_flight
+from src.utils.db_manager import DBManager
+
+
+@pytest.fixture
+async def workers():
+    """
+    Два бэкенда с отдельными подключениями к Redis — как в двух процессах uvicorn.
+    """
+    channel = f"test-cache-invalidate-{uuid.uuid4().hex}"
+    backends = []
+    for _ in range(2):
+        manager = RedisManager(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
+        await manager.connect()
+        backend = TwoTierBackend(manager, max_items=100, max_bytes=10_000, local_ttl=60, channel=channel)
+        await backend.start()
+        backends.append(backend)
+    yield backends
+    for backend in backends:
+        await backend.close()
+        await backend.redis_manager.close()
+
+
+async def wait_for(condition, timeout: float = 2):
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+# 🧊 Повторное чтение обслуживается из LRU процесса, удаление в одном процессе удаляет копии в остальных
+async def test_two_tier_invalidation_across_workers(workers):
+    first, second = workers
+    key = f"test-cache:{uuid.uuid4().hex}"
+
+    await first.set(key, b"old", expire=60)
+    assert await second.get(key) == b"old"  # Из Redis
+    assert await second.get(key) == b"old"  # Из LRU
+    assert second.stats == {"local": 1, "redis": 1, "miss": 0}
+
+    await first.clear(key=key)
+    await wait_for(lambda: second.local.get(key) is None)
+    assert await second.get(key) is None
+    assert second.local.get(key) is None  # Отсутствие ответа локально не запоминается
+
+    # Запись не рассылается, но заполненный другим процессом ключ сразу виден
+    await first.set(key, b"new", expire=60)
+    assert await second.get(key) == b"new"
+    assert second.hit_ratio() == {"local": 0.25, "redis": 2 / 3}
+    await first.clear(key=key)
+
+
+# 📣 В канал инвалидации попадают только удаления и изменения, несколько ключей — одним конвейером
+async def test_two_tier_publishes_only_invalidations(workers, monkeypatch):
+    first, _ = workers
+    keys = [f"test-cache:{uuid.uuid4().hex}" for _ in range(2)]
+    published = []
+    monkeypatch.setattr(first.redis_manager, "publish", lambda channel, message: published.append(message))
+    pipelines = 0
+    pipeline = first.redis_manager.pipeline
+
+    def counted_pipeline(*args, **kwargs):
+        nonlocal pipelines
+        pipelines += 1
+        return pipeline(*args, **kwargs)
+
+    async with first.redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+        await pubsub.subscribe(first.channel)
+        await first.set(keys[0], b"value", expire=60)
+        await first.mset({key: b"value" for key in keys}, expire=60)
+        monkeypatch.setattr(first.redis_manager, "pipeline", counted_pipeline)
+        await first.delete(keys)
+        assert pipelines == 1 and published == []
+
+        messages = []
+        async with asyncio.timeout(2):
+            while len(messages) < len(keys):
+                if (message := await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.1)) is not None:
+                    messages.append(message["data"].decode().split(" ", 1)[1])
+        assert messages == keys
+        assert await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.2) is None
+
+
+# 🏷️ Версии тегов кэшируются локально, а INCR в одном процессе виден в остальных
+async def test_two_tier_tag_versions(workers):
+    first, second = workers
+    tag = f"test-cache:tag:{uuid.uuid4().hex}"
+
+    assert await second.mget([tag]) == [None]
+    assert await second.mget([tag]) == [None]  # Отсутствие версии тоже запомнено локально
+    assert second.stats == {"local": 1, "redis": 0, "miss": 1}
+    await first.incr([tag])
+    await wait_for(lambda: second.local.get(tag) is None)
+    assert await second.mget([tag]) == [b"1"]
+
+    await first.incr([tag])
+    await wait_for(lambda: second.local.get(tag) is None)
+    assert await second.mget([tag]) == [b"2"]
+    await first.redis.delete(tag)
+
+
+# 🏁 Версия, прочитанная из Redis до чужого INCR, не сохраняется локально после его инвалидации
+async def test_two_tier_invalidation_during_read(workers, monkeypatch):
+    first, second = workers
+    tag = f"test-cache:tag:{uuid.uuid4().hex}"
+    mget = second.redis_manager.mget
+
+    async def mget_then_incr(keys):
+        values = await mget(keys)  # Старая версия уже прочитана
+        invalidations = second._invalidations
+        await first.incr([tag])
+        await wait_for(lambda: second._invalidations > invalidations)  # Инвалидация пришла до сохранения ответа
+        return values
+
+    monkeypatch.setattr(second.redis_manager, "mget", mget_then_incr)
+    assert await second.mget([tag]) == [None]
+    assert second.local.get(tag) is None
+
+    monkeypatch.setattr(second.redis_manager, "mget", mget)
+    assert await second.mget([tag]) == [b"1"]
+    await first.redis.delete(tag)
+
+
+# 🚦 Одновременные вычисления с одним ключом выполняются один раз
+async def test_single_flight():
+    calls, release = 0, asyncio.Event()
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"calls": calls}
+
+    waiting = [asyncio.create_task(single_flight("test-cache:flight", compute)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiting) == [{"calls": 1}] * 3
+    assert await single_flight("test-cache:flight", compute) == {"calls": 2}  # Завершённое вычисление не переиспользуется
+
+
+# 🔒 С блокировкой в Redis ответ вычисляет один процесс, остальные берут его из кэша или устаревшую копию
+async def test_compute_with_lock(response_cache, monkeypatch):
+    key, stale_key = f"test-cache:{uuid.uuid4().hex}", f"test-cache:{uuid.uuid4().hex}:stale"
+    computed, release = [], asyncio.Event()
+
+    async def compute(name):
+        computed.append(name)
+        await release.wait()
+        return {"by": name}
+
+    def locked(name, cache_key=key):
+        return compute_with_lock(cache_key, stale_key, partial(compute_and_store, cache_key, partial(compute, name), 60, stale_key))
+
+    owner = asyncio.create_task(locked("owner"))
+    await wait_for(lambda: computed)
+    waiter = asyncio.create_task(locked("waiter"))
+    await asyncio.sleep(0.1)
+    release.set()
+
+    assert (await owner)[0] == (await waiter)[0] == {"by": "owner"}
+    assert computed == ["owner"]
+
+    # Блокировку держит другой процесс и не успевает за CACHE_LOCK_WAIT — отдаём устаревшую копию
+    monkeypatch.setattr(settings, "CACHE_LOCK_WAIT", 0.1)
+    other_key = f"test-cache:{uuid.uuid4().hex}"
+    await redis_manager.redis.set(f"{other_key}:lock", "other", px=1000)
+    assert (await locked("late", other_key))[0] == {"by": "owner"}
+    assert computed == ["owner"]
+
+
+# ♻️ Устаревшая запись отдаётся сразу, а новая вычисляется в фоне — со своим DBManager
+async def test_stale_while_revalidate(response_cache):
+    calls = []
+
+    @cache(expire=60, fresh=0)
+    async def endpoint(hotel_id: int, db: DBManager):
+        calls.append(db)
+        return {"hotel": hotel_id, "version": len(calls), "one": (await db.session.execute(text("SELECT 1"))).scalar()}
+
+    async with DBManager(session_factory=async_session_maker_null_pool) as db:
+        assert await endpoint(hotel_id=1, db=db) == {"hotel": 1, "version": 1, "one": 1}  # Промах
+        assert await endpoint(hotel_id=1, db=db) == {"hotel": 1, "version": 1, "one": 1}  # Устаревшая запись
+
+    await wait_for(lambda: len(calls) == 2 and not _in_flight)
+    assert calls[1] is not calls[0]
+    async with DBManager(session_factory=async_session_maker_null_pool) as db:
+        assert (await endpoint(hotel_id=1, db=db))["version"] == 2
+
+
+# 🚪 Объединённый промах вычисляется со своим DBManager: запрос, который его начал, может уйти раньше
+async def test_coalesced_miss_survives_cancelled_request(response_cache):
+    used, release = [], asyncio.Event()
+
+    @cache(expire=60, coalesce="local")
+    async def endpoint(run: str, db: DBManager):
+        used.append(db)
+        await release.wait()
+        return (await db.session.execute(text("SELECT 1"))).scalar()
+
+    run, requests = uuid.uuid4().hex, []
+
+    async def request():
+        async with DBManager(session_factory=async_session_maker_null_pool) as db:
+            requests.append(db)
+            return await endpoint(run=run, db=db)
+
+    first = asyncio.create_task(request())
+    await wait_for(lambda: used)
+    waiter = asyncio.create_task(request())
+    await wait_for(lambda: len(requests) == 2)
+    first.cancel()  # Клиент ушёл: DBManager первого запроса закрывается
+    await asyncio.gather(first, return_exceptions=True)
+    release.set()
+
+    assert await waiter == 1
+    assert len(used) == 1 and used[0] not in requests
+
+
+# 📖 Кэшируемые ручки читают с основной БД: промах с отстающей реплики закэшировал бы старые данные
+def test_cached_endpoints_read_from_primary():
+    cached = {"/hotels", "/hotels/{hotel_id}/rooms", "/facilities"}
+    for route in app.routes:
+        if getattr(route, "path", None) in cached and "GET" in route.methods:
+            dependencies = {dependency.call for dependency in route.dependant.dependencies}
+            assert get_db_cached in dependencies
+            assert get_db_read_only not in dependencies
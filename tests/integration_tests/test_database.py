@@ -0,0 +1,82 @@
+import subprocess
+import sys
+
+# Каждый сценарий — в отдельном процессе: тестам нужен чистый импорт src.database и настоящий fork()
+
+LAZY_IMPORT = """
+import src.database as database
+from src.models import *  # noqa
+
+assert not database._engines, database._engines
+"""
+
+LIFESPAN = """
+import asyncio
+import os
+
+os.environ["DB_POOL_WARMUP"] = "false"
+os.environ["AVAILABILITY_ENGINE"] = "sql"
+
+import src.database as database
+from src.main import app, lifespan
+
+
+async def main():
+    async with lifespan(app):
+        pass
+
+
+asyncio.run(main())
+assert not database._engines, database._engines  # Остановка не создаёт движки ради dispose
+"""
+
+FORK = """
+import asyncio
+import os
+
+from sqlalchemy import text
+
+from src.database import get_engine
+
+
+async def query():
+    async with get_engine().connect() as conn:
+        return await conn.scalar(text("SELECT pg_backend_pid()"))
+
+
+loop = asyncio.new_event_loop()  # Соединения asyncpg привязаны к event loop — у родителя он один на весь сценарий
+parent_pid = loop.run_until_complete(query())
+assert get_engine().pool.checkedin() == 1
+
+child = os.fork()
+if child == 0:
+    # Пул унаследован пустым: ребёнок открывает своё соединение, а не пишет в сокет родителя
+    ok = get_engine().pool.checkedin() == 0 and asyncio.new_event_loop().run_until_complete(query()) != parent_pid
+    os._exit(0 if ok else 1)
+
+_, status = os.waitpid(child, 0)
+assert os.waitstatus_to_exitcode(status) == 0
+assert loop.run_until_complete(query()) == parent_pid  # Соединение родителя пережило завершение ребёнка
+"""
+
+
+def run(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=60)
+
+
+# 💤 Импорт модуля БД и моделей (как в Alembic) не создаёт движки
+def test_import_does_not_create_engines():
+    result = run(LAZY_IMPORT)
+    assert result.returncode == 0, result.stderr
+
+
+# 🛑 Приложение, не обращавшееся к БД, при остановке не создаёт движки
+def test_shutdown_does_not_create_engines():
+    result = run(LIFESPAN)
+    assert result.returncode == 0, result.stderr
+
+
+# 🍴 После fork() дочерний процесс получает собственный пул, а соединения родителя остаются нетронутыми
+def test_engines_are_reset_after_fork():
+    result = run(FORK)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import NullPool, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.config import settings
+from src.database import async_session_maker_null_pool
+from src.exceptions import TransactionConflictException
+from src.schemas.hotels import HotelAdd
+from src.utils.db_manager import DBManager
+
+
+# 💤 Менеджер без обращений к БД не создаёт сессию и не берёт соединение
+async def test_db_manager_without_queries_is_free():
+    async with DBManager(session_factory=async_session_maker_null_pool) as db:
+        pass
+
+    assert "session" not in db.__dict__
+    assert db.connections_acquired == 0
+
+
+# 🔢 Счётчик соединений растёт на каждую начатую транзакцию
+async def test_db_manager_counts_acquired_connections():
+    async with DBManager(session_factory=async_session_maker_null_pool) as db:
+        await db.hotels.get_all()
+        await db.rooms.get_all()  # Та же транзакция — то же соединение
+        assert db.connections_acquired == 1
+
+        await db.commit()
+        await db.hotels.get_all()  # Новая транзакция после commit
+        assert db.connections_acquired == 2
+
+
+# 📖 В read-only менеджере запись отклоняется самой БД
+async def test_db_manager_read_only_rejects_writes():
+    async with DBManager(session_factory=async_session_maker_null_pool, read_only=True) as db:
+        assert await db.hotels.get_all()
+
+        with pytest.raises(DBAPIError) as ex:
+            await db.hotels.add(HotelAdd(title="Только чтение", location="read_only"))
+        assert ex.value.orig.sqlstate == "25006"  # read_only_sql_transaction
+
+
+# 📖 Движок с postgresql_readonly (как у реплики) открывает транзакции как READ ONLY
+async def test_read_only_engine_opens_read_only_transactions():
+    engine = create_async_engine(settings.DB_URL, poolclass=NullPool).execution_options(postgresql_readonly=True)
+    async with DBManager(session_factory=async_sessionmaker(bind=engine), read_only=True) as db:
+        result = await db.session.execute(text("SHOW transaction_read_only"))
+        assert result.scalar_one() == "on"
+    await engine.dispose()
+
+
+# 🔁 Конфликт сериализации повторяется retries раз, затем — доменная ошибка, а не DBAPIError
+async def test_run_serializable_exhausted_retries():
+    class SerializationFailure(Exception):
+        sqlstate = "40001"
+
+    attempts = 0
+
+    async def conflict():
+        nonlocal attempts
+        attempts += 1
+        raise DBAPIError("UPDATE", {}, SerializationFailure())
+
+    async with DBManager(session_factory=async_session_maker_null_pool) as db:
+        with pytest.raises(TransactionConflictException):
+            await db.run_serializable(conflict, retries=2)
+    assert attempts == 3
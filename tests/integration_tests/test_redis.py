@@ -0,0 +1,74 @@
+import uuid
+
+import pytest
+
+from src.config import settings
+from src.connectors.redis_connector import RedisManager
+
+
+@pytest.fixture
+async def manager():
+    """
+    Отдельное подключение к Redis с маленьким пулом; ключи теста — под уникальным префиксом.
+    """
+    manager = RedisManager(host=settings.REDIS_HOST, port=settings.REDIS_PORT, max_connections=5, pool_timeout=1, socket_timeout=2)
+    await manager.connect()
+    manager.prefix = f"test-redis-{uuid.uuid4().hex}"
+    yield manager
+    await manager.delete(*[key async for key in manager.redis.scan_iter(match=f"{manager.prefix}:*")])
+    await manager.close()
+
+
+async def test_pool_settings(manager):
+    pool = manager.redis.connection_pool
+    assert pool.max_connections == 5
+    assert pool.timeout == 1
+    assert pool.connection_kwargs["socket_timeout"] == 2
+
+
+async def test_mget_mset(manager):
+    a, b, c = (f"{manager.prefix}:{name}" for name in "abc")
+    await manager.mset({a: "1", b: "2"}, expire=60)
+    assert await manager.mget([a, b, c]) == [b"1", b"2", None]
+    assert 0 < await manager.redis.ttl(a) <= 60
+
+    await manager.mset({c: "3"})
+    assert await manager.redis.ttl(c) == -1  # Без expire ключ не истекает
+
+    await manager.delete(a, b)
+    assert await manager.mget([a, b, c]) == [None, None, b"3"]
+    assert await manager.mget([]) == []
+
+
+async def test_pipeline(manager):
+    counter = f"{manager.prefix}:counter"
+    async with manager.pipeline(transaction=True) as pipe:
+        assert await pipe.incr(counter).incrby(counter, 5).get(counter).execute() == [1, 6, b"6"]
+
+
+async def test_transaction_retries_on_watched_change(manager):
+    balance = f"{manager.prefix}:balance"
+    await manager.set(balance, "10")
+    attempts = 0
+
+    async def withdraw(pipe):
+        nonlocal attempts
+        attempts += 1
+        current = int(await pipe.get(balance))
+        if attempts == 1:
+            await manager.set(balance, "20")  # Конкурентное изменение между WATCH и EXEC
+        pipe.multi()
+        pipe.set(balance, current - 3)
+
+    await manager.transaction(withdraw, balance)
+    assert attempts == 2
+    assert await manager.get(balance) == b"17"
+
+
+async def test_run_script_reloads_after_flush(manager):
+    key = f"{manager.prefix}:script"
+    manager.register_script("get_or_set", "redis.call('setnx', KEYS[1], ARGV[1]) return redis.call('get', KEYS[1])")
+    assert await manager.run_script("get_or_set", keys=[key], args=["first"]) == b"first"
+
+    await manager.redis.script_flush()  # Как после перезапуска Redis: EVALSHA получит NOSCRIPT
+    assert await manager.run_script("get_or_set", keys=[key], args=["second"]) == b"first"
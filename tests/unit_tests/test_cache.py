@@ -0,0 +1,23 @@
+import random
+
+from src.utils.cache import cache_key, cache_params, should_refresh
+
+
+# ♻️ Запись старше fresh обновляется всегда, свежая — досрочно по XFetch, тем чаще, чем ближе конец fresh
+def test_should_refresh(monkeypatch):
+    assert should_refresh(age=100, fresh=100, compute_seconds=0, beta=0)
+    assert not should_refresh(age=99, fresh=100, compute_seconds=10, beta=0)
+
+    rng = random.Random(0)
+    monkeypatch.setattr(random, "random", rng.random)
+    early = {age: sum(should_refresh(age, fresh=100, compute_seconds=2, beta=1) for _ in range(1000)) for age in (50, 95, 99)}
+    assert early[50] == 0  # exp(-25): практически никогда
+    assert 0 < early[95] < early[99] < 1000
+
+
+# 🔑 Не переданный параметр (None) и пустая строка дают разные ключи
+def test_cache_key_none_differs_from_empty():
+    def endpoint(cursor: str | None = None): ...
+
+    assert cache_key(endpoint, "test", {"cursor": None}) != cache_key(endpoint, "test", {"cursor": ""})
+    assert cache_params({"cursor": None, "location": " Сочи "}) == {"location": "сочи"}
@@ -0,0 +1,20 @@
+from datetime import date
+
+from src.models.bookings import BookingsOrm
+from src.repositories.mappers.mappers import BookingDataMapper, RoomDataWithRelsMapper
+
+
+# Юнит-тест: пакетный маппинг строк даёт те же схемы, что и маппинг ORM-объектов
+def test_map_rows_matches_orm_mapping():
+    booking = {"id": 1, "user_id": 2, "room_id": 3, "date_from": date(2030, 1, 1), "date_to": date(2030, 1, 5), "price": 100}
+    row = tuple(booking[column.key] for column in BookingDataMapper.columns())  # Строка select(*columns())
+
+    assert BookingDataMapper.map_rows_to_domain_entities([row]) == [BookingDataMapper.map_to_domain_entity(BookingsOrm(**booking))]
+
+
+# Юнит-тест: связи не входят в колонки маппера (их подгружает репозиторий)
+def test_columns_skip_relations():
+    keys = [column.key for column in RoomDataWithRelsMapper.columns()]
+
+    assert "facilities" not in keys
+    assert set(keys) == {"id", "hotel_id", "title", "description", "price", "quantity"}
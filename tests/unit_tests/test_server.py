@@ -0,0 +1,23 @@
+from src.config import settings
+from src.main import server_options
+
+
+# 🛠️ В MODE=LOCAL — режим разработки: автоперезагрузка, один процесс
+def test_server_options_local(monkeypatch):
+    monkeypatch.setattr(settings, "MODE", "LOCAL")
+
+    options = server_options()
+    assert options["reload"] is True
+    assert "workers" not in options
+
+
+# 🚀 В остальных режимах — несколько воркеров с uvloop и httptools, без автоперезагрузки
+def test_server_options_production(monkeypatch):
+    monkeypatch.setattr(settings, "MODE", "PROD")
+    monkeypatch.setattr(settings, "APP_WORKERS", 4)
+
+    options = server_options()
+    assert "reload" not in options
+    assert options["workers"] == 4
+    assert (options["loop"], options["http"]) == ("uvloop", "httptools")
+    assert options["timeout_graceful_shutdown"] == settings.APP_GRACEFUL_SHUTDOWN_TIMEOUT
@@ -0,0 +1,15 @@
+import subprocess
+import sys
+
+CHECK_LAZY_MODULES = """
+import sys
+import src.main
+print(",".join(name for name in ("celery", "PIL", "src.tasks.tasks") if name in sys.modules))
+"""
+
+
+# 🪶 Веб-процесс не загружает Celery и Pillow при старте — только при первой фоновой задаче
+def test_main_does_not_import_task_machinery():
+    result = subprocess.run([sys.executable, "-c", CHECK_LAZY_MODULES], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
@@ -0,0 +1,40 @@
+import time
+
+from src.connectors.two_tier_cache import LocalCache
+
+
+# 🧊 LRU вытесняет давно не читанные записи при превышении числа записей или суммарного размера
+def test_local_cache_limits():
+    local = LocalCache(max_items=2, max_bytes=10, ttl=60)
+    local.set("a", b"1234")
+    local.set("b", b"1234")
+    local.get("a")  # "a" становится самой свежей
+    local.set("c", b"1234")
+
+    assert local.get("b") is None
+    assert local.get("a") is not None and local.get("c") is not None
+
+    local.set("d", b"12345678")  # 4 + 8 > 10 байт — вытесняется ещё и "a"
+    assert len(local) == 1 and local.size == 8
+
+    local.set("big", b"x" * 11)  # Больше лимита — не кэшируется вовсе
+    assert local.get("big") is None
+
+    local.set("missing", None)  # Отсутствие ключа в Redis занимает место только в числе записей
+    assert local.get("missing")[1] is None and local.size == 8
+
+
+# ⏱️ Локальная копия живёт не дольше local_ttl и не дольше записи в Redis
+def test_local_cache_ttl(monkeypatch):
+    local = LocalCache(max_items=10, max_bytes=100, ttl=30)
+    local.set("short", b"1", expire=5)
+    local.set("long", b"1")
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 10)
+    assert local.get("short") is None
+    assert local.get("long") is not None
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 31)
+    assert local.get("long") is None
+    assert local.size == 0